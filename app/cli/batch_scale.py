@@ -0,0 +1,212 @@
+# app/cli/batch_scale.py
+
+# Scales a whole bestiary without prompts:
+#
+#   python -m app.cli.batch_scale monsters.csv --target-cr 5 -o scaled.csv
+#   cat monsters.jsonl | python -m app.cli.batch_scale - --format jsonl --target-column to_cr
+#
+# Rows are read, scaled and written a chunk at a time, so memory stays flat however long the
+# input is and output appears while the input is still being read. A bad row is reported on
+# stderr with its line number and skipped; the exit status is 1 if any row was skipped.
+
+import argparse
+import csv
+import json
+import math
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import ExitStack
+from dataclasses import dataclass
+from fractions import Fraction
+from itertools import islice
+from pathlib import Path
+from typing import TextIO
+
+import numpy as np
+
+from app.domain.models.monster_table import (
+    MONSTER_COLUMNS,
+    STAT_COLUMNS,
+    check_stat_columns,
+    to_records,
+)
+from app.domain.services.scale_monster import scale_monsters
+from app.repositories.cr_repo import CR_TABLE
+
+FORMATS = ("csv", "jsonl")
+SUFFIX_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+CHUNK_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    message: str
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, dict]]:
+    # (line number, record) pairs; CSV values stay strings until they are scaled.
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Values beyond the header land under None; they have no column to go to.
+            record.pop(None, None)
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = {"_error": f"Invalid JSON: {e.msg}"}
+                if not isinstance(record, dict):
+                    record = {"_error": "Expected a JSON object"}
+                yield line_number, record
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def scale_records(
+    records: Iterable[tuple[int, Mapping]],
+    target_cr: float | None = None,
+    target_column: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[dict | RowError]:
+    # Yields, in input order, each record with its stats replaced by the scaled ones, or a
+    # RowError. A row's own target_column wins over target_cr when it has a value.
+    if target_cr is None and target_column is None:
+        raise ValueError("Need a target_cr or a target_column")
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        yield from _scale_chunk(chunk, target_cr, target_column)
+
+
+def _scale_chunk(
+    chunk: list[tuple[int, Mapping]], target_cr: float | None, target_column: str | None
+) -> Iterator[dict | RowError]:
+    errors: dict[int, str] = {}
+    columns = {name: [] for name in (*STAT_COLUMNS, "target_cr")}
+    for row, (_, record) in enumerate(chunk):
+        if "_error" in record:
+            errors[row] = record["_error"]
+        for name in STAT_COLUMNS:
+            value, error = _parse(record.get(name), cr=name == "challenge_rating")
+            columns[name].append(value)
+            if error:
+                errors.setdefault(row, f"{name}: {error}")
+        target = record.get(target_column) if target_column else None
+        if target in (None, ""):
+            target = target_cr
+        value, error = _parse(target, cr=True)
+        columns["target_cr"].append(value)
+        if error or value is None:
+            errors.setdefault(row, f"target CR: {error or 'missing'}")
+
+    targets = np.array([np.nan if v is None else v for v in columns.pop("target_cr")])
+    normalized, stat_errors = check_stat_columns(columns)
+    for row, message in stat_errors.items():
+        errors.setdefault(row, message)
+    for row in np.flatnonzero((CR_TABLE.indices(targets) < 0) & ~np.isnan(targets)):
+        errors.setdefault(int(row), f"Invalid target challenge rating: {targets[row]}")
+
+    valid = np.ones(len(chunk), dtype=bool)
+    valid[list(errors)] = False
+    scaled = scale_monsters(
+        {name: normalized[name][valid] for name in STAT_COLUMNS}, targets[valid]
+    )
+    scaled_rows = iter(to_records(scaled))
+
+    for row, (line, record) in enumerate(chunk):
+        if row in errors:
+            yield RowError(line, errors[row])
+        else:
+            yield dict(record) | next(scaled_rows)
+
+
+def _parse(value, cr: bool = False) -> tuple[float | int | None, str | None]:
+    # Numbers as they are, numeric strings (and "1/4" style CRs) parsed; None if empty.
+    if value is None or value == "":
+        return None, None
+    if isinstance(value, bool):
+        return None, f"not a number: {value!r}"
+    number = None
+    if isinstance(value, int | float):
+        number = value
+    elif isinstance(value, str):
+        try:
+            number = float(Fraction(value.strip())) if cr else float(value)
+        except (ValueError, ZeroDivisionError):
+            pass
+    if number is None or not math.isfinite(number):
+        return None, f"not a number: {value!r}"
+    return number, None
+
+
+def write_records(
+    results: Iterable[dict | RowError],
+    out: TextIO,
+    fmt: str,
+    errors: TextIO | None = None,
+) -> tuple[int, int]:
+    # Writes scaled rows to out and errors to errors (stderr); returns (written, failed).
+    errors = errors or sys.stderr
+    written = failed = 0
+    writer = None
+    for result in results:
+        if isinstance(result, RowError):
+            failed += 1
+            print(f"line {result.line}: {result.message}", file=errors)
+            continue
+        if fmt == "jsonl":
+            out.write(json.dumps(result) + "\n")
+        else:
+            if writer is None:
+                fields = [*result, *(name for name in MONSTER_COLUMNS if name not in result)]
+                writer = csv.DictWriter(out, fields, extrasaction="ignore", lineterminator="\n")
+                writer.writeheader()
+            writer.writerow(result)
+        written += 1
+    out.flush()
+    return written, failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Scale every monster in a CSV or JSONL file.")
+    parser.add_argument("input", help="Input file, or - for stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout).")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: by suffix).")
+    parser.add_argument(
+        "--output-format", choices=FORMATS, help="Output format (default: the input format)."
+    )
+    parser.add_argument("--target-cr", type=lambda v: float(Fraction(v)), help="e.g. 5 or 1/4")
+    parser.add_argument(
+        "--target-column",
+        metavar="NAME",
+        help="Column holding each row's target CR; rows without one use --target-cr.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.target_cr is None and args.target_column is None:
+        parser.error("give --target-cr, --target-column or both")
+    fmt = args.format or SUFFIX_FORMATS.get(Path(args.input).suffix.lower())
+    if fmt is None:
+        parser.error("cannot tell the input format from the file name; pass --format")
+    out_fmt = args.output_format or SUFFIX_FORMATS.get(Path(args.output).suffix.lower(), fmt)
+
+    with ExitStack() as stack:
+        source, target = sys.stdin, sys.stdout
+        if args.input != "-":
+            source = stack.enter_context(open(args.input, newline="", encoding="utf-8"))
+        if args.output != "-":
+            target = stack.enter_context(open(args.output, "w", newline="", encoding="utf-8"))
+        results = scale_records(
+            read_records(source, fmt), args.target_cr, args.target_column, args.chunk_size
+        )
+        written, failed = write_records(results, target, out_fmt)
+    print(f"{written} monsters scaled, {failed} rows skipped", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
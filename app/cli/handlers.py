@@ -1,43 +1,309 @@
+# Heavy dependencies (PIL, NumPy, the domain modules) are imported inside the handlers
+# that need them, so starting the menu stays fast.
+import os
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, islice
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from PIL import Image
-
-from app.domain.models.monster import Monster, MonsterStats
-from app.domain.services.image_processing import to_transparent
-from app.domain.services.scale_monster import scale_monster
+if TYPE_CHECKING:
+    from app.domain.models.monster import Monster
+    from app.domain.services.map_tiles import TileOptions
+    from app.domain.services.sketch_conversion import ConversionJob, ConversionOptions
+    from app.utils.profiling import PipelineProfiler
+    from app.utils.scanner import ScannedFile
 
 SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
 
 
-def needs_processing(img_path: Path, sketch_path: Path) -> bool:
-    if not sketch_path.exists():
-        return True
-    return img_path.stat().st_mtime > sketch_path.stat().st_mtime
+def report_failure(img_path: Path, error: Exception) -> None:
+    print(f"❌ Failed to process {img_path}: {error}")
 
 
 def process_images(
-    images_dir: Path, sketch_dir: Path, force: bool = False, invert: bool = False
+    images_dir: Path,
+    sketch_dir: Path,
+    force: bool = False,
+    invert: bool = False,
+    threshold: float = 0.10,
+    workers: int | None = None,
+    tile_rows: int | None = None,
+    on_error: Callable[[Path, Exception], None] = report_failure,
+    profiler: "PipelineProfiler | None" = None,
+    encoding: str = "rgba-png",
+    compress_level: int = 6,
+    sizes: tuple[int, ...] = (),
+    sources: Iterable[Path] | None = None,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    in_flight: int | None = None,
 ) -> list[Path]:
+    # Returns every file written, including the downscaled copies in sized_dir(sketch_dir, n),
+    # and every stale output deleted because the encoding or the sizes changed.
+    # sources limits the scan to these files and directories instead of all of images_dir;
+    # include/exclude are globs on the path relative to images_dir (see scan_files).
+    # in_flight runs a single process as a threaded read/convert/write pipeline holding at
+    # most that many images (see run_pipeline); tiled mode already streams and ignores it.
+    # It implies one worker, and cannot be combined with more.
+    from app.domain.services.sketch_conversion import (
+        DEFAULT_OPTIONS,
+        ConversionJob,
+        ConversionOptions,
+    )
+    from app.repositories.sketch_manifest import MANIFEST_FILENAME, SketchManifest, sized_dir
+    from app.utils.profiling import NULL_PROFILER
+    from app.utils.scanner import index_files
+
+    if in_flight and workers is not None and workers > 1:
+        raise ValueError(f"in_flight needs a single worker, got workers={workers}")
+    stages = profiler or NULL_PROFILER
+    options = ConversionOptions(invert, threshold, encoding, compress_level, tile_rows, sizes)
+    manifest = SketchManifest.load(sketch_dir / MANIFEST_FILENAME)
+    params = options.manifest_params()
+    # Sketches from before the manifest were written with the defaults (no --invert).
+    legacy_params = DEFAULT_OPTIONS.manifest_params()
+
+    exists = Path.exists
+    if sources is None:
+        # One sweep over the output trees replaces an exists() per source.
+        with stages.stage("scan"):
+            outputs = index_files(sketch_dir)
+            for size in options.sizes:
+                outputs |= index_files(sized_dir(sketch_dir, size))
+        exists = outputs.__contains__
+
+    def plan() -> Iterator[ConversionJob]:
+        # The scan and the manifest checks run lazily, so each step is timed on its own.
+        scan = _scan_sources(images_dir, sources, include, exclude)
+        while True:
+            with stages.stage("scan"):
+                scanned = next(scan, None)
+            if scanned is None:
+                return
+            relative_path = Path(scanned.key).with_suffix(".png")
+            sketch_path = sketch_dir / relative_path
+            if not force:
+                with stages.stage("manifest-check"):
+                    stale = manifest.needs_processing(
+                        scanned.key,
+                        scanned.path,
+                        sketch_path,
+                        params,
+                        scanned.stat,
+                        exists,
+                        legacy_params,
+                    )
+                if not stale:
+                    continue
+            sized_paths = {
+                size: sized_dir(sketch_dir, size) / relative_path for size in options.sizes
+            }
+            yield ConversionJob(scanned.key, scanned.path, sketch_path, sized_paths)
+
     processed = []
-    for img_path in images_dir.rglob("*"):
-        if img_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            continue
-        relative_path = img_path.relative_to(images_dir)
-        sketch_path = sketch_dir / relative_path.with_suffix(".png")
+    try:
+        # The scan is consumed as conversion runs, so work starts with the first match.
+        results = _convert_all(plan(), options, workers, profiler, in_flight)
+        for (key, img_path, *_), result in results:
+            if isinstance(result, Exception):
+                on_error(img_path, result)
+                continue
+            previous = manifest.record(key, img_path, result, params)
+            outputs = manifest.output_paths(manifest.entries[key])
+            if previous is not None:
+                for stale in sorted(set(manifest.output_paths(previous)) - set(outputs)):
+                    stale.unlink(missing_ok=True)
+                    processed.append(stale)
+            processed.extend(outputs)
+    finally:
+        with stages.stage("manifest"):
+            manifest.save()
+    return processed
 
-        if not force and not needs_processing(img_path, sketch_path):
+
+def process_maps(
+    images_dir: Path,
+    tiles_dir: Path,
+    force: bool = False,
+    invert: bool = False,
+    threshold: float = 0.10,
+    tile_options: "TileOptions | None" = None,
+    workers: int | None = None,
+    on_error: Callable[[Path, Exception], None] = report_failure,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+) -> list[Path]:
+    # Builds a tile pyramid for every grid map (name ending in _<columns>x<rows>) under
+    # images_dir, mirrored into tiles_dir as <map>.dzi plus <map>_files/. Maps whose source
+    # and settings are unchanged are skipped; changed ones only rewrite the tiles that
+    # differ. Returns every file written or deleted.
+    from app.domain.services.image_processing import transparent_alpha
+    from app.domain.services.map_tiles import DEFAULT_TILE_OPTIONS, build_map_tiles, parse_grid
+    from app.domain.services.sketch_conversion import decode_image
+    from app.repositories.sketch_manifest import MANIFEST_FILENAME, SketchManifest
+    from app.utils.scanner import scan_files
+
+    tile_options = tile_options or DEFAULT_TILE_OPTIONS
+    manifest = SketchManifest.load(tiles_dir / MANIFEST_FILENAME)
+    params = {"invert": invert, "threshold": threshold, **tile_options.params()}
+
+    written = []
+    try:
+        for scanned in scan_files(images_dir, SUPPORTED_EXTENSIONS, include, exclude):
+            grid = parse_grid(scanned.path)
+            if grid is None:
+                continue
+            dzi_path = tiles_dir / Path(scanned.key).with_suffix(".dzi")
+            if not force and not manifest.needs_processing(
+                scanned.key, scanned.path, dzi_path, params, scanned.stat
+            ):
+                continue
+            try:
+                alpha = transparent_alpha(decode_image(scanned.path), invert, threshold)
+                result = build_map_tiles(alpha, dzi_path, grid, tile_options, workers)
+            except Exception as e:
+                on_error(scanned.path, e)
+                continue
+            manifest.record(scanned.key, scanned.path, dzi_path, params)
+            written += [*result.written, *result.removed]
+    finally:
+        manifest.save()
+    return written
+
+
+def remove_sketches(images_dir: Path, sketch_dir: Path, removed: Iterable[Path]) -> list[Path]:
+    # Deletes the outputs of every tracked source at or under the removed paths that is gone.
+    from app.repositories.sketch_manifest import MANIFEST_FILENAME, SketchManifest
+
+    manifest = SketchManifest.load(sketch_dir / MANIFEST_FILENAME)
+    deleted = []
+    for path in removed:
+        if not path.is_relative_to(images_dir):
             continue
+        prefix = "" if path == images_dir else path.relative_to(images_dir).as_posix()
+        for key in manifest.keys_under(prefix):
+            if (images_dir / key).exists():
+                continue
+            for output in manifest.output_paths(manifest.remove(key)):
+                if output.exists():
+                    output.unlink()
+                    deleted.append(output)
+    manifest.save()
+    return deleted
 
-        image = Image.open(img_path)
-        result = to_transparent(image, invert=invert)
-        sketch_path.parent.mkdir(parents=True, exist_ok=True)
-        result.save(sketch_path, format="PNG")
-        processed.append(sketch_path)
 
-    return processed
+def sync_images(
+    images_dir: Path, sketch_dir: Path, changed: Iterable[Path], **options
+) -> tuple[list[Path], list[Path]]:
+    # Brings the outputs of the changed paths up to date; returns (written, deleted).
+    changed = set(changed)
+    deleted = remove_sketches(images_dir, sketch_dir, changed)
+    existing = [path for path in changed if path.exists()]
+    changed_outputs = (
+        process_images(images_dir, sketch_dir, sources=existing, **options) if existing else []
+    )
+    written = [path for path in changed_outputs if path.exists()]
+    deleted += [path for path in changed_outputs if not path.exists()]
+    return written, deleted
 
 
-def handle_scale_monster():
+def report_sync(written: list[Path], deleted: list[Path]) -> None:
+    for path in written:
+        print(f"Processed: {path}")
+    for path in deleted:
+        print(f"Removed:   {path}")
+
+
+def watch_images(
+    images_dir: Path,
+    sketch_dir: Path,
+    on_sync: Callable[[list[Path], list[Path]], None] = report_sync,
+    poll_interval: float = 1.0,
+    **options,
+) -> None:
+    # Runs until interrupted. The watch starts before the catch-up pass, so nothing saved in
+    # between is missed; after that only the paths reported by the watcher are looked at.
+    from app.utils.fswatch import debounced, open_watcher
+
+    with open_watcher(images_dir, poll_interval) as watcher:
+        on_sync(*sync_images(images_dir, sketch_dir, [images_dir], **options))
+        for changed in debounced(watcher):
+            on_sync(*sync_images(images_dir, sketch_dir, changed, **options))
+
+
+def _scan_sources(
+    images_dir: Path,
+    sources: Iterable[Path] | None,
+    include: Iterable[str],
+    exclude: Iterable[str],
+) -> "Iterator[ScannedFile]":
+    from app.utils.scanner import scan_files
+
+    if sources is None:
+        yield from scan_files(images_dir, SUPPORTED_EXTENSIONS, include, exclude)
+        return
+    seen = set()
+    for source in sorted(set(sources)):
+        for scanned in scan_files(images_dir, SUPPORTED_EXTENSIONS, include, exclude, source):
+            if scanned.key not in seen:
+                seen.add(scanned.key)
+                yield scanned
+
+
+def _convert_all(
+    jobs: Iterable["ConversionJob"],
+    options: "ConversionOptions",
+    workers: int | None,
+    profiler: "PipelineProfiler | None" = None,
+    in_flight: int | None = None,
+) -> Iterator[tuple["ConversionJob", Path | Exception]]:
+    # Yields (job, output or error) in job order.
+    from app.domain.services.sketch_conversion import convert_image, profiled_convert_image
+
+    # A pool only pays off with more than one job; look that far ahead before starting one.
+    jobs = iter(jobs)
+    head = list(islice(jobs, 2))
+    workers = workers or (1 if in_flight else os.cpu_count()) or 1
+    if workers <= 1 or len(head) <= 1:
+        if in_flight and not options.tile_rows:
+            from app.domain.services.sketch_pipeline import run_pipeline
+
+            yield from run_pipeline(chain(head, jobs), options, in_flight, profiler=profiler)
+            return
+        for job in chain(head, jobs):
+            _, img_path, sketch_path, sized_paths = job
+            try:
+                yield job, convert_image(img_path, sketch_path, options, profiler, sized_paths)
+            except Exception as e:
+                yield job, e
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Workers profile themselves and ship their records back with the result. Jobs are
+    # submitted as the scan produces them.
+    convert = profiled_convert_image if profiler else convert_image
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        submitted = []
+        for job in chain(head, jobs):
+            _, img_path, sketch_path, sized_paths = job
+            future = pool.submit(convert, img_path, sketch_path, options, sized_paths=sized_paths)
+            submitted.append((job, future))
+        for job, future in submitted:
+            error = future.exception()
+            if error is not None:
+                yield job, error
+            elif profiler:
+                output, records = future.result()
+                profiler.extend(records)
+                yield job, output
+            else:
+                yield job, future.result()
+
+
+def _prompt_monster() -> "Monster":
+    from app.domain.models.monster import Monster, MonsterStats
+
     print("Enter monster stats:\n")
     cr = float(input("  Challenge Rating: "))
     ac = int(input("  Armor Class: "))
@@ -47,7 +313,7 @@ def handle_scale_monster():
     save_dc = input("  Save DC (or Enter to skip): ")
     save_dc = int(save_dc) if save_dc else None
 
-    monster = Monster(
+    return Monster(
         stats=MonsterStats(
             challenge_rating=cr,
             armor_class=ac,
@@ -58,6 +324,12 @@ def handle_scale_monster():
         )
     )
 
+
+def handle_scale_monster():
+    from app.domain.services.scale_monster import scale_monster
+
+    monster = _prompt_monster()
+
     target_cr = float(input("\n  Target CR: "))
     scaled = scale_monster(monster, target_cr)
 
@@ -70,3 +342,71 @@ def handle_scale_monster():
     print(f"    XP:         {scaled.xp}")
 
     input("\nPress Enter to continue...")
+
+
+def format_cr(cr: float) -> str:
+    return {0.125: "1/8", 0.25: "1/4", 0.5: "1/2"}.get(cr, f"{cr:g}")
+
+
+def handle_scale_ladder():
+    from app.domain.services.scale_monster import scale_ladder
+
+    ladder = scale_ladder(_prompt_monster())
+
+    print(f"\n  {'CR':>4} {'XP':>8} {'AC':>4} {'HP':>5} {'ATK':>4} {'DMG':>5} {'DC':>4}")
+    for row in ladder:
+        save_dc = "-" if row.save_dc is None else row.save_dc
+        print(
+            f"  {format_cr(row.cr):>4} {row.xp:>8} {row.ac:>4} {row.hp:>5} "
+            f"{'+' + str(row.atk_bonus):>4} {row.damage:>5} {save_dc:>4}"
+        )
+
+    input("\nPress Enter to continue...")
+
+
+def handle_simulate_combat():
+    from app.domain.services.combat_simulation import MONSTERS_WIN, Combatant, simulate_combat
+
+    monster = _prompt_monster()
+    count = int(input("  Number of monsters: ") or 1)
+
+    print("\nEnter party member stats (every member is the same):\n")
+    size = int(input("  Party size: ") or 4)
+    member = Combatant(
+        ac=int(input("  Armor Class: ")),
+        hp=int(input("  Hit Points: ")),
+        atk_bonus=int(input("  Attack Bonus: ")),
+        damage=int(input("  Damage/Round: ")),
+    )
+    encounters = int(input("\n  Encounters to simulate (default 10000): ") or 10_000)
+
+    result = simulate_combat([member] * size, [monster] * count, encounters=encounters)
+
+    print(f"\n  {result.encounters} encounters:")
+    print(f"    Party wins:     {result.party_win_rate:.1%}")
+    print(f"    Monsters win:   {result.monster_win_rate:.1%}")
+    print(f"    Draws:          {result.draw_rate:.1%}")
+    print(f"    Rounds to kill monsters: {result.rounds_to_kill():.1f}")
+    print(f"    Rounds to kill party:    {result.rounds_to_kill(MONSTERS_WIN):.1f}")
+
+    input("\nPress Enter to continue...")
+
+
+def handle_build_encounter():
+    from app.domain.services.encounter_builder import encounter_index
+    from app.repositories.cr_repo import CR_TABLE
+    from app.repositories.encounter_repo import Difficulty, encounter_budget
+
+    levels = [int(level) for level in input("  Party levels (e.g. 5 5 4 3): ").split()]
+    difficulty = Difficulty(input("  Difficulty (easy/medium/hard/deadly): ").strip().lower())
+    max_monsters = int(input("  Max monsters (default 8): ") or 8)
+    shown = int(input("  Encounters to show (default 10): ") or 10)
+
+    index = encounter_index(CR_TABLE.crs, levels, difficulty, max_monsters)
+    low, high = encounter_budget(levels, difficulty)
+    print(f"\n  {index.count} {difficulty} encounters ({low}-{high} adjusted XP), e.g.:")
+    for plan in sorted(index.sample(shown), key=lambda plan: plan.adjusted_xp):
+        mix = ", ".join(f"{count} x CR {format_cr(cr)}" for cr, count in plan.counts)
+        print(f"    {plan.adjusted_xp:>7} XP  {mix}")
+
+    input("\nPress Enter to continue...")
@@ -3,7 +3,14 @@
 import os
 from pathlib import Path
 
-from app.cli.handlers import handle_scale_monster, process_images
+from app.cli.handlers import (
+    handle_build_encounter,
+    handle_scale_ladder,
+    handle_scale_monster,
+    handle_simulate_combat,
+    process_images,
+    watch_images,
+)
 
 
 def clear():
@@ -29,6 +36,20 @@ def handle_process_images():
     input("\nPress Enter to continue...")
 
 
+def handle_watch_images():
+    base_dir = Path(__file__).parent.parent.parent
+    images_dir = base_dir / "res" / "images"
+    sketch_dir = base_dir / "res" / "sketch"
+
+    print(f"Watching {images_dir} (Ctrl+C to stop)...\n")
+    try:
+        watch_images(images_dir, sketch_dir)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+    input("\nPress Enter to continue...")
+
+
 def main():
     # in app/cli/menu.py
 
@@ -36,6 +57,10 @@ def main():
     actions = {
         "1": ("Scale monster", handle_scale_monster),
         "2": ("Process sketch images", handle_process_images),
+        "3": ("Scale monster to every CR", handle_scale_ladder),
+        "4": ("Watch sketch images", handle_watch_images),
+        "5": ("Simulate combat", handle_simulate_combat),
+        "6": ("Build encounter", handle_build_encounter),
         "0": ("Exit", None),
     }
 
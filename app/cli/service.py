@@ -0,0 +1,348 @@
+# app/cli/service.py
+
+# A long-lived local HTTP/JSON service for tools that call us many times per session:
+#
+#   python -m app.cli.service --port 8765
+#
+#   GET  /health                    status, cache and queue counters
+#   POST /scale                     {"target_cr": 5, "monster": {...}} or {"monsters": [...]}
+#   POST /sketch?invert=1&encoding=la-png   image bytes in, transparent sketch bytes out
+#
+# Imports, the CR table and the worker processes are set up once at start. Sketches run on
+# a process pool behind a bounded queue: when it is full the service answers 503 with
+# Retry-After instead of piling up work. Successful responses are cached by the content of
+# the request, so repeated calls for the same monster or image cost a dictionary lookup.
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from app.domain.models.monster import MonsterStatsValidationException
+from app.domain.models.monster_table import STAT_COLUMNS, to_records, validate_stat_columns
+from app.domain.services.scale_monster import scale_monsters
+from app.domain.services.sketch_conversion import ConversionOptions, convert_bytes
+from app.domain.services.sketch_encoding import EncodingPolicy, SketchEncoding
+
+DEFAULT_PORT = 8765
+MAX_QUEUE = 16
+CACHE_BYTES = 64 * 2**20
+MAX_BODY_BYTES = 64 * 2**20
+JOB_TIMEOUT = 60.0
+_CONTENT_TYPES = {".png": "image/png", ".webp": "image/webp"}
+_TRUE = {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class Response:
+    status: int
+    content_type: str
+    body: bytes
+    headers: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def json(cls, payload: object, status: int = 200, headers=()) -> "Response":
+        return cls(status, "application/json", json.dumps(payload).encode(), tuple(headers))
+
+    @classmethod
+    def error(cls, status: int, message: str, headers=()) -> "Response":
+        return cls.json({"error": message}, status, headers)
+
+
+class ResponseCache:
+    # LRU over response bodies, bounded by their total size; safe to share between threads.
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._entries: OrderedDict[bytes, Response] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Response | None:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: bytes, response: Response) -> None:
+        size = len(response.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous.body)
+            self._entries[key] = response
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted.body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class SketchService:
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_queue: int = MAX_QUEUE,
+        cache_bytes: int = CACHE_BYTES,
+    ):
+        self.cache = ResponseCache(cache_bytes)
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._workers = workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(workers)
+        # Start every worker now, so the first requests do not pay for process start-up
+        # and imports.
+        for future in [self._pool.submit(_warm) for _ in range(workers)]:
+            future.result()
+        scale_monsters(_WARM_MONSTER, 1)
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def handle(self, method: str, target: str, body: bytes = b"") -> Response:
+        url = urlsplit(target)
+        route = (method, url.path.rstrip("/") or "/")
+        if route == ("GET", "/health"):
+            return Response.json(
+                {
+                    "status": "ok",
+                    "cache": self.cache.stats(),
+                    "queue": {"queued": self._queued, "max": self.max_queue},
+                }
+            )
+        handlers = {("POST", "/scale"): self._scale, ("POST", "/sketch"): self._sketch}
+        handler = handlers.get(route)
+        if handler is None:
+            return Response.error(404, f"No route for {method} {url.path}")
+
+        key = hashlib.blake2b(
+            b"\0".join([method.encode(), url.path.encode(), _canonical_query(url.query), body]),
+            digest_size=16,
+        ).digest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = handler(parse_qs(url.query), body)
+        if response.status == 200:
+            self.cache.put(key, response)
+        return response
+
+    def _scale(self, query: dict, body: bytes) -> Response:
+        try:
+            payload = json.loads(body)
+            single = "monster" in payload
+            monsters = [payload["monster"]] if single else payload["monsters"]
+            columns = validate_stat_columns(
+                {name: [monster.get(name) for monster in monsters] for name in STAT_COLUMNS}
+            )
+            scaled = scale_monsters(columns, payload["target_cr"])
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            return Response.error(400, f"Invalid request: {e!r}")
+        except MonsterStatsValidationException as e:
+            return Response.error(400, str(e))
+
+        rows = to_records(scaled)
+        return Response.json({"monster": rows[0]} if single else {"monsters": rows})
+
+    def _sketch(self, query: dict, body: bytes) -> Response:
+        try:
+            options = ConversionOptions(
+                invert=query.get("invert", [""])[-1].lower() in _TRUE,
+                threshold=float(query.get("threshold", ["0.10"])[-1]),
+                encoding=_encoding(query.get("encoding", [SketchEncoding.RGBA_PNG])[-1]),
+                compress_level=int(query.get("compress_level", ["6"])[-1]),
+            )
+            if not 0 <= options.compress_level <= 9:
+                raise ValueError(f"compress_level must be 0-9, got {options.compress_level}")
+        except ValueError as e:
+            return Response.error(400, f"Invalid options: {e}")
+        if not body:
+            return Response.error(400, "Send the image as the request body")
+
+        if not self._slots.acquire(blocking=False):
+            return Response.error(503, "Queue is full", [("Retry-After", "1")])
+        with self._lock:
+            self._queued += 1
+        pool = self._pool
+        try:
+            future = pool.submit(convert_bytes, body, options)
+        except BrokenProcessPool:
+            self._release_slot()
+            return self._replace_pool(pool)
+        except Exception as e:
+            self._release_slot()
+            return Response.error(500, f"Conversion failed: {e!r}")
+        # The slot is held until the job itself ends: a timed-out job keeps its worker busy.
+        future.add_done_callback(self._release_slot)
+        try:
+            encoded = future.result(JOB_TIMEOUT)
+        except FutureTimeoutError:
+            return Response.error(504, "Conversion timed out")
+        except BrokenProcessPool:
+            return self._replace_pool(pool)
+        except OSError as e:
+            return Response.error(400, f"Cannot read image: {e}")
+        except Exception as e:
+            return Response.error(500, f"Conversion failed: {e!r}")
+        return Response(
+            200,
+            _CONTENT_TYPES[encoded.suffix],
+            encoded.data,
+            (("X-Sketch-Encoding", str(encoded.encoding)),),
+        )
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> Response:
+        # A worker died (e.g. killed for running out of memory), which breaks the whole
+        # pool. The first request to notice starts a new one; the jobs lost with the old
+        # one are answered like a full queue, so clients retry.
+        with self._lock:
+            if self._pool is broken:
+                self._pool = ProcessPoolExecutor(self._workers)
+                broken.shutdown(wait=False, cancel_futures=True)
+        return Response.error(503, "A worker crashed", [("Retry-After", "1")])
+
+    def _release_slot(self, future: Future | None = None) -> None:
+        with self._lock:
+            self._queued -= 1
+        self._slots.release()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, and headers and body are separate writes: without TCP_NODELAY every
+    # response waits for the client's delayed ACK.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._respond(self.server.service.handle("GET", self.path))
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._respond(Response.error(413, f"Body larger than {MAX_BODY_BYTES} bytes"))
+            return
+        body = self.rfile.read(length)
+        self._respond(self.server.service.handle("POST", self.path, body))
+
+    def _respond(self, response: Response) -> None:
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(response.body)))
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(
+    service: SketchService, host: str = "127.0.0.1", port: int = DEFAULT_PORT, verbose=False
+) -> ThreadingHTTPServer:
+    # port=0 binds a free port; see server.server_address.
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def _warm() -> None:
+    # Runs once per worker; importing convert_bytes already loaded PIL and NumPy.
+    convert_bytes(_WARM_IMAGE)
+
+
+def _canonical_query(query: str) -> bytes:
+    return json.dumps(sorted(parse_qs(query).items())).encode()
+
+
+def _encoding(value: str) -> str:
+    try:
+        return EncodingPolicy(value)
+    except ValueError:
+        return SketchEncoding(value)
+
+
+def _tiny_png() -> bytes:
+    import io
+
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("L", (4, 4), 255).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+_WARM_IMAGE = _tiny_png()
+_WARM_MONSTER = {
+    "challenge_rating": [1],
+    "armor_class": [13],
+    "hit_points": [75],
+    "attack_bonus": [4],
+    "damage": [10],
+    "save_dc": [13],
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve monster scaling and sketch conversion.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Sketch worker processes.")
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=MAX_QUEUE,
+        help="Sketch jobs accepted at once; more get 503 (default: %(default)s).",
+    )
+    parser.add_argument("--cache-mb", type=int, default=CACHE_BYTES // 2**20)
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args(argv)
+
+    with SketchService(args.workers, args.max_queue, args.cache_mb * 2**20) as service:
+        server = make_server(service, args.host, args.port, args.verbose)
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
 
-from app.repositories.cr_repo import MONSTER_STATISTICS_BY_CHALLENGE_RATING, CRColumn
+from app.repositories.cr_repo import CR_TABLE, CRColumn
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MonsterStats:
     challenge_rating: float
     armor_class: int
@@ -14,22 +14,60 @@ class MonsterStats:
 
 
 class Monster:
+    __slots__ = ("cr", "xp", "proficiency_bonus", "ac", "hp", "atk_bonus", "damage", "save_dc")
+
     def __init__(self, stats: MonsterStats):
-        self.cr, self.xp, self.proficiency_bonus = self._lookup_cr_stats(stats.challenge_rating)
-        self.ac = self._ensure_positive_int(stats.armor_class, "Armor class")
-        self.hp = self._ensure_positive_int(stats.hit_points, "Hit points")
-        self.atk_bonus = self._ensure_positive_int(stats.attack_bonus, "Attack bonus")
-        self.damage = self._ensure_positive_int(stats.damage, "Damage")
-        self.save_dc = self._ensure_optional_positive_int(stats.save_dc, "Save DC")
+        cr, xp, proficiency_bonus = self._lookup_cr_stats(stats.challenge_rating)
+        values = (
+            cr,
+            xp,
+            proficiency_bonus,
+            self._ensure_positive_int(stats.armor_class, "Armor class"),
+            self._ensure_positive_int(stats.hit_points, "Hit points"),
+            self._ensure_positive_int(stats.attack_bonus, "Attack bonus"),
+            self._ensure_positive_int(stats.damage, "Damage"),
+            self._ensure_optional_positive_int(stats.save_dc, "Save DC"),
+        )
+        for name, value in zip(self.__slots__, values, strict=True):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Monster):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self) -> int:
+        return hash(self._astuple())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Monster({fields})"
+
+    def to_stats(self) -> MonsterStats:
+        return MonsterStats(
+            challenge_rating=self.cr,
+            armor_class=self.ac,
+            hit_points=self.hp,
+            attack_bonus=self.atk_bonus,
+            damage=self.damage,
+            save_dc=self.save_dc,
+        )
+
+    def _astuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
 
     def _lookup_cr_stats(self, challenge_rating: float) -> tuple[float, int, int]:
-        row = MONSTER_STATISTICS_BY_CHALLENGE_RATING[
-            MONSTER_STATISTICS_BY_CHALLENGE_RATING[CRColumn.CR] == challenge_rating
-        ]
-        if row.empty:
+        index = CR_TABLE.index_of(challenge_rating)
+        if index is None:
             raise MonsterStatsValidationException(f"Invalid challenge rating: {challenge_rating}")
-        r = row.iloc[0]
-        return challenge_rating, int(r[CRColumn.XP]), int(r[CRColumn.PROF_BONUS])
+        row = CR_TABLE.row_at(index)
+        return challenge_rating, row[CRColumn.XP], row[CRColumn.PROF_BONUS]
 
     def _ensure_positive_int(self, value: int, name: str) -> int:
         if type(value) is not int:
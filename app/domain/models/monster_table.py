@@ -0,0 +1,234 @@
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.repositories.cr_repo import CR_TABLE, CRColumn
+
+STAT_COLUMNS = (
+    "challenge_rating",
+    "armor_class",
+    "hit_points",
+    "attack_bonus",
+    "damage",
+    "save_dc",
+)
+MONSTER_COLUMNS = ("challenge_rating", "xp", "proficiency_bonus", *STAT_COLUMNS[1:])
+
+_POSITIVE_INT_COLUMNS = {
+    "armor_class": "Armor class",
+    "hit_points": "Hit points",
+    "attack_bonus": "Attack bonus",
+    "damage": "Damage",
+    "save_dc": "Save DC",
+}
+
+
+def check_stat_columns(
+    columns: Mapping[str, ArrayLike],
+) -> tuple[dict[str, np.ndarray], dict[int, str]]:
+    # Validates a whole batch at once and returns the normalized columns plus the first
+    # error of every invalid row. Missing save DCs are NaN; every other stat is int64.
+    # Without a challenge_rating column only the stats are checked (and no xp is added).
+    errors: dict[int, str] = {}
+    normalized = {}
+    if "challenge_rating" in columns:
+        crs = np.asarray(columns["challenge_rating"], dtype=np.float64)
+        cr_rows = CR_TABLE.indices(crs)
+        for row in np.flatnonzero(cr_rows < 0):
+            errors[int(row)] = f"Invalid challenge rating: {crs[row]}"
+        normalized["challenge_rating"] = crs
+
+    for name, label in _POSITIVE_INT_COLUMNS.items():
+        values = np.asarray(columns[name])
+        if values.dtype == object:
+            values = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        missing = np.zeros(values.shape, dtype=bool)
+        if not np.issubdtype(values.dtype, np.integer):
+            values = values.astype(np.float64)
+            missing = np.isnan(values) if name == "save_dc" else missing
+            present = values[~missing]
+            for row in np.flatnonzero(~missing)[(present != np.trunc(present)) | np.isnan(present)]:
+                errors.setdefault(int(row), f"{label} must be an integer, got {values[row]}")
+
+        for row in np.flatnonzero(~missing & (values <= 0)):
+            errors.setdefault(int(row), f"{label} must be greater than 0, got {values[row]}")
+
+        if name == "save_dc":
+            normalized[name] = values.astype(np.float64)
+        else:
+            normalized[name] = np.nan_to_num(values).astype(np.int64)
+
+    if "challenge_rating" not in normalized:
+        return normalized, errors
+    valid_rows = np.where(cr_rows < 0, 0, cr_rows)
+    normalized["xp"] = CR_TABLE.column(CRColumn.XP)[valid_rows]
+    normalized["proficiency_bonus"] = CR_TABLE.column(CRColumn.PROF_BONUS)[valid_rows]
+    return normalized, errors
+
+
+def validate_stat_columns(columns: Mapping[str, ArrayLike]) -> dict[str, np.ndarray]:
+    normalized, errors = check_stat_columns(columns)
+    if errors:
+        first = min(errors)
+        raise MonsterStatsValidationException(
+            f"{len(errors)} invalid rows (e.g. rows {sorted(errors)[:10]}); "
+            f"row {first}: {errors[first]}"
+        )
+    return normalized
+
+
+def to_records(columns: Mapping[str, np.ndarray]) -> list[dict]:
+    # Normalized columns as plain Python rows, e.g. for JSON or CSV: whole CRs as ints and
+    # missing save DCs as None.
+    values = {name: columns[name].tolist() for name in MONSTER_COLUMNS}
+    values["challenge_rating"] = [
+        int(cr) if cr.is_integer() else cr for cr in values["challenge_rating"]
+    ]
+    values["save_dc"] = [None if dc != dc else int(dc) for dc in values["save_dc"]]
+    return [
+        dict(zip(MONSTER_COLUMNS, row, strict=True)) for row in zip(*values.values(), strict=True)
+    ]
+
+
+def columns_like(stats, columns: dict[str, np.ndarray]):
+    # columns as a DataFrame on the same index when stats came in as one; else unchanged.
+    # A DataFrame can only have been passed in if pandas is already imported.
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(stats, pd.DataFrame):
+        return pd.DataFrame(columns, index=stats.index)
+    return columns
+
+
+class MonsterTable:
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns: Mapping[str, ArrayLike]):
+        self._set_columns(validate_stat_columns(columns))
+
+    @classmethod
+    def from_normalized(cls, columns: Mapping[str, np.ndarray]) -> "MonsterTable":
+        # For columns that already went through validate_stat_columns (or were derived
+        # from validated ones); skips validation.
+        table = cls.__new__(cls)
+        table._set_columns(columns)
+        return table
+
+    @classmethod
+    def from_monsters(cls, monsters: Iterable[Monster]) -> "MonsterTable":
+        monsters = list(monsters)
+        columns = {
+            "challenge_rating": np.array([m.cr for m in monsters], dtype=np.float64),
+            "xp": np.array([m.xp for m in monsters], dtype=np.int64),
+            "proficiency_bonus": np.array([m.proficiency_bonus for m in monsters], dtype=np.int64),
+            "armor_class": np.array([m.ac for m in monsters], dtype=np.int64),
+            "hit_points": np.array([m.hp for m in monsters], dtype=np.int64),
+            "attack_bonus": np.array([m.atk_bonus for m in monsters], dtype=np.int64),
+            "damage": np.array([m.damage for m in monsters], dtype=np.int64),
+            "save_dc": np.array(
+                [np.nan if m.save_dc is None else m.save_dc for m in monsters], dtype=np.float64
+            ),
+        }
+        return cls.from_normalized(columns)
+
+    def _set_columns(self, columns: Mapping[str, np.ndarray]) -> None:
+        frozen = {}
+        for name in MONSTER_COLUMNS:
+            values = np.ascontiguousarray(columns[name])
+            values.flags.writeable = False
+            frozen[name] = values
+        self._columns = frozen
+        self._length = len(frozen["challenge_rating"])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator["MonsterRow"]:
+        return (MonsterRow(self, i) for i in range(self._length))
+
+    def __getitem__(self, index: int) -> "MonsterRow":
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MonsterTable index out of range")
+        return MonsterRow(self, index)
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def columns(self) -> dict[str, np.ndarray]:
+        return dict(self._columns)
+
+    def take(self, indices: ArrayLike) -> "MonsterTable":
+        return MonsterTable.from_normalized(
+            {name: values[indices] for name, values in self._columns.items()}
+        )
+
+    def to_monsters(self) -> list[Monster]:
+        return [row.to_monster() for row in self]
+
+
+class MonsterRow:
+    # A zero-copy view of one table row exposing the same attributes as Monster.
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: MonsterTable, index: int):
+        self._table = table
+        self._index = index
+
+    def _get(self, name: str):
+        return self._table._columns[name][self._index]
+
+    @property
+    def cr(self) -> float:
+        return float(self._get("challenge_rating"))
+
+    @property
+    def xp(self) -> int:
+        return int(self._get("xp"))
+
+    @property
+    def proficiency_bonus(self) -> int:
+        return int(self._get("proficiency_bonus"))
+
+    @property
+    def ac(self) -> int:
+        return int(self._get("armor_class"))
+
+    @property
+    def hp(self) -> int:
+        return int(self._get("hit_points"))
+
+    @property
+    def atk_bonus(self) -> int:
+        return int(self._get("attack_bonus"))
+
+    @property
+    def damage(self) -> int:
+        return int(self._get("damage"))
+
+    @property
+    def save_dc(self) -> int | None:
+        save_dc = self._get("save_dc")
+        return None if np.isnan(save_dc) else int(save_dc)
+
+    def to_stats(self) -> MonsterStats:
+        return MonsterStats(
+            challenge_rating=self.cr,
+            armor_class=self.ac,
+            hit_points=self.hp,
+            attack_bonus=self.atk_bonus,
+            damage=self.damage,
+            save_dc=self.save_dc,
+        )
+
+    def to_monster(self) -> Monster:
+        return Monster(self.to_stats())
+
+    def __repr__(self) -> str:
+        # Not through Monster: rows scaled to fractional CRs are not valid Monsters.
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in Monster.__slots__)
+        return f"MonsterRow({self._index}, {fields})"
@@ -0,0 +1,87 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.domain.models.monster import Monster
+from app.domain.models.monster_table import (
+    STAT_COLUMNS,
+    MonsterTable,
+    columns_like,
+    validate_stat_columns,
+)
+from app.repositories.cr_repo import CR_TABLE, CRColumn
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# The inverse of scaling: which CR do a monster's stats actually fight like? Defensive CR
+# comes from the HP range the hit points fall in, offensive CR from the damage range, and
+# each moves one CR per 2 points that AC / attack bonus differ from the table's value.
+EFFECTIVE_CR_COLUMNS = ("defensive_cr", "offensive_cr", "effective_cr")
+
+
+@dataclass(frozen=True, slots=True)
+class EffectiveCR:
+    defensive: float
+    offensive: float
+    effective: float
+
+
+def _range_indices(values: np.ndarray, column_max: CRColumn) -> np.ndarray:
+    # The ranges are contiguous, so the first row whose max is >= value contains it; values
+    # above the last row count as the last row.
+    maxima = CR_TABLE.column(column_max)
+    return np.minimum(np.searchsorted(maxima, values), len(maxima) - 1)
+
+
+def _adjustments(values: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    # One step per full 2 points of difference, rounded toward zero.
+    return np.trunc((values - expected) / 2).astype(np.int64)
+
+
+def _shift(indices: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    return np.clip(indices + steps, 0, len(CR_TABLE.crs) - 1)
+
+
+def effective_crs(
+    stats: "MonsterTable | Mapping[str, ArrayLike] | pd.DataFrame",
+) -> "dict[str, np.ndarray] | pd.DataFrame":
+    # challenge_rating is not needed (and ignored if present). Offense uses the save DC
+    # instead of the attack bonus where that rates the monster higher; missing save DCs
+    # (NaN) fall back to the attack bonus.
+    if isinstance(stats, MonsterTable):
+        columns = stats.columns()
+    else:
+        columns = validate_stat_columns({name: stats[name] for name in STAT_COLUMNS[1:]})
+    crs = CR_TABLE.column(CRColumn.CR)
+
+    hp_idx = _range_indices(columns["hit_points"], CRColumn.HP_MAX)
+    ac_steps = _adjustments(columns["armor_class"], CR_TABLE.column(CRColumn.AC)[hp_idx])
+    defensive_idx = _shift(hp_idx, ac_steps)
+
+    dmg_idx = _range_indices(columns["damage"], CRColumn.DMG_MAX)
+    atk_steps = _adjustments(columns["attack_bonus"], CR_TABLE.column(CRColumn.ATK)[dmg_idx])
+    save_dc = columns["save_dc"]
+    has_save = ~np.isnan(save_dc)
+    save_steps = _adjustments(
+        np.where(has_save, save_dc, 0), CR_TABLE.column(CRColumn.SAVE)[dmg_idx]
+    )
+    offensive_idx = _shift(
+        dmg_idx, np.where(has_save, np.maximum(atk_steps, save_steps), atk_steps)
+    )
+
+    defensive, offensive = crs[defensive_idx], crs[offensive_idx]
+    result = {
+        "defensive_cr": defensive,
+        "offensive_cr": offensive,
+        "effective_cr": crs[CR_TABLE.nearest_indices((defensive + offensive) / 2)],
+    }
+    return columns_like(stats, result)
+
+
+def effective_cr(monster: Monster) -> EffectiveCR:
+    result = effective_crs(MonsterTable.from_monsters([monster]))
+    return EffectiveCR(*(float(result[name][0]) for name in EFFECTIVE_CR_COLUMNS))
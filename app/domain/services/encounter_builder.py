@@ -0,0 +1,240 @@
+# app/domain/services/encounter_builder.py
+
+# Finds every mix of monster CRs whose adjusted XP lands in a party's budget. Monsters of the
+# same CR are interchangeable for the budget, so the search runs over the pool's distinct XP
+# values: a counting DP gives, for every prefix of those values, how many multisets of k
+# monsters add up to each XP total. From that table the feasible encounters can be counted,
+# listed without dead ends, or sampled uniformly, without trying combinations one by one.
+#
+# Only the counts over all values are kept. Listing just needs to know which (prefix, k,
+# total) states are reachable, one bit each; sampling peels values off the final counts
+# again, which is exact because every DP step can be subtracted back out.
+
+import math
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.domain.models.monster import Monster
+from app.domain.models.monster_table import MonsterRow, MonsterTable
+from app.repositories.cr_repo import CR_TABLE, CRColumn
+from app.repositories.encounter_repo import Difficulty, encounter_budget, encounter_multiplier
+
+# An index holds (max_monsters + 1) x (raw XP / gcd + 1) counts of 8 bytes plus one bit per
+# value for each of them: about 9 MB for eight level 20 characters, every CR and 20
+# monsters, well under 1 MB for a typical party. Recently used indexes are kept up to a
+# total size.
+INDEX_CACHE_BYTES = 64 * 2**20
+MAX_MONSTERS = 20
+
+
+@dataclass(frozen=True)
+class EncounterPlan:
+    counts: tuple[tuple[float, int], ...]  # (cr, number of monsters), highest CR first
+    xp: int
+    adjusted_xp: int
+
+    @property
+    def monsters(self) -> int:
+        return sum(count for _, count in self.counts)
+
+
+class EncounterIndex:
+    def __init__(
+        self, crs: tuple[float, ...], budget: tuple[int, int], max_monsters: int, party_size: int
+    ):
+        self.crs = crs
+        self.budget = budget
+        self.party_size = party_size
+        self._xps = CR_TABLE.column(CRColumn.XP)[CR_TABLE.indices(crs)]
+        self._unit = math.gcd(*self._xps.tolist())
+        steps = self._xps // self._unit
+        low, high = budget
+
+        multipliers = np.array(
+            [0.0] + [encounter_multiplier(k, party_size) for k in range(1, max_monsters + 1)]
+        )
+        # ways[k, s]: multisets of k monsters drawn from the values so far whose XP adds up
+        # to s units. k monsters never need more raw XP than high / their multiplier, nor
+        # more than k of the largest value.
+        max_units = max(
+            min(k * int(steps.max()), int(high / multipliers[k]) // self._unit)
+            for k in range(1, max_monsters + 1)
+        )
+        ways = np.zeros((max_monsters + 1, max_units + 1), dtype=np.int64)
+        ways[0, 0] = 1
+        # reachable[j]: ways > 0 after the first j values, bit-packed along s.
+        reachable = [np.packbits(ways > 0, axis=-1)]
+        for step in steps.tolist():
+            for k in range(1, max_monsters + 1):
+                ways[k, step:] += ways[k - 1, : max_units + 1 - step]
+            reachable.append(np.packbits(ways > 0, axis=-1))
+        ways.flags.writeable = False
+        self._ways = ways
+        self._reachable = np.stack(reachable)
+
+        adjusted = np.outer(multipliers, np.arange(max_units + 1) * self._unit)
+        feasible = (adjusted >= low) & (adjusted <= high) & (ways > 0)
+        feasible[0] = False
+        self._cells = np.argwhere(feasible)
+        self._cell_ways = ways[feasible]
+        self._multipliers = multipliers
+
+    @property
+    def nbytes(self) -> int:
+        return self._ways.nbytes + self._reachable.nbytes + self._cells.nbytes
+
+    @property
+    def count(self) -> int:
+        return int(self._cell_ways.sum())
+
+    def plans(self, limit: int | None = None) -> Iterator[EncounterPlan]:
+        # Fewest monsters first, then lowest XP; every branch taken leads to a plan.
+        emitted = 0
+        for k, units in self._cells.tolist():
+            for counts in self._expand(len(self.crs), k, units):
+                if limit is not None and emitted >= limit:
+                    return
+                yield self._plan(counts, k, units)
+                emitted += 1
+
+    def sample(self, n: int = 1, seed: int | None = None) -> list[EncounterPlan]:
+        # Uniform over all feasible plans, by walking the DP table backwards.
+        if not self.count:
+            return []
+        rng = np.random.default_rng(seed)
+        cells = rng.choice(len(self._cells), size=n, p=self._cell_ways / self._cell_ways.sum())
+        steps = (self._xps // self._unit).tolist()
+        walks = [self._cells[cell].tolist() for cell in cells.tolist()]
+        remaining = [list(walk) for walk in walks]
+        counts = [[0] * len(steps) for _ in walks]
+        ways = self._ways
+        for j in reversed(range(len(steps))):
+            # Counts over the first j values: undo the DP step that added value j.
+            step = steps[j]
+            previous = ways.copy()
+            previous[1:, step:] -= ways[:-1, : ways.shape[1] - step]
+            ways = previous
+            for walk, (remaining_k, remaining_units) in enumerate(remaining):
+                taken = np.arange(remaining_k + 1)
+                left = remaining_units - taken * step
+                taken, left = taken[left >= 0], left[left >= 0]
+                weights = ways[remaining_k - taken, left].astype(np.float64)
+                pick = int(taken[rng.choice(len(taken), p=weights / weights.sum())])
+                counts[walk][j] = pick
+                remaining[walk] = [remaining_k - pick, remaining_units - pick * step]
+        return [
+            self._plan(walk_counts, k, units)
+            for walk_counts, (k, units) in zip(counts, walks, strict=True)
+        ]
+
+    def _expand(self, j: int, k: int, units: int) -> Iterator[list[int]]:
+        # Counts for the first j values that make k monsters worth `units` together.
+        if j == 0:
+            yield []
+            return
+        step = int(self._xps[j - 1]) // self._unit
+        for taken in range(min(k, units // step) + 1):
+            if self._is_reachable(j - 1, k - taken, units - taken * step):
+                for counts in self._expand(j - 1, k - taken, units - taken * step):
+                    yield [*counts, taken]
+
+    def _is_reachable(self, j: int, k: int, units: int) -> bool:
+        return bool(self._reachable[j, k, units >> 3] >> (7 - (units & 7)) & 1)
+
+    def _plan(self, counts: Sequence[int], k: int, units: int) -> EncounterPlan:
+        xp = units * self._unit
+        return EncounterPlan(
+            counts=tuple(
+                (cr, count)
+                for cr, count in reversed(list(zip(self.crs, counts, strict=True)))
+                if count
+            ),
+            xp=xp,
+            adjusted_xp=int(xp * self._multipliers[k]),
+        )
+
+
+def encounter_index(
+    crs: Iterable[float],
+    party_levels: Sequence[int],
+    difficulty: Difficulty | str,
+    max_monsters: int = 8,
+) -> EncounterIndex:
+    if not 1 <= max_monsters <= MAX_MONSTERS:
+        raise ValueError(f"max_monsters must be between 1 and {MAX_MONSTERS}")
+    crs = tuple(sorted({float(cr) for cr in crs}))
+    invalid = [cr for cr in crs if cr not in CR_TABLE]
+    if invalid or not crs:
+        raise ValueError(f"Invalid challenge ratings: {invalid or 'none given'}")
+    budget = encounter_budget(party_levels, difficulty)
+    return _encounter_index(crs, budget, max_monsters, len(party_levels))
+
+
+_cache: OrderedDict[tuple, EncounterIndex] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _encounter_index(
+    crs: tuple[float, ...], budget: tuple[int, int], max_monsters: int, party_size: int
+) -> EncounterIndex:
+    key = (crs, budget, max_monsters, party_size)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+    # Monsters above the whole budget can never be part of an encounter.
+    high = budget[1] / encounter_multiplier(1, party_size)
+    affordable = tuple(cr for cr in crs if CR_TABLE.row(cr)[CRColumn.XP] <= high) or crs[:1]
+    index = EncounterIndex(affordable, budget, max_monsters, party_size)
+    with _cache_lock:
+        _cache[key] = index
+        # The newest index is kept even if it alone is over the limit.
+        while len(_cache) > 1 and sum(i.nbytes for i in _cache.values()) > INDEX_CACHE_BYTES:
+            _cache.popitem(last=False)
+    return index
+
+
+class EncounterBuilder:
+    def __init__(self, pool: MonsterTable | Iterable[Monster | MonsterRow], max_monsters: int = 8):
+        self.max_monsters = max_monsters
+        self._by_cr: dict[float, list[Monster | MonsterRow]] = defaultdict(list)
+        for monster in pool:
+            self._by_cr[float(monster.cr)].append(monster)
+        if not self._by_cr:
+            raise ValueError("The monster pool is empty")
+
+    def index(self, party_levels: Sequence[int], difficulty: Difficulty | str) -> EncounterIndex:
+        return encounter_index(self._by_cr, party_levels, difficulty, self.max_monsters)
+
+    def plans(
+        self,
+        party_levels: Sequence[int],
+        difficulty: Difficulty | str,
+        limit: int | None = None,
+    ) -> Iterator[EncounterPlan]:
+        return self.index(party_levels, difficulty).plans(limit)
+
+    def sample(
+        self,
+        party_levels: Sequence[int],
+        difficulty: Difficulty | str,
+        n: int = 1,
+        seed: int | None = None,
+    ) -> list[list[Monster | MonsterRow]]:
+        # Plans are uniform over CR mixes; monsters of a CR are then drawn from the pool.
+        rng = np.random.default_rng(seed)
+        plans = self.index(party_levels, difficulty).sample(n, seed=rng.integers(2**63))
+        return [
+            [
+                group[i]
+                for cr, count in plan.counts
+                for group in (self._by_cr[cr],)
+                for i in rng.integers(len(group), size=count).tolist()
+            ]
+            for plan in plans
+        ]
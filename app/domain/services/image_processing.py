@@ -1,29 +1,60 @@
 # app/domain/services/image_processing.py
 
+from collections.abc import Iterable
+
 import numpy as np
-from PIL import Image, ImageOps
+from PIL import Image
 
 
 def to_transparent(
     image: Image.Image, invert: bool = False, threshold: float = 0.10
+) -> Image.Image:
+    return alpha_to_rgba(transparent_alpha(image, invert=invert, threshold=threshold))
+
+
+def transparent_alpha(
+    image: Image.Image, invert: bool = False, threshold: float = 0.10
 ) -> Image.Image:
     gray = image.convert("L")
-    if invert:
-        gray = ImageOps.invert(gray)
+    return gray.point(alpha_lut(gray.histogram(), invert=invert, threshold=threshold))
+
 
-    alpha = np.array(ImageOps.invert(gray), dtype=np.float64) / 255.0
+def alpha_to_rgba(alpha: Image.Image) -> Image.Image:
+    # Sketches are black ink; all information lives in the alpha channel.
+    rgba = Image.new("RGBA", alpha.size, (0, 0, 0, 0))
+    rgba.putalpha(alpha)
+    return rgba
+
+
+def downscale_chain(image: Image.Image, sizes: Iterable[int]) -> dict[int, Image.Image]:
+    # Fits the image inside each size (longest edge, never upscaled). Every level is reduced
+    # from the previous, larger one, and reducing_gap lets PIL box-reduce by an integer
+    # factor before the final Lanczos pass, so each step only touches a few pixels.
+    levels = {}
+    for size in sorted(set(sizes), reverse=True):
+        scale = size / max(image.size)
+        if scale < 1:
+            target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        levels[size] = image
+    return levels
+
+
+def alpha_lut(histogram: list[int], invert: bool = False, threshold: float = 0.10) -> list[int]:
+    # Maps each gray level straight to its output alpha. The float math is done on the
+    # 256 levels instead of on every pixel, so results match the per-pixel formula exactly.
+    levels = np.arange(256)
+    alpha = (levels if invert else 255 - levels) / 255.0
 
     mask = alpha >= threshold
-    alpha[~mask] = 0.0
-    if mask.any():
-        lo = alpha[mask].min()
-        hi = alpha[mask].max()
+    present = mask & (np.asarray(histogram[:256]) > 0)
+    out = np.zeros(256)
+    if present.any():
+        lo = alpha[present].min()
+        hi = alpha[present].max()
         if hi > lo:
-            alpha[mask] = (alpha[mask] - lo) / (hi - lo)
+            out[mask] = np.clip((alpha[mask] - lo) / (hi - lo), 0.0, 1.0)
         else:
-            alpha[mask] = 1.0
+            out[mask] = 1.0
 
-    alpha_img = Image.fromarray((alpha * 255).astype(np.uint8), mode="L")
-    rgba = Image.new("RGBA", gray.size, (0, 0, 0, 0))
-    rgba.putalpha(alpha_img)
-    return rgba
+    return (out * 255).astype(np.uint8).tolist()
@@ -0,0 +1,189 @@
+# app/domain/services/map_tiles.py
+
+# Cuts a transparent battle map into a Deep Zoom (DZI) pyramid: level L is the map scaled
+# to fit 2**L pixels, down to 1x1, and every level is cut into tile_size tiles that
+# overlap their neighbours by `overlap` pixels. Optionally every grid cell is also written
+# as its own image. A digest of each tile's pixels is kept next to the tiles, so a re-run
+# only encodes tiles whose pixels changed.
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from app.domain.services.image_processing import alpha_to_rgba
+from app.domain.services.sketch_encoding import SUFFIXES, SketchEncoding, encode_sketch
+
+# "map_24x44.png" is 24 cells wide and 44 cells high.
+GRID_PATTERN = re.compile(r"_(\d+)x(\d+)$")
+TILE_DIGESTS_FILENAME = ".tiles.json"
+
+
+@dataclass(frozen=True)
+class TileOptions:
+    tile_size: int = 256
+    overlap: int = 1
+    cells: bool = False
+    encoding: str = SketchEncoding.RGBA_PNG
+    compress_level: int = 6
+
+    def __post_init__(self):
+        if self.tile_size < 1 or self.overlap < 0:
+            raise ValueError(f"Invalid tile size {self.tile_size} or overlap {self.overlap}")
+        SketchEncoding(self.encoding)
+
+    def params(self) -> dict:
+        return {
+            "tile_size": self.tile_size,
+            "overlap": self.overlap,
+            "cells": self.cells,
+            "encoding": str(self.encoding),
+            "compress_level": self.compress_level,
+        }
+
+
+DEFAULT_TILE_OPTIONS = TileOptions()
+
+
+@dataclass
+class TileResult:
+    written: list[Path]
+    skipped: int
+    removed: list[Path]
+
+
+def parse_grid(path: Path) -> tuple[int, int] | None:
+    # (columns, rows) from the file name, or None for images that are not grid maps.
+    match = GRID_PATTERN.search(path.stem)
+    if match is None:
+        return None
+    columns, rows = int(match[1]), int(match[2])
+    return (columns, rows) if columns > 0 and rows > 0 else None
+
+
+def pyramid_sizes(width: int, height: int) -> list[tuple[int, int]]:
+    # Image size at every level, index = level; the last one is the full image.
+    max_level = math.ceil(math.log2(max(width, height, 1)))
+    return [
+        (math.ceil(width / 2 ** (max_level - level)), math.ceil(height / 2 ** (max_level - level)))
+        for level in range(max_level + 1)
+    ]
+
+
+def tile_boxes(width: int, height: int, tile_size: int, overlap: int) -> Iterator[tuple]:
+    # (column, row, box) for every tile of one level, box including the overlap.
+    for row in range(math.ceil(height / tile_size)):
+        for column in range(math.ceil(width / tile_size)):
+            left = column * tile_size - (overlap if column else 0)
+            top = row * tile_size - (overlap if row else 0)
+            right = min(width, (column + 1) * tile_size + overlap)
+            bottom = min(height, (row + 1) * tile_size + overlap)
+            yield column, row, (left, top, right, bottom)
+
+
+def cell_boxes(width: int, height: int, grid: tuple[int, int]) -> Iterator[tuple]:
+    # (column, row, box) for every grid cell; edges are rounded so the cells tile exactly.
+    columns, rows = grid
+    for row in range(rows):
+        for column in range(columns):
+            yield (
+                column,
+                row,
+                (
+                    round(column * width / columns),
+                    round(row * height / rows),
+                    round((column + 1) * width / columns),
+                    round((row + 1) * height / rows),
+                ),
+            )
+
+
+def build_map_tiles(
+    alpha: Image.Image,
+    dzi_path: Path,
+    grid: tuple[int, int] | None = None,
+    options: TileOptions = DEFAULT_TILE_OPTIONS,
+    workers: int | None = None,
+) -> TileResult:
+    # Writes dzi_path, its <stem>_files/<level>/<column>_<row> tiles and, with options.cells
+    # and a grid, <stem>_cells/<row>_<column> crops. alpha is the map's transparency at full
+    # size; everything is derived from it, so the map is converted once. result.written
+    # holds the .dzi, the digest file and the tiles that were (re)encoded.
+    files_dir = dzi_path.with_name(f"{dzi_path.stem}_files")
+    cells_dir = dzi_path.with_name(f"{dzi_path.stem}_cells")
+    suffix = SUFFIXES[SketchEncoding(options.encoding)]
+
+    crops = []
+    level = alpha
+    sizes = pyramid_sizes(*alpha.size)
+    for index in reversed(range(len(sizes))):
+        if level.size != sizes[index]:
+            level = level.resize(sizes[index], Image.Resampling.LANCZOS, reducing_gap=2.0)
+        for column, row, box in tile_boxes(*level.size, options.tile_size, options.overlap):
+            crops.append((files_dir / str(index) / f"{column}_{row}{suffix}", level, box))
+    if options.cells and grid is not None:
+        for column, row, box in cell_boxes(*alpha.size, grid):
+            crops.append((cells_dir / f"{row}_{column}{suffix}", alpha, box))
+
+    digests_path = dzi_path.with_name(f"{dzi_path.stem}{TILE_DIGESTS_FILENAME}")
+    previous = _load_digests(digests_path)
+    root = dzi_path.parent
+
+    def write(crop: tuple[Path, Image.Image, tuple]) -> tuple[str, str, bool]:
+        path, image, box = crop
+        tile = image.crop(box)
+        key = path.relative_to(root).as_posix()
+        digest = hashlib.blake2b(
+            f"{tile.size}".encode() + tile.tobytes(), digest_size=16
+        ).hexdigest()
+        if previous.get(key) == digest and path.exists():
+            return key, digest, False
+        encoded = encode_sketch(alpha_to_rgba(tile), options.encoding, options.compress_level)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(encoded.data)
+        return key, digest, True
+
+    with ThreadPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        outcomes = list(pool.map(write, crops))
+
+    digests = {key: digest for key, digest, _ in outcomes}
+    removed = []
+    for key in previous.keys() - digests.keys():
+        stale = root / key
+        if stale.exists():
+            stale.unlink()
+            removed.append(stale)
+
+    _write_dzi(dzi_path, *alpha.size, options, suffix)
+    digests_path.write_text(json.dumps(dict(sorted(digests.items())), indent=1) + "\n")
+    return TileResult(
+        written=[dzi_path, digests_path, *(root / key for key, _, changed in outcomes if changed)],
+        skipped=sum(not changed for _, _, changed in outcomes),
+        removed=removed,
+    )
+
+
+def _write_dzi(path: Path, width: int, height: int, options: TileOptions, suffix: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008"'
+        f' TileSize="{options.tile_size}" Overlap="{options.overlap}"'
+        f' Format="{suffix.lstrip(".")}">\n'
+        f'  <Size Width="{width}" Height="{height}"/>\n'
+        "</Image>\n"
+    )
+
+
+def _load_digests(path: Path) -> dict[str, str]:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
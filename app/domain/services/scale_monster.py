@@ -1,13 +1,30 @@
-from app.domain.models.monster import Monster, MonsterStats
-from app.repositories.cr_repo import MONSTER_STATISTICS_BY_CHALLENGE_RATING, CRColumn
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.domain.models.monster_table import (
+    STAT_COLUMNS,
+    MonsterRow,
+    MonsterTable,
+    columns_like,
+    validate_stat_columns,
+)
+from app.repositories.cr_curves import CR_CURVES
+from app.repositories.cr_repo import CR_TABLE, CRColumn
 from app.utils.math import inverse_lerp, lerp
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+LADDER_CACHE_SIZE = 256
 
-def _lookup_cr_row(cr: float) -> dict:
-    row = MONSTER_STATISTICS_BY_CHALLENGE_RATING[
-        MONSTER_STATISTICS_BY_CHALLENGE_RATING[CRColumn.CR] == cr
-    ]
-    return {col: int(val) for col, val in row.iloc[0].items()}
+
+def _lookup_cr_row(cr: float) -> Mapping[CRColumn, float | int]:
+    return CR_TABLE.row(cr)
 
 
 def _scale_offset(value: int, source_expected: int, target_expected: int) -> int:
@@ -50,3 +67,203 @@ def scale_monster(monster: Monster, target_cr: float) -> Monster:
             save_dc=_scale_offset(monster.save_dc, source[CRColumn.SAVE], target[CRColumn.SAVE]),
         )
     )
+
+
+def _cr_row_indices(crs: np.ndarray, name: str) -> np.ndarray:
+    indices = CR_TABLE.indices(crs)
+    invalid = np.flatnonzero(indices < 0)
+    if invalid.size:
+        raise MonsterStatsValidationException(
+            f"Invalid {name} in rows {invalid[:10].tolist()}: {crs[invalid[:10]].tolist()}"
+        )
+    return indices
+
+
+def _scale_offsets(
+    values: np.ndarray, source_expected: np.ndarray, target_expected: np.ndarray
+) -> np.ndarray:
+    return np.maximum(1, target_expected + (values - source_expected))
+
+
+def _scale_ranges(
+    values: np.ndarray,
+    source_min: np.ndarray,
+    source_max: np.ndarray,
+    target_min: np.ndarray,
+    target_max: np.ndarray,
+) -> np.ndarray:
+    t = inverse_lerp(values, source_min, source_max)
+    return np.maximum(1, np.trunc(lerp(t, target_min, target_max)).astype(np.int64))
+
+
+def scale_monsters(
+    stats: "MonsterTable | Mapping[str, ArrayLike] | pd.DataFrame", target_cr: ArrayLike
+) -> "MonsterTable | dict[str, np.ndarray] | pd.DataFrame":
+    if isinstance(stats, MonsterTable):
+        columns = stats.columns()
+    else:
+        columns = validate_stat_columns({name: stats[name] for name in STAT_COLUMNS})
+    source_cr = columns["challenge_rating"]
+    target_cr = np.broadcast_to(np.asarray(target_cr, dtype=np.float64), source_cr.shape)
+
+    # Tables skip validation, but may hold fractional CRs from scale_monsters_fractional.
+    source_idx = _cr_row_indices(source_cr, "challenge rating")
+    target_idx = _cr_row_indices(target_cr, "target challenge rating")
+
+    columns_used = [col for col in CR_TABLE.columns if col != CRColumn.CR]
+    source = {col: CR_TABLE.column(col)[source_idx] for col in columns_used}
+    target = {col: CR_TABLE.column(col)[target_idx] for col in columns_used}
+
+    result = {
+        "challenge_rating": target_cr.copy(),
+        "xp": target[CRColumn.XP],
+        "proficiency_bonus": target[CRColumn.PROF_BONUS],
+        "armor_class": _scale_offsets(
+            columns["armor_class"], source[CRColumn.AC], target[CRColumn.AC]
+        ),
+        "hit_points": _scale_ranges(
+            columns["hit_points"],
+            source[CRColumn.HP_MIN],
+            source[CRColumn.HP_MAX],
+            target[CRColumn.HP_MIN],
+            target[CRColumn.HP_MAX],
+        ),
+        "attack_bonus": _scale_offsets(
+            columns["attack_bonus"], source[CRColumn.ATK], target[CRColumn.ATK]
+        ),
+        "damage": _scale_ranges(
+            columns["damage"],
+            source[CRColumn.DMG_MIN],
+            source[CRColumn.DMG_MAX],
+            target[CRColumn.DMG_MIN],
+            target[CRColumn.DMG_MAX],
+        ),
+        # Missing save DCs are NaN and stay NaN through the offset.
+        "save_dc": _scale_offsets(columns["save_dc"], source[CRColumn.SAVE], target[CRColumn.SAVE]),
+    }
+
+    return _like(stats, result)
+
+
+def _like(stats, result: dict[str, np.ndarray]):
+    # result in the container type the stats came in.
+    if isinstance(stats, MonsterTable):
+        return MonsterTable.from_normalized(result)
+    return columns_like(stats, result)
+
+
+def _curve_crs(crs: ArrayLike, name: str) -> np.ndarray:
+    crs = np.asarray(crs, dtype=np.float64)
+    invalid = np.flatnonzero(np.isnan(CR_CURVES.xp(crs)))
+    if invalid.size:
+        raise MonsterStatsValidationException(
+            f"Invalid {name} in rows {invalid[:10].tolist()}: {crs[invalid[:10]].tolist()}"
+        )
+    return crs
+
+
+def _round_offsets(
+    values: np.ndarray, source_expected: np.ndarray, target_expected: np.ndarray
+) -> np.ndarray:
+    # Expected values between rows are fractional; the result is rounded half up.
+    return np.floor(_scale_offsets(values, source_expected, target_expected) + 0.5)
+
+
+def scale_monsters_fractional(
+    stats: "MonsterTable | Mapping[str, ArrayLike] | pd.DataFrame", target_cr: ArrayLike
+) -> "MonsterTable | dict[str, np.ndarray] | pd.DataFrame":
+    # scale_monsters for any source and target CRs from 0 to 30, with the expected stats
+    # read off CR_CURVES; XP and proficiency bonus are interpolated and rounded. At the
+    # table's own CRs the results match scale_monsters. Rows at CRs between the table's
+    # cannot become Monster objects or go into the bestiary; MonsterRow and to_records
+    # take them.
+    if isinstance(stats, MonsterTable):
+        columns = stats.columns()
+    else:
+        columns = validate_stat_columns({name: stats[name] for name in STAT_COLUMNS[1:]})
+        columns["challenge_rating"] = stats["challenge_rating"]
+    source_cr = _curve_crs(columns["challenge_rating"], "challenge rating")
+    target_cr = np.broadcast_to(np.asarray(target_cr, dtype=np.float64), source_cr.shape)
+    target_cr = _curve_crs(target_cr, "target challenge rating")
+
+    columns_used = [col for col in CR_TABLE.columns if col != CRColumn.CR]
+    source = {col: CR_CURVES.values(col, source_cr) for col in columns_used}
+    target = {col: CR_CURVES.values(col, target_cr) for col in columns_used}
+
+    result = {
+        "challenge_rating": target_cr.copy(),
+        "xp": np.floor(target[CRColumn.XP] + 0.5).astype(np.int64),
+        "proficiency_bonus": np.floor(target[CRColumn.PROF_BONUS] + 0.5).astype(np.int64),
+        "armor_class": _round_offsets(
+            columns["armor_class"], source[CRColumn.AC], target[CRColumn.AC]
+        ).astype(np.int64),
+        "hit_points": _scale_ranges(
+            columns["hit_points"],
+            source[CRColumn.HP_MIN],
+            source[CRColumn.HP_MAX],
+            target[CRColumn.HP_MIN],
+            target[CRColumn.HP_MAX],
+        ),
+        "attack_bonus": _round_offsets(
+            columns["attack_bonus"], source[CRColumn.ATK], target[CRColumn.ATK]
+        ).astype(np.int64),
+        "damage": _scale_ranges(
+            columns["damage"],
+            source[CRColumn.DMG_MIN],
+            source[CRColumn.DMG_MAX],
+            target[CRColumn.DMG_MIN],
+            target[CRColumn.DMG_MAX],
+        ),
+        "save_dc": _round_offsets(columns["save_dc"], source[CRColumn.SAVE], target[CRColumn.SAVE]),
+    }
+    return _like(stats, result)
+
+
+def scale_monsters_to_xp(
+    stats: "MonsterTable | Mapping[str, ArrayLike] | pd.DataFrame", target_xp: ArrayLike
+) -> "MonsterTable | dict[str, np.ndarray] | pd.DataFrame":
+    # E.g. 25% tougher: scale_monsters_to_xp(table, table.column("xp") * 1.25).
+    target_xp = np.asarray(target_xp, dtype=np.float64)
+    target_cr = CR_CURVES.crs_for_xp(target_xp)
+    invalid = np.flatnonzero(np.isnan(target_cr))
+    if invalid.size:
+        raise MonsterStatsValidationException(
+            f"Invalid target XP in rows {invalid[:10].tolist()}: "
+            f"{target_xp.ravel()[invalid[:10]].tolist()}"
+        )
+    return scale_monsters_fractional(stats, target_cr)
+
+
+def _single_row(monster: Monster | MonsterRow) -> dict[str, np.ndarray]:
+    save_dc = np.nan if monster.save_dc is None else monster.save_dc
+    return {
+        "challenge_rating": np.array([monster.cr], dtype=np.float64),
+        "armor_class": np.array([monster.ac]),
+        "hit_points": np.array([monster.hp]),
+        "attack_bonus": np.array([monster.atk_bonus]),
+        "damage": np.array([monster.damage]),
+        "save_dc": np.array([save_dc], dtype=np.float64),
+    }
+
+
+def scale_monster_fractional(monster: Monster | MonsterRow, target_cr: float) -> MonsterRow:
+    scaled = scale_monsters_fractional(_single_row(monster), [target_cr])
+    return MonsterTable.from_normalized(scaled)[0]
+
+
+def scale_monster_to_xp(monster: Monster | MonsterRow, target_xp: float) -> MonsterRow:
+    scaled = scale_monsters_to_xp(_single_row(monster), [target_xp])
+    return MonsterTable.from_normalized(scaled)[0]
+
+
+def scale_ladder(monster: Monster | MonsterRow) -> MonsterTable:
+    return _scale_ladder(monster.to_stats())
+
+
+@lru_cache(maxsize=LADDER_CACHE_SIZE)
+def _scale_ladder(stats: MonsterStats) -> MonsterTable:
+    # One source row broadcast against every CR in the table; the returned table is
+    # read-only, so cached results can be shared between callers.
+    targets = CR_TABLE.column(CRColumn.CR)
+    source = MonsterTable.from_monsters([Monster(stats)]).take(np.zeros(len(targets), dtype=int))
+    return scale_monsters(source, targets)
@@ -0,0 +1,213 @@
+# app/domain/services/sketch_conversion.py
+
+import io
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+from app.domain.services.image_processing import (
+    alpha_to_rgba,
+    downscale_chain,
+    transparent_alpha,
+)
+from app.domain.services.sketch_encoding import (
+    EncodedSketch,
+    SketchEncoding,
+    choose_encoding,
+    encode_sketch,
+)
+from app.domain.services.tiled_processing import (
+    PNG_COLOR_TYPE_LA,
+    PNG_COLOR_TYPE_RGBA,
+    to_transparent_tiled,
+)
+from app.utils.profiling import NULL_PROFILER, PipelineProfiler, StageRecord
+
+_TILED_COLOR_TYPES = {
+    SketchEncoding.RGBA_PNG: PNG_COLOR_TYPE_RGBA,
+    SketchEncoding.LA_PNG: PNG_COLOR_TYPE_LA,
+}
+
+
+@dataclass(frozen=True)
+class ConversionOptions:
+    invert: bool = False
+    threshold: float = 0.10
+    encoding: str = SketchEncoding.RGBA_PNG
+    compress_level: int = 6
+    tile_rows: int | None = None
+    sizes: tuple[int, ...] = ()
+
+    def __post_init__(self):
+        if any(size < 1 for size in self.sizes):
+            raise ValueError(f"Output sizes must be positive, got {self.sizes}")
+        object.__setattr__(self, "sizes", tuple(sorted(set(self.sizes), reverse=True)))
+
+    def manifest_params(self) -> dict:
+        # Only settings that change the output; tile_rows just changes how it is produced.
+        params = {
+            "invert": self.invert,
+            "threshold": self.threshold,
+            "encoding": str(self.encoding),
+            "compress_level": self.compress_level,
+        }
+        # Left out when unused so manifests written before sizes existed stay valid.
+        if self.sizes:
+            params["sizes"] = list(self.sizes)
+        return params
+
+
+DEFAULT_OPTIONS = ConversionOptions()
+
+
+class ConversionJob(NamedTuple):
+    key: str
+    img_path: Path
+    sketch_path: Path
+    sized_paths: dict[int, Path]
+
+
+def convert_image(
+    img_path: Path,
+    sketch_path: Path,
+    options: ConversionOptions = DEFAULT_OPTIONS,
+    profiler: PipelineProfiler | None = None,
+    sized_paths: Mapping[int, Path] | None = None,
+) -> Path:
+    # sketch_path's suffix is replaced by the one of the encoding actually written; the
+    # downscaled copies for options.sizes go to sized_paths with that same suffix.
+    profiler = profiler or NULL_PROFILER
+    sized_paths = sized_paths or {}
+    file = str(img_path)
+
+    if options.tile_rows:
+        return _convert_tiled(img_path, sketch_path, options, profiler, sized_paths)
+
+    image = decode_image(img_path, profiler)
+    alpha = convert_decoded(image, options, profiler, file)
+    return write_sketch(alpha, sketch_path, options, profiler, file, sized_paths)
+
+
+# The stages of convert_image, for callers that run them on separate threads.
+
+
+def decode_image(img_path: Path, profiler: PipelineProfiler | None = None) -> Image.Image:
+    with (profiler or NULL_PROFILER).stage("decode", str(img_path)) as record:
+        image = Image.open(img_path)
+        image.load()
+        record.pixels = image.width * image.height
+    return image
+
+
+def convert_decoded(
+    image: Image.Image,
+    options: ConversionOptions = DEFAULT_OPTIONS,
+    profiler: PipelineProfiler | None = None,
+    file: str = "",
+) -> Image.Image:
+    with (profiler or NULL_PROFILER).stage("convert", file) as record:
+        alpha = transparent_alpha(image, invert=options.invert, threshold=options.threshold)
+        record.pixels = alpha.width * alpha.height
+    return alpha
+
+
+def write_sketch(
+    alpha: Image.Image,
+    sketch_path: Path,
+    options: ConversionOptions = DEFAULT_OPTIONS,
+    profiler: PipelineProfiler | None = None,
+    file: str = "",
+    sized_paths: Mapping[int, Path] | None = None,
+) -> Path:
+    profiler = profiler or NULL_PROFILER
+    with profiler.stage("encode", file) as record:
+        encoded = choose_encoding(alpha_to_rgba(alpha), options.encoding, options.compress_level)
+        output = _write(sketch_path, encoded)
+        record.pixels = alpha.width * alpha.height
+    if options.sizes:
+        # Transparency is computed once at full size; smaller sizes only resample the alpha.
+        with profiler.stage("resize", file) as record:
+            levels = downscale_chain(alpha, options.sizes)
+            record.pixels = sum(level.width * level.height for level in levels.values())
+        _write_sizes(levels, sized_paths or {}, encoded.encoding, options, profiler, file)
+    return output
+
+
+def profiled_convert_image(
+    img_path: Path,
+    sketch_path: Path,
+    options: ConversionOptions,
+    sized_paths: Mapping[int, Path] | None = None,
+) -> tuple[Path, list[StageRecord]]:
+    with PipelineProfiler() as profiler:
+        output = convert_image(img_path, sketch_path, options, profiler, sized_paths)
+    return output, profiler.records
+
+
+def convert_bytes(data: bytes, options: ConversionOptions = DEFAULT_OPTIONS) -> EncodedSketch:
+    # In-memory convert_image for callers that hold the file contents, e.g. a service.
+    # options.sizes and options.tile_rows do not apply to a single in-memory result.
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    alpha = transparent_alpha(image, invert=options.invert, threshold=options.threshold)
+    return choose_encoding(alpha_to_rgba(alpha), options.encoding, options.compress_level)
+
+
+def _write(path: Path, encoded: EncodedSketch) -> Path:
+    output = path.with_suffix(encoded.suffix)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(encoded.data)
+    return output
+
+
+def _write_sizes(
+    levels: Mapping[int, Image.Image],
+    sized_paths: Mapping[int, Path],
+    encoding: SketchEncoding | str,
+    options: ConversionOptions,
+    profiler: PipelineProfiler,
+    file: str,
+) -> None:
+    # Every size reuses the encoding of the full image, so all copies share its suffix.
+    missing = set(options.sizes) - set(sized_paths)
+    if missing:
+        raise ValueError(f"No output path for sizes {sorted(missing)}")
+    with profiler.stage("encode", file) as record:
+        for size, alpha in levels.items():
+            encoded = encode_sketch(alpha_to_rgba(alpha), encoding, options.compress_level)
+            _write(sized_paths[size], encoded)
+        record.pixels = sum(level.width * level.height for level in levels.values())
+
+
+def _convert_tiled(
+    img_path: Path,
+    sketch_path: Path,
+    options: ConversionOptions,
+    profiler: PipelineProfiler,
+    sized_paths: Mapping[int, Path],
+) -> Path:
+    color_type = _TILED_COLOR_TYPES.get(options.encoding)
+    if color_type is None:
+        supported = ", ".join(_TILED_COLOR_TYPES)
+        raise ValueError(f"Tiled mode only writes {supported}, not {options.encoding}")
+
+    output = sketch_path.with_suffix(".png")
+    with profiler.stage("tiled", str(img_path)) as record:
+        with Image.open(img_path) as image:
+            record.pixels = image.width * image.height
+        levels = to_transparent_tiled(
+            img_path,
+            output,
+            options.invert,
+            options.threshold,
+            options.tile_rows,
+            color_type,
+            options.compress_level,
+            options.sizes,
+        )
+    if options.sizes:
+        _write_sizes(levels, sized_paths, options.encoding, options, profiler, str(img_path))
+    return output
@@ -0,0 +1,110 @@
+# app/domain/services/sketch_encoding.py
+
+import io
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+
+from PIL import Image, features
+
+
+class SketchEncoding(StrEnum):
+    RGBA_PNG = "rgba-png"
+    LA_PNG = "la-png"
+    PALETTE_PNG = "palette-png"
+    WEBP_LOSSLESS = "webp-lossless"
+
+
+class EncodingPolicy(StrEnum):
+    SMALLEST = "smallest"
+    FASTEST = "fastest"
+
+
+SUFFIXES = {
+    SketchEncoding.RGBA_PNG: ".png",
+    SketchEncoding.LA_PNG: ".png",
+    SketchEncoding.PALETTE_PNG: ".png",
+    SketchEncoding.WEBP_LOSSLESS: ".webp",
+}
+
+_ENCODINGS = frozenset(SketchEncoding)
+# Side length of the crop that the "fastest" policy times each candidate on.
+_PROBE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class EncodedSketch:
+    encoding: SketchEncoding
+    data: bytes
+    seconds: float
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[self.encoding]
+
+
+def available_encodings() -> list[SketchEncoding]:
+    encodings = [SketchEncoding.RGBA_PNG, SketchEncoding.LA_PNG, SketchEncoding.PALETTE_PNG]
+    if features.check("webp"):
+        encodings.append(SketchEncoding.WEBP_LOSSLESS)
+    return encodings
+
+
+def encode_sketch(
+    rgba: Image.Image, encoding: SketchEncoding | str, compress_level: int = 6
+) -> EncodedSketch:
+    # Every encoding decodes back to the same RGBA pixels: black ink with the given alpha.
+    encoding = SketchEncoding(encoding)
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    if encoding == SketchEncoding.RGBA_PNG:
+        rgba.save(buffer, format="PNG", compress_level=compress_level)
+    elif encoding == SketchEncoding.LA_PNG:
+        alpha = rgba.getchannel("A")
+        Image.merge("LA", (Image.new("L", rgba.size, 0), alpha)).save(
+            buffer, format="PNG", compress_level=compress_level
+        )
+    elif encoding == SketchEncoding.PALETTE_PNG:
+        # Palette index == alpha value; every entry is black with matching transparency.
+        indexed = rgba.getchannel("A")
+        indexed.putpalette(bytes(768))
+        indexed.save(
+            buffer, format="PNG", compress_level=compress_level, transparency=bytes(range(256))
+        )
+    else:
+        rgba.save(
+            buffer,
+            format="WEBP",
+            lossless=True,
+            exact=True,
+            method=round(compress_level * 6 / 9),
+            quality=compress_level * 100 / 9,
+        )
+    return EncodedSketch(encoding, buffer.getvalue(), time.perf_counter() - start)
+
+
+def choose_encoding(
+    rgba: Image.Image,
+    policy: EncodingPolicy | SketchEncoding | str,
+    compress_level: int = 6,
+    candidates: list[SketchEncoding] | None = None,
+) -> EncodedSketch:
+    if policy in _ENCODINGS:
+        return encode_sketch(rgba, policy, compress_level)
+
+    policy = EncodingPolicy(policy)
+    candidates = candidates or available_encodings()
+    if policy == EncodingPolicy.SMALLEST:
+        encoded = [encode_sketch(rgba, c, compress_level) for c in candidates]
+        return min(encoded, key=lambda e: len(e.data))
+
+    probe = rgba.crop(_probe_box(rgba.size))
+    timings = {c: encode_sketch(probe, c, compress_level).seconds for c in candidates}
+    return encode_sketch(rgba, min(timings, key=timings.get), compress_level)
+
+
+def _probe_box(size: tuple[int, int]) -> tuple[int, int, int, int]:
+    width, height = size
+    w, h = min(width, _PROBE_SIZE), min(height, _PROBE_SIZE)
+    left, top = (width - w) // 2, (height - h) // 2
+    return left, top, left + w, top + h
@@ -0,0 +1,97 @@
+# app/domain/services/sketch_pipeline.py
+
+# Overlaps disk and CPU inside one process: reader threads open and decode upcoming images,
+# one thread converts, and writer threads encode and write finished sketches. PIL releases
+# the GIL while decoding, converting and compressing, so the stages run side by side and
+# throughput approaches that of the slowest stage instead of the sum of all of them.
+
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+
+from app.domain.services.sketch_conversion import (
+    ConversionJob,
+    ConversionOptions,
+    convert_decoded,
+    decode_image,
+    write_sketch,
+)
+from app.utils.profiling import PipelineProfiler
+
+
+def run_pipeline(
+    jobs: Iterable[ConversionJob],
+    options: ConversionOptions,
+    max_in_flight: int = 4,
+    readers: int = 2,
+    writers: int = 2,
+    profiler: PipelineProfiler | None = None,
+) -> Iterator[tuple[ConversionJob, Path | Exception]]:
+    # Yields (job, output or error) in job order. Jobs are pulled lazily, and no more than
+    # max_in_flight images are between decode and write at any time, which bounds memory.
+    # Stage timings are recorded per file as usual; memory peaks overlap between threads.
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+    slots = threading.BoundedSemaphore(max_in_flight)
+    pending: deque[tuple[ConversionJob, Future]] = deque()
+
+    with ExitStack() as stack:
+        read_pool = stack.enter_context(ThreadPoolExecutor(readers, "sketch-read"))
+        convert_pool = stack.enter_context(ThreadPoolExecutor(1, "sketch-convert"))
+        write_pool = stack.enter_context(ThreadPoolExecutor(writers, "sketch-write"))
+
+        for job in jobs:
+            while pending and pending[0][1].done():
+                yield _outcome(*pending.popleft())
+            slots.acquire()
+            file = str(job.img_path)
+            decoded = read_pool.submit(decode_image, job.img_path, profiler)
+            convert = partial(convert_decoded, options=options, profiler=profiler, file=file)
+            converted = _then(convert_pool, decoded, convert)
+            write = partial(
+                write_sketch,
+                sketch_path=job.sketch_path,
+                options=options,
+                profiler=profiler,
+                file=file,
+                sized_paths=job.sized_paths,
+            )
+            written = _then(write_pool, converted, write)
+            written.add_done_callback(lambda _: slots.release())
+            pending.append((job, written))
+
+        while pending:
+            yield _outcome(*pending.popleft())
+
+
+def _then(pool: ThreadPoolExecutor, upstream: Future, fn: Callable) -> Future:
+    # Runs fn on the result of upstream in pool; an upstream error skips fn and is passed on.
+    downstream = Future()
+
+    def submit(done: Future) -> None:
+        try:
+            inner = pool.submit(fn, done.result())
+        except BaseException as e:
+            downstream.set_exception(e)
+            return
+        inner.add_done_callback(partial(_settle, downstream))
+
+    upstream.add_done_callback(submit)
+    return downstream
+
+
+def _settle(target: Future, source: Future) -> None:
+    error = source.exception()
+    if error is None:
+        target.set_result(source.result())
+    else:
+        target.set_exception(error)
+
+
+def _outcome(job: ConversionJob, future: Future) -> tuple[ConversionJob, Path | Exception]:
+    error = future.exception()
+    return job, error if error is not None else future.result()
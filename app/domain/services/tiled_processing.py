@@ -0,0 +1,182 @@
+# app/domain/services/tiled_processing.py
+
+import struct
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+from PIL import Image
+
+from app.domain.services.image_processing import alpha_lut, downscale_chain
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_COLOR_TYPE_LA = 4
+PNG_COLOR_TYPE_RGBA = 6
+_CHANNELS = {PNG_COLOR_TYPE_LA: 2, PNG_COLOR_TYPE_RGBA: 4}
+# The PIL mode of each 8-bit PNG color type, which is also its raw mode.
+_READ_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+_CHUNK_HEADER = struct.Struct(">I4s")
+
+
+class PngStripWriter:
+    def __init__(
+        self,
+        f: BinaryIO,
+        width: int,
+        height: int,
+        color_type: int = PNG_COLOR_TYPE_RGBA,
+        compress_level: int = 6,
+    ):
+        self._f = f
+        self._compressor = zlib.compressobj(compress_level)
+        f.write(PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        # Every scanline is prefixed with filter type 0 (None).
+        filtered = np.zeros((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 1:] = rows
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_chunk(self, kind: bytes, data: bytes) -> None:
+        self._f.write(struct.pack(">I", len(data)))
+        self._f.write(kind)
+        self._f.write(data)
+        self._f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+
+class PngStripReader:
+    # Reads an 8-bit, non-interlaced PNG a strip of rows at a time; other PNGs raise
+    # ValueError. Inflating stops at the end of each strip, so even a highly compressed
+    # chunk never expands past one strip. PIL's PNG decoder does the unfiltering: each
+    # strip goes in behind its previous row, stored unfiltered, so the Up, Average and
+    # Paeth filters of its first row see the right neighbours.
+    def __init__(self, path: Path):
+        self.path = path
+        self._palette = None
+        with open(path, "rb") as f:
+            if f.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+                raise ValueError(f"{path} is not a PNG")
+            while True:
+                kind, data = _read_chunk(f)
+                if kind == b"IHDR":
+                    width, height, depth, color_type, _, _, interlace = struct.unpack(
+                        ">IIBBBBB", data
+                    )
+                elif kind == b"PLTE":
+                    self._palette = data
+                elif kind in (b"IDAT", b"IEND"):
+                    break
+            self._idat_offset = f.tell() - len(data) - _CHUNK_HEADER.size - 4
+        if depth != 8 or interlace or color_type not in _READ_MODES:
+            raise ValueError(f"{path} is not an 8-bit non-interlaced PNG")
+        self.mode = _READ_MODES[color_type]
+        self.size = (width, height)
+        self._stride = width * len(self.mode)
+
+    def strips(self, tile_rows: int) -> Iterator[Image.Image]:
+        width, height = self.size
+        previous = bytes(self._stride)
+        with open(self.path, "rb") as f:
+            f.seek(self._idat_offset)
+            inflater = zlib.decompressobj()
+            pending = b""
+            for top in range(0, height, tile_rows):
+                rows = min(tile_rows, height - top)
+                filtered = bytearray(b"\0" + previous)
+                needed = len(filtered) + rows * (self._stride + 1)
+                while len(filtered) < needed:
+                    if not pending:
+                        kind, pending = _read_chunk(f)
+                        if kind != b"IDAT":
+                            raise ValueError(f"{self.path} ends before its last row")
+                    filtered += inflater.decompress(pending, needed - len(filtered))
+                    pending = inflater.unconsumed_tail
+
+                data = zlib.compress(filtered, 0)
+                del filtered
+                strip = Image.frombytes(self.mode, (width, rows + 1), data, "zip", self.mode)
+                previous = strip.crop((0, rows, width, rows + 1)).tobytes()
+                strip = strip.crop((0, 1, width, rows + 1))
+                if self._palette is not None and self.mode == "P":
+                    strip.putpalette(self._palette)
+                yield strip
+
+
+def _read_chunk(f: BinaryIO) -> tuple[bytes, bytes]:
+    header = f.read(_CHUNK_HEADER.size)
+    if len(header) < _CHUNK_HEADER.size:
+        raise ValueError("Truncated PNG")
+    length, kind = _CHUNK_HEADER.unpack(header)
+    data = f.read(length)
+    f.read(4)  # CRC
+    return kind, data
+
+
+def to_transparent_tiled(
+    src: Path,
+    dst: Path,
+    invert: bool = False,
+    threshold: float = 0.10,
+    tile_rows: int = 256,
+    color_type: int = PNG_COLOR_TYPE_RGBA,
+    compress_level: int = 6,
+    sizes: Iterable[int] = (),
+) -> dict[int, Image.Image]:
+    # An 8-bit non-interlaced PNG is streamed twice, once for the histogram and once for
+    # the output, so memory is bounded by tile_rows, not by the image. Anything else is
+    # decoded whole once and reduced to one 8-bit gray plane that the strips are cut from.
+    # Returns the alpha plane at each of the requested sizes. Those resample the full-size
+    # alpha plane, as the in-memory path does, so asking for sizes assembles that plane.
+    (width, height), gray_strips = _gray_strips(src, tile_rows)
+
+    histogram = np.zeros(256, dtype=np.int64)
+    for strip in gray_strips():
+        histogram += strip.histogram()
+    lut = alpha_lut(histogram.tolist(), invert=invert, threshold=threshold)
+
+    sizes = list(sizes)
+    alpha = Image.new("L", (width, height)) if sizes else None
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with open(dst, "wb") as f:
+        writer = PngStripWriter(f, width, height, color_type, compress_level)
+        channels = _CHANNELS[color_type]
+        top = 0
+        for strip in gray_strips():
+            strip = strip.point(lut)
+            rows = np.zeros((strip.height, width, channels), dtype=np.uint8)
+            rows[:, :, -1] = np.asarray(strip)
+            writer.write_rows(rows.reshape(strip.height, width * channels))
+            if alpha is not None:
+                alpha.paste(strip, (0, top))
+            top += strip.height
+        writer.close()
+
+    return downscale_chain(alpha, sizes) if alpha is not None else {}
+
+
+def _gray_strips(
+    src: Path, tile_rows: int
+) -> tuple[tuple[int, int], Callable[[], Iterator[Image.Image]]]:
+    # The image size, and a function that starts a new pass over its 8-bit gray strips.
+    try:
+        reader = PngStripReader(src)
+    except ValueError:
+        with Image.open(src) as image:
+            gray = image.convert("L")
+        return gray.size, lambda: _iter_strips(gray, tile_rows)
+    return reader.size, lambda: (strip.convert("L") for strip in reader.strips(tile_rows))
+
+
+def _iter_strips(image: Image.Image, tile_rows: int) -> Iterator[Image.Image]:
+    width, height = image.size
+    for top in range(0, height, tile_rows):
+        yield image.crop((0, top, width, min(height, top + tile_rows)))
@@ -0,0 +1,213 @@
+import sqlite3
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.domain.models.monster_table import MONSTER_COLUMNS, MonsterTable
+from app.repositories.cr_repo import CR_TABLE
+
+# A persistent store of named monsters. Stats live in one SQLite table with an index per
+# range-queried column; xp and proficiency bonus are stored alongside the CR so XP ranges
+# use their own index. Monsters are validated on the way in, so reads skip validation.
+
+BATCH_SIZE = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS monsters (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    challenge_rating REAL NOT NULL,
+    xp INTEGER NOT NULL,
+    proficiency_bonus INTEGER NOT NULL,
+    armor_class INTEGER NOT NULL,
+    hit_points INTEGER NOT NULL,
+    attack_bonus INTEGER NOT NULL,
+    damage INTEGER NOT NULL,
+    save_dc INTEGER
+);
+CREATE INDEX IF NOT EXISTS monsters_cr ON monsters (challenge_rating);
+CREATE INDEX IF NOT EXISTS monsters_xp ON monsters (xp);
+CREATE INDEX IF NOT EXISTS monsters_ac ON monsters (armor_class);
+CREATE INDEX IF NOT EXISTS monsters_hp ON monsters (hit_points);
+CREATE INDEX IF NOT EXISTS monsters_name ON monsters (name);
+"""
+_COLUMNS = ", ".join(MONSTER_COLUMNS)
+_INSERT = (
+    f"INSERT INTO monsters (name, {_COLUMNS}) VALUES (?, {', '.join('?' * len(MONSTER_COLUMNS))})"
+)
+_FLOAT_COLUMNS = {"challenge_rating", "save_dc"}
+# Range arguments of query() and the columns they filter.
+_RANGES = {"cr": "challenge_rating", "xp": "xp", "ac": "armor_class", "hp": "hit_points"}
+
+Range = tuple[float | None, float | None]
+
+
+@dataclass(frozen=True, slots=True)
+class BestiaryEntry:
+    id: int
+    name: str
+    monster: Monster
+
+
+@dataclass(frozen=True)
+class BestiaryBatch:
+    ids: np.ndarray
+    names: list[str]
+    table: MonsterTable
+
+
+class Bestiary:
+    def __init__(self, path: Path | str = ":memory:", check_same_thread: bool = True):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM monsters").fetchone()[0]
+
+    def add(self, name: str, monster: Monster) -> int:
+        with self._db:
+            return self._db.execute(_INSERT, (name, *_monster_values(monster))).lastrowid
+
+    def add_many(self, entries: Iterable[tuple[str, Monster]]) -> int:
+        # One transaction for the whole load; returns the number of monsters added.
+        with self._db:
+            cursor = self._db.executemany(
+                _INSERT, ((name, *_monster_values(monster)) for name, monster in entries)
+            )
+        self._db.execute("ANALYZE")
+        return cursor.rowcount
+
+    def add_table(self, names: Iterable[str], table: MonsterTable) -> int:
+        # Columnar load of an already validated table, without building Monster objects.
+        # Reads build Monsters, so rows at CRs between the table's (as made by
+        # scale_monsters_fractional) are rejected here rather than breaking later queries.
+        crs = table.column("challenge_rating")
+        invalid = np.flatnonzero(CR_TABLE.indices(crs) < 0)
+        if invalid.size:
+            raise MonsterStatsValidationException(
+                f"Invalid challenge rating in rows {invalid[:10].tolist()}: "
+                f"{crs[invalid[:10]].tolist()}"
+            )
+        columns = [table.column(name).tolist() for name in MONSTER_COLUMNS]
+        save_dc = MONSTER_COLUMNS.index("save_dc")
+        columns[save_dc] = [None if dc != dc else int(dc) for dc in columns[save_dc]]
+        names = list(names)
+        if len(names) != len(table):
+            raise ValueError(f"{len(names)} names for {len(table)} monsters")
+        with self._db:
+            cursor = self._db.executemany(_INSERT, zip(names, *columns, strict=True))
+        self._db.execute("ANALYZE")
+        return cursor.rowcount
+
+    def get(self, monster_id: int) -> BestiaryEntry | None:
+        row = self._db.execute(
+            f"SELECT id, name, {_COLUMNS} FROM monsters WHERE id = ?", (monster_id,)
+        ).fetchone()
+        return None if row is None else _entry(row)
+
+    def remove(self, monster_id: int) -> bool:
+        with self._db:
+            return self._db.execute("DELETE FROM monsters WHERE id = ?", (monster_id,)).rowcount > 0
+
+    def query(
+        self,
+        cr: Range | None = None,
+        xp: Range | None = None,
+        ac: Range | None = None,
+        hp: Range | None = None,
+        name: str | None = None,
+        limit: int | None = None,
+    ) -> Iterator[BestiaryEntry]:
+        # Ranges are inclusive (low, high) pairs, None for an open end; name is a SQL LIKE
+        # pattern. Entries are streamed in (CR, name, id) order straight from the cursor.
+        for rows in self._select(f"id, name, {_COLUMNS}", cr, xp, ac, hp, name, limit):
+            yield from map(_entry, rows)
+
+    def monsters(self, **filters) -> Iterator[Monster]:
+        return (entry.monster for entry in self.query(**filters))
+
+    def query_tables(self, batch_size: int = BATCH_SIZE, **filters) -> Iterator[BestiaryBatch]:
+        # The same rows as query(), as columnar batches of up to batch_size monsters.
+        for rows in self._select(f"id, name, {_COLUMNS}", batch_size=batch_size, **filters):
+            ids, names, *values = zip(*rows, strict=True)
+            columns = {
+                name: np.array(column, dtype=np.float64 if name in _FLOAT_COLUMNS else np.int64)
+                for name, column in zip(MONSTER_COLUMNS, values, strict=True)
+            }
+            # NULL save DCs arrive as None, which becomes NaN in the float column.
+            table = MonsterTable.from_normalized(columns)
+            yield BestiaryBatch(np.array(ids, dtype=np.int64), list(names), table)
+
+    def count(self, **filters) -> int:
+        return next(self._select("COUNT(*)", **filters))[0][0]
+
+    def _select(
+        self,
+        fields: str,
+        cr: Range | None = None,
+        xp: Range | None = None,
+        ac: Range | None = None,
+        hp: Range | None = None,
+        name: str | None = None,
+        limit: int | None = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> Iterator[list[tuple]]:
+        where, params = [], []
+        for key, bounds in (("cr", cr), ("xp", xp), ("ac", ac), ("hp", hp)):
+            low, high = bounds or (None, None)
+            if low is not None:
+                where.append(f"{_RANGES[key]} >= ?")
+                params.append(low)
+            if high is not None:
+                where.append(f"{_RANGES[key]} <= ?")
+                params.append(high)
+        if name is not None:
+            where.append("name LIKE ?")
+            params.append(name)
+
+        sql = f"SELECT {fields} FROM monsters"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if not fields.startswith("COUNT"):
+            sql += " ORDER BY challenge_rating, name, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self._db.execute(sql, params)
+        try:
+            while rows := cursor.fetchmany(batch_size):
+                yield rows
+        finally:
+            cursor.close()
+
+
+def _monster_values(monster: Monster) -> tuple:
+    return (
+        monster.cr,
+        monster.xp,
+        monster.proficiency_bonus,
+        monster.ac,
+        monster.hp,
+        monster.atk_bonus,
+        monster.damage,
+        monster.save_dc,
+    )
+
+
+def _entry(row: tuple) -> BestiaryEntry:
+    monster_id, name, cr, _, _, ac, hp, atk, damage, save_dc = row
+    return BestiaryEntry(monster_id, name, Monster(MonsterStats(cr, ac, hp, atk, damage, save_dc)))
@@ -0,0 +1,87 @@
+# app/repositories/cr_curves.py
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.repositories.cr_repo import CR_TABLE, CRColumn, CRTable
+
+# The CR table as continuous curves: between two rows every column changes linearly with
+# CR, so CR 4.5 expects the AC, HP range, damage and XP halfway between the CR 4 and CR 5
+# rows. Each column is sampled once on a uniform CR grid that holds every row's CR, so
+# interpolating between neighbouring samples is exact and a lookup is index arithmetic
+# with no search. XP is inverted the same way, through a grid uniform in log XP.
+
+CR_STEPS = 64  # samples per CR; a multiple of 8 so that CR 1/8, 1/4 and 1/2 are samples
+XP_STEPS = 256  # samples per doubling of XP
+
+
+class CRCurves:
+    def __init__(self, table: CRTable, cr_steps: int = CR_STEPS, xp_steps: int = XP_STEPS):
+        crs = table.column(CRColumn.CR)
+        xps = table.column(CRColumn.XP).astype(np.float64)
+        if not np.array_equal(crs * cr_steps, np.round(crs * cr_steps)):
+            raise ValueError(f"Every CR in the table must be a multiple of 1/{cr_steps}")
+        self.min_cr, self.max_cr = float(crs[0]), float(crs[-1])
+        self.min_xp, self.max_xp = float(xps[0]), float(xps[-1])
+        self.cr_steps = cr_steps
+        self.xp_steps = xp_steps
+        self._crs = crs
+        self._xps = xps
+
+        # k / cr_steps is exact in binary floating point, so the table CRs are exact samples.
+        samples = round((self.max_cr - self.min_cr) * cr_steps) + 1
+        self.grid = self.min_cr + np.arange(samples) / cr_steps
+        self._curves = {
+            col: np.interp(self.grid, crs, table.column(col))
+            for col in table.columns
+            if col != CRColumn.CR
+        }
+        for values in (self.grid, *self._curves.values()):
+            values.flags.writeable = False
+
+        # For each cell of the log-XP grid, the table row whose XP range holds its lower
+        # edge. Rows are far wider than cells, so a cell crosses at most one row boundary
+        # and a single comparison settles the row of any XP inside it.
+        self._log_min_xp = np.log2(self.min_xp)
+        cells = int(np.ceil((np.log2(self.max_xp) - self._log_min_xp) * xp_steps)) + 1
+        edges = np.exp2(self._log_min_xp + np.arange(cells) / xp_steps)
+        self._xp_rows = (np.searchsorted(xps, edges, side="right") - 1).clip(0, len(xps) - 2)
+        if np.diff(self._xp_rows).max() > 1:
+            raise ValueError(f"{xp_steps} XP samples per doubling cannot separate every row")
+
+    def curve(self, col: CRColumn) -> np.ndarray:
+        # The sampled column, one value per entry of grid; read-only.
+        return self._curves[col]
+
+    def values(self, col: CRColumn, crs: ArrayLike) -> np.ndarray:
+        # The column at any CRs between the first and last row; NaN outside them.
+        crs = np.asarray(crs, dtype=np.float64)
+        steps = (crs - self.min_cr) * self.cr_steps
+        valid = (steps >= 0) & (steps <= len(self.grid) - 1)
+        steps = np.where(valid, steps, 0)
+        low = np.minimum(steps.astype(np.int64), len(self.grid) - 2)
+        curve = self._curves[col]
+        values = curve[low] + (steps - low) * (curve[low + 1] - curve[low])
+        return np.where(valid, values, np.nan)
+
+    def xp(self, crs: ArrayLike) -> np.ndarray:
+        return self.values(CRColumn.XP, crs)
+
+    def crs_for_xp(self, xps: ArrayLike) -> np.ndarray:
+        # The CR whose interpolated XP is xps; NaN outside the table's XP range.
+        xps = np.asarray(xps, dtype=np.float64)
+        valid = (xps >= self.min_xp) & (xps <= self.max_xp)
+        xps = np.where(valid, xps, self.min_xp)
+        cells = ((np.log2(xps) - self._log_min_xp) * self.xp_steps).astype(np.int64)
+        rows = self._xp_rows[cells.clip(0, len(self._xp_rows) - 1)]
+        # Rounding in log2 can land an XP next to a row boundary in the neighbouring cell.
+        rows += (xps >= self._xps[rows + 1]) & (rows < len(self._xps) - 2)
+        rows -= (xps < self._xps[rows]) & (rows > 0)
+
+        low_xp, high_xp = self._xps[rows], self._xps[rows + 1]
+        low_cr, high_cr = self._crs[rows], self._crs[rows + 1]
+        crs = low_cr + (xps - low_xp) / (high_xp - low_xp) * (high_cr - low_cr)
+        return np.where(valid, crs, np.nan)
+
+
+CR_CURVES = CRCurves(CR_TABLE)
@@ -1,6 +1,14 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
 from enum import StrEnum
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 
-import pandas as pd
+import numpy as np
+from numpy.typing import ArrayLike
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class CRColumn(StrEnum):
@@ -16,10 +24,92 @@ class CRColumn(StrEnum):
     SAVE = "Save"
 
 
+class CRTable:
+    def __init__(self, columns: Sequence[str], rows: Sequence[Sequence[float]]):
+        self.columns = tuple(CRColumn(col) for col in columns)
+        cr_pos = self.columns.index(CRColumn.CR)
+        rows = sorted(rows, key=lambda row: row[cr_pos])
+
+        self.crs = tuple(float(row[cr_pos]) for row in rows)
+        self._index = {cr: i for i, cr in enumerate(self.crs)}
+        self._rows = tuple(
+            MappingProxyType(
+                {
+                    col: float(val) if col == CRColumn.CR else int(val)
+                    for col, val in zip(self.columns, row, strict=True)
+                }
+            )
+            for row in rows
+        )
+        self._arrays = {}
+        for pos, col in enumerate(self.columns):
+            dtype = np.float64 if col == CRColumn.CR else np.int64
+            values = np.array([row[pos] for row in rows], dtype=dtype)
+            values.flags.writeable = False
+            self._arrays[col] = values
+
+    def __len__(self) -> int:
+        return len(self.crs)
+
+    def __contains__(self, cr: object) -> bool:
+        return cr in self._index
+
+    def index_of(self, cr: float) -> int | None:
+        return self._index.get(cr)
+
+    def row(self, cr: float) -> Mapping[CRColumn, float | int]:
+        return self._rows[self._index[cr]]
+
+    def row_at(self, index: int) -> Mapping[CRColumn, float | int]:
+        return self._rows[index]
+
+    def column(self, col: CRColumn) -> np.ndarray:
+        return self._arrays[col]
+
+    def floor(self, cr: float) -> float | None:
+        pos = bisect_right(self.crs, cr)
+        return self.crs[pos - 1] if pos else None
+
+    def ceil(self, cr: float) -> float | None:
+        pos = bisect_left(self.crs, cr)
+        return self.crs[pos] if pos < len(self.crs) else None
+
+    def nearest(self, cr: float) -> float:
+        pos = bisect_left(self.crs, cr)
+        if pos == 0:
+            return self.crs[0]
+        if pos == len(self.crs):
+            return self.crs[-1]
+        below, above = self.crs[pos - 1], self.crs[pos]
+        return below if cr - below <= above - cr else above
+
+    def indices(self, crs: ArrayLike) -> np.ndarray:
+        crs = np.asarray(crs, dtype=np.float64)
+        table_crs = self._arrays[CRColumn.CR]
+        found = np.searchsorted(table_crs, crs).clip(0, len(table_crs) - 1)
+        return np.where(table_crs[found] == crs, found, -1)
+
+    def floor_indices(self, crs: ArrayLike) -> np.ndarray:
+        crs = np.asarray(crs, dtype=np.float64)
+        return np.searchsorted(self._arrays[CRColumn.CR], crs, side="right") - 1
+
+    def nearest_indices(self, crs: ArrayLike) -> np.ndarray:
+        # Vectorized nearest(): ties go to the lower CR.
+        crs = np.asarray(crs, dtype=np.float64)
+        table_crs = self._arrays[CRColumn.CR]
+        above = np.searchsorted(table_crs, crs).clip(1, len(table_crs) - 1)
+        below = above - 1
+        return np.where(crs - table_crs[below] <= table_crs[above] - crs, below, above)
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame({col.value: self._arrays[col].copy() for col in self.columns})
+
+
 # fmt: off
-MONSTER_STATISTICS_BY_CHALLENGE_RATING = pd.DataFrame(
-    columns=[  'CR',    'XP', 'Prof. Bonus', 'AC', "HP Min", "HP Max", "ATK", "Dmg Min", "Dmg Max", "Save"],
-    data=[  [     0,      10,             2,   13,        1,        6,     3,         0,         1,     13],
+_COLUMNS = [  'CR',    'XP', 'Prof. Bonus', 'AC', "HP Min", "HP Max", "ATK", "Dmg Min", "Dmg Max", "Save"]
+_ROWS = [   [     0,      10,             2,   13,        1,        6,     3,         0,         1,     13],
             [ 0.125,      25,             2,   13,        7,       35,     3,         2,         3,     13],
             [ 0.25 ,      50,             2,   13,       36,       49,     3,         4,         5,     13],
             [ 0.5  ,     100,             2,   13,       50,       70,     3,         6,         8,     13],
@@ -53,5 +143,17 @@ MONSTER_STATISTICS_BY_CHALLENGE_RATING = pd.DataFrame(
             [28    , 120_000,             8,   19,      716,      760,    13,       267,       284,     22],
             [29    , 135_000,             9,   19,      761,      805,    13,       285,       302,     22],
             [30    , 155_000,             9,   19,      806,      850,    14,       303,       320,     23],
-])
+]
 # fmt: on
+
+
+CR_TABLE = CRTable(_COLUMNS, _ROWS)
+
+
+def __getattr__(name: str):
+    # The DataFrame view pulls in pandas, so it is only built when someone asks for it.
+    if name == "MONSTER_STATISTICS_BY_CHALLENGE_RATING":
+        frame = CR_TABLE.to_dataframe()
+        globals()[name] = frame
+        return frame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,77 @@
+from collections.abc import Sequence
+from enum import StrEnum
+
+
+class Difficulty(StrEnum):
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
+    DEADLY = "deadly"
+
+
+# Deadly has no upper threshold; encounters above this multiple of it are not "deadly" any
+# more but hopeless, so the deadly budget stops there.
+DEADLY_CEILING = 1.5
+
+# fmt: off
+# XP threshold per character of each level.
+_THRESHOLDS = {
+    #      easy, medium,  hard, deadly
+     1: (    25,     50,    75,    100),
+     2: (    50,    100,   150,    200),
+     3: (    75,    150,   225,    400),
+     4: (   125,    250,   375,    500),
+     5: (   250,    500,   750,  1_100),
+     6: (   300,    600,   900,  1_400),
+     7: (   350,    750, 1_100,  1_700),
+     8: (   450,    900, 1_400,  2_100),
+     9: (   550,  1_100, 1_600,  2_400),
+    10: (   600,  1_200, 1_900,  2_800),
+    11: (   800,  1_600, 2_400,  3_600),
+    12: ( 1_000,  2_000, 3_000,  4_500),
+    13: ( 1_100,  2_200, 3_400,  5_100),
+    14: ( 1_250,  2_500, 3_800,  5_700),
+    15: ( 1_400,  2_800, 4_300,  6_400),
+    16: ( 1_600,  3_200, 4_800,  7_200),
+    17: ( 2_000,  3_900, 5_900,  8_800),
+    18: ( 2_100,  4_200, 6_300,  9_500),
+    19: ( 2_400,  4_900, 7_300, 10_900),
+    20: ( 2_800,  5_700, 8_500, 12_700),
+}
+# fmt: on
+
+# Multipliers by monster count: 1, 2, 3-6, 7-10, 11-14, 15+. Small parties shift one step
+# up, large ones one step down, hence the extra entries at both ends.
+_MULTIPLIERS = (0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0)
+_COUNT_STEPS = ((15, 6), (11, 5), (7, 4), (3, 3), (2, 2), (1, 1))
+
+_DIFFICULTIES = tuple(Difficulty)
+
+
+def xp_threshold(level: int, difficulty: Difficulty | str) -> int:
+    if level not in _THRESHOLDS:
+        raise ValueError(f"Invalid character level: {level}")
+    return _THRESHOLDS[level][_DIFFICULTIES.index(Difficulty(difficulty))]
+
+
+def encounter_budget(levels: Sequence[int], difficulty: Difficulty | str) -> tuple[int, int]:
+    # Inclusive range of adjusted XP that makes an encounter of this difficulty for the party.
+    if not levels:
+        raise ValueError("The party needs at least one character")
+    difficulty = Difficulty(difficulty)
+    low = sum(xp_threshold(level, difficulty) for level in levels)
+    if difficulty == Difficulty.DEADLY:
+        return low, int(low * DEADLY_CEILING)
+    harder = _DIFFICULTIES[_DIFFICULTIES.index(difficulty) + 1]
+    return low, sum(xp_threshold(level, harder) for level in levels) - 1
+
+
+def encounter_multiplier(monsters: int, party_size: int) -> float:
+    if monsters < 1:
+        raise ValueError(f"An encounter needs at least one monster, got {monsters}")
+    step = next(step for count, step in _COUNT_STEPS if monsters >= count)
+    if party_size < 3:
+        step += 1
+    elif party_size >= 6:
+        step -= 1
+    return _MULTIPLIERS[step]
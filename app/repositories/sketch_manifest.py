@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+MANIFEST_FILENAME = ".manifest.json"
+# Machine-local (size, mtime_ns) of each source, kept beside the manifest but out of git:
+# the manifest is committed, and mtimes differ in every clone.
+STAT_CACHE_FILENAME = ".manifest.stat.json"
+MANIFEST_VERSION = 2
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    sha256: str
+    params: dict
+    output: str
+
+
+def sized_dir(sketch_dir: Path, size: int) -> Path:
+    # Downscaled copies mirror the full-size tree next to it: sketch/ -> sketch_512/, ...
+    return sketch_dir.with_name(f"{sketch_dir.name}_{size}")
+
+
+def file_sha256(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class SketchManifest:
+    def __init__(
+        self,
+        path: Path,
+        entries: dict[str, ManifestEntry] | None = None,
+        stats: dict[str, tuple[int, int]] | None = None,
+    ):
+        self.path = path
+        self.stat_path = path.with_name(STAT_CACHE_FILENAME)
+        self.entries = entries if entries is not None else {}
+        self.stats = stats if stats is not None else {}
+        self._digests: dict[str, str] = {}
+        self._dirty = False
+        self._stats_dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> "SketchManifest":
+        data = _read_json(path)
+        if data.get("version") not in (1, MANIFEST_VERSION):
+            return cls(path)
+        entries = {}
+        for key, entry in data["entries"].items():
+            # Version 1 kept mtime_ns in the entry; it is only a cache, so it is dropped.
+            entry.pop("mtime_ns", None)
+            entries[key] = ManifestEntry(**entry)
+        stats = _read_json(path.with_name(STAT_CACHE_FILENAME)).get("stats", {})
+        manifest = cls(path, entries, {key: tuple(stat) for key, stat in stats.items()})
+        manifest._dirty = data["version"] != MANIFEST_VERSION
+        return manifest
+
+    def save(self) -> None:
+        # A run that only refreshed stats leaves the committed manifest untouched.
+        if self._dirty:
+            _write_json(
+                self.path,
+                {
+                    "version": MANIFEST_VERSION,
+                    "entries": {key: asdict(entry) for key, entry in sorted(self.entries.items())},
+                },
+            )
+            self._dirty = False
+        if self._stats_dirty:
+            stats = {key: list(stat) for key, stat in sorted(self.stats.items())}
+            _write_json(self.stat_path, {"stats": stats})
+            self._stats_dirty = False
+
+    def output_paths(self, entry: ManifestEntry) -> list[Path]:
+        return self._output_paths(entry.output, entry.params)
+
+    def _output_paths(self, output: str, params: Mapping[str, object]) -> list[Path]:
+        root = self.path.parent
+        sizes = params.get("sizes", ())
+        return [root / output, *(sized_dir(root, size) / output for size in sizes)]
+
+    def needs_processing(
+        self,
+        key: str,
+        img_path: Path,
+        sketch_path: Path,
+        params: Mapping[str, object],
+        stat: os.stat_result | None = None,
+        exists: Callable[[Path], bool] = Path.exists,
+        adopt_params: Mapping[str, object] | None = None,
+    ) -> bool:
+        # sketch_path is only consulted for sources the manifest does not know yet; known
+        # sources are checked against the output they were actually written to. A scanner
+        # can pass the source's stat and an index of existing outputs to save syscalls.
+        # adopt_params are the settings outputs written before the manifest existed were
+        # made with; such outputs are only adopted when params match them.
+        entry = self.entries.get(key)
+        if entry is not None:
+            outputs = self.output_paths(entry)
+        else:
+            outputs = self._output_paths(self._relative(sketch_path), params)
+        if not all(exists(output) for output in outputs):
+            return True
+        st = stat or img_path.stat()
+        if entry is None:
+            # Outputs built before the manifest existed: trust mtimes once, then track them.
+            # They were made with adopt_params, so under any other settings they are stale.
+            if adopt_params is None or dict(params) != dict(adopt_params):
+                return True
+            if st.st_mtime > sketch_path.stat().st_mtime:
+                return True
+            self.record(key, img_path, sketch_path, params)
+            return False
+        if entry.params != dict(params):
+            return True
+        stat_key = (st.st_size, st.st_mtime_ns)
+        if st.st_size == entry.size and self.stats.get(key) == stat_key:
+            return False
+
+        digest = self._digest(key, img_path)
+        if digest != entry.sha256:
+            return True
+        self.stats[key] = stat_key
+        self._stats_dirty = True
+        return False
+
+    def record(
+        self, key: str, img_path: Path, sketch_path: Path, params: Mapping[str, object]
+    ) -> ManifestEntry | None:
+        previous = self.entries.get(key)
+        st = img_path.stat()
+        entry = ManifestEntry(
+            size=st.st_size,
+            sha256=self._digest(key, img_path),
+            params=dict(params),
+            output=self._relative(sketch_path),
+        )
+        if entry != previous:
+            self.entries[key] = entry
+            self._dirty = True
+        self.stats[key] = (st.st_size, st.st_mtime_ns)
+        self._stats_dirty = True
+        self._digests.pop(key, None)
+        return previous
+
+    def remove(self, key: str) -> ManifestEntry | None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._dirty = True
+        if self.stats.pop(key, None) is not None:
+            self._stats_dirty = True
+        return entry
+
+    def keys_under(self, prefix: str) -> list[str]:
+        # prefix is a source key or a directory of them; "" matches every key.
+        if not prefix:
+            return list(self.entries)
+        return [key for key in self.entries if key == prefix or key.startswith(prefix + "/")]
+
+    def _relative(self, sketch_path: Path) -> str:
+        return sketch_path.relative_to(self.path.parent).as_posix()
+
+    def _digest(self, key: str, img_path: Path) -> str:
+        if key not in self._digests:
+            self._digests[key] = file_sha256(img_path)
+        return self._digests[key]
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=1) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,190 @@
+# app/utils/fswatch.py
+
+# Reports which paths under a directory tree changed. Linux uses inotify through ctypes, so
+# no dependency is needed; elsewhere, or when inotify is unavailable (e.g. the watch limit
+# is reached), the tree is polled. Both report the changed paths only, so callers decide
+# what a change means by looking at the path: gone means removed, a directory means
+# "everything under here".
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+
+from app.utils.scanner import scan_files
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+# Files are reported once they are complete (closed or moved in), never on creation.
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+)
+_EVENT = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class Watcher(ABC):
+    @abstractmethod
+    def read(self, timeout: float | None = None) -> set[Path]:
+        # Waits up to timeout seconds (forever if None); empty when nothing changed.
+        ...
+
+    def close(self) -> None:  # noqa: B027 - watchers with nothing to release keep this
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class InotifyWatcher(Watcher):
+    def __init__(self, root: Path):
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise _errno_error("inotify_init1")
+        self._paths: dict[int, Path] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def read(self, timeout: float | None = None) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # Events were dropped; only a rescan of everything is safe.
+                changed.add(self.root)
+                continue
+            if mask & _IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                # Anything written before the watch exists is found by walking the reported
+                # directory, so reporting the directory itself is enough.
+                self._watch_tree(path)
+            elif mask & _IN_ISDIR and mask & _IN_MOVED_FROM:
+                self._unwatch_tree(path)
+            elif mask & _IN_CREATE:
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _watch_tree(self, root: Path) -> None:
+        for directory, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                error = _errno_error("inotify_add_watch")
+                if isinstance(error, FileNotFoundError):
+                    continue
+                raise error
+            self._paths[wd] = Path(directory)
+
+    def _unwatch_tree(self, root: Path) -> None:
+        # A directory moved elsewhere keeps its watches; events from there would be reported
+        # under the old path. If it moved within the tree, IN_MOVED_TO watches it again.
+        for wd, path in list(self._paths.items()):
+            if path.is_relative_to(root):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._paths[wd]
+
+
+class PollingWatcher(Watcher):
+    def __init__(self, root: Path, interval: float = 1.0):
+        self.root = root
+        self.interval = interval
+        self._snapshot = _snapshot(root)
+
+    def read(self, timeout: float | None = None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+
+            snapshot = _snapshot(self.root)
+            old = self._snapshot
+            self._snapshot = snapshot
+            changed = {
+                path for path in old.keys() | snapshot.keys() if old.get(path) != snapshot.get(path)
+            }
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+def open_watcher(root: Path, poll_interval: float = 1.0) -> Watcher:
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(root, poll_interval)
+
+
+def debounced(watcher: Watcher, quiet: float = 0.2, max_delay: float = 1.0) -> Iterator[set[Path]]:
+    # Merges bursts (an editor's save is often several events) into one batch, yielded once
+    # nothing changed for `quiet` seconds, or after max_delay while events keep coming.
+    while True:
+        pending = watcher.read()
+        started = time.monotonic()
+        while pending:
+            remaining = max_delay - (time.monotonic() - started)
+            changed = watcher.read(min(quiet, remaining)) if remaining > 0 else set()
+            if not changed:
+                yield pending
+                break
+            pending |= changed
+
+
+def _snapshot(root: Path) -> dict[Path, tuple[int, int]]:
+    return {
+        scanned.path: (scanned.stat.st_size, scanned.stat.st_mtime_ns)
+        for scanned in scan_files(root)
+    }
+
+
+def _errno_error(call: str) -> OSError:
+    errno = ctypes.get_errno()
+    return OSError(errno, f"{call}: {os.strerror(errno)}")
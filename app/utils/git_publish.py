@@ -0,0 +1,141 @@
+# app/utils/git_publish.py
+
+# Commits and pushes generated files with a fixed number of git processes, however many
+# files there are: all paths go to a single `git update-index` over stdin, which stages
+# new and changed files and the removal of deleted ones alike. Runs can stage without
+# committing; the paths they staged are remembered in the git directory, and the next run
+# that commits lists them all in one commit.
+
+import os
+import subprocess
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.utils.profiling import NULL_PROFILER, PipelineProfiler
+
+PENDING_FILENAME = "sketch-publish-pending"
+MESSAGE_HEADER = "Processed and added sketches:"
+# Longer lists are cut short in the commit message; the commit itself has every file.
+MAX_LISTED_PATHS = 200
+
+
+@dataclass
+class PublishResult:
+    staged: list[str]  # repository-relative paths staged by this call
+    commit: str | None = None  # the new commit, if one was made
+    pushed: bool = False
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        parts = [f"staged {len(self.staged)} files in {self.timings.get('stage', 0.0):.2f}s"]
+        if self.commit:
+            parts.append(f"commit {self.commit[:10]} in {self.timings['commit']:.2f}s")
+        else:
+            parts.append("nothing to commit")
+        if self.pushed:
+            parts.append(f"pushed in {self.timings['push']:.2f}s")
+        return ", ".join(parts)
+
+
+def publish(
+    paths: Iterable[Path],
+    repo: Path = Path("."),
+    commit: bool = True,
+    push: bool = True,
+    header: str = MESSAGE_HEADER,
+    profiler: PipelineProfiler | None = None,
+) -> PublishResult:
+    # Raises subprocess.CalledProcessError if git fails; staged paths stay pending then.
+    profiler = profiler or NULL_PROFILER
+    toplevel = Path(_git(repo, "rev-parse", "--show-toplevel").strip())
+    git_dir = Path(_git(toplevel, "rev-parse", "--absolute-git-dir").strip())
+    staged = [_relative(path, toplevel) for path in paths]
+    result = PublishResult(staged)
+
+    with _timed(result, profiler, "stage"):
+        if staged:
+            paths_input = "\0".join(staged) + "\0"
+            _git(toplevel, "update-index", "--add", "--remove", "-z", "--stdin", input=paths_input)
+            with open(git_dir / PENDING_FILENAME, "a", encoding="utf-8") as pending:
+                pending.writelines(f"{path}\n" for path in staged)
+    if not commit:
+        return result
+
+    pending_path = git_dir / PENDING_FILENAME
+    with _timed(result, profiler, "commit"):
+        listed = _read_pending(pending_path)
+        if _has_staged_changes(toplevel):
+            _git(toplevel, "commit", "-q", "-F", "-", input=_message(header, listed))
+            result.commit = _git(toplevel, "rev-parse", "HEAD").strip()
+        pending_path.unlink(missing_ok=True)
+
+    if push and (result.commit or _ahead_of_upstream(toplevel)):
+        with _timed(result, profiler, "push"):
+            _git(toplevel, "push", "-q")
+        result.pushed = True
+    return result
+
+
+@contextmanager
+def _timed(result: PublishResult, profiler, step: str) -> Iterator[None]:
+    # Times one step into result.timings and, as git-<step>, into the profiler.
+    start = time.perf_counter()
+    with profiler.stage(f"git-{step}"):
+        try:
+            yield
+        finally:
+            result.timings[step] = time.perf_counter() - start
+
+
+def _git(repo: Path, *args: str, input: str | None = None) -> str:
+    completed = subprocess.run(
+        ["git", *args], cwd=repo, input=input, capture_output=True, text=True, check=True
+    )
+    return completed.stdout
+
+
+def _relative(path: Path, toplevel: Path) -> str:
+    relative = os.path.relpath(Path(path).absolute(), toplevel)
+    if relative.startswith(os.pardir):
+        raise ValueError(f"{path} is outside the repository at {toplevel}")
+    return Path(relative).as_posix()
+
+
+def _read_pending(path: Path) -> list[str]:
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    return list(dict.fromkeys(line for line in lines if line))
+
+
+def _has_staged_changes(toplevel: Path) -> bool:
+    completed = subprocess.run(
+        ["git", "diff", "--cached", "--quiet"], cwd=toplevel, capture_output=True
+    )
+    if completed.returncode > 1:
+        # No HEAD yet: anything in the index is a change.
+        return bool(_git(toplevel, "ls-files", "--cached").strip())
+    return completed.returncode == 1
+
+
+def _ahead_of_upstream(toplevel: Path) -> bool:
+    # A previous push may have failed after its commit; without an upstream, assume not.
+    completed = subprocess.run(
+        ["git", "rev-list", "--count", "@{upstream}..HEAD"],
+        cwd=toplevel,
+        capture_output=True,
+        text=True,
+    )
+    return completed.returncode == 0 and int(completed.stdout.strip() or 0) > 0
+
+
+def _message(header: str, paths: list[str]) -> str:
+    listed = paths[:MAX_LISTED_PATHS]
+    lines = [header, *listed]
+    if len(paths) > len(listed):
+        lines.append(f"... and {len(paths) - len(listed)} more")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,121 @@
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass
+class StageRecord:
+    file: str
+    stage: str
+    seconds: float
+    pixels: int = 0
+    peak_bytes: int = 0
+
+
+class PipelineProfiler:
+    # Records wall time and tracemalloc peak per (file, stage). Only Python and NumPy
+    # allocations are traced; PIL's own image buffers do not show up in peak_bytes.
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.records: list[StageRecord] = []
+        self._started_tracing = False
+        self._start = time.perf_counter()
+
+    def __enter__(self) -> "PipelineProfiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, stage: str, file: str = "") -> Iterator[StageRecord]:
+        record = StageRecord(file=file, stage=stage, seconds=0.0)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if tracing:
+                record.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - base)
+            self.records.append(record)
+
+    def extend(self, records: Iterable[StageRecord]) -> None:
+        self.records.extend(records)
+
+    def report(self) -> dict:
+        stages = defaultdict(lambda: {"seconds": 0.0, "count": 0, "pixels": 0, "peak_bytes": 0})
+        files = defaultdict(lambda: {"seconds": 0.0, "pixels": 0, "peak_bytes": 0, "stages": {}})
+        for r in self.records:
+            stage = stages[r.stage]
+            stage["seconds"] += r.seconds
+            stage["count"] += 1
+            stage["pixels"] += r.pixels
+            stage["peak_bytes"] = max(stage["peak_bytes"], r.peak_bytes)
+            if r.file:
+                entry = files[r.file]
+                entry["seconds"] += r.seconds
+                entry["pixels"] = max(entry["pixels"], r.pixels)
+                entry["peak_bytes"] = max(entry["peak_bytes"], r.peak_bytes)
+                entry["stages"][r.stage] = entry["stages"].get(r.stage, 0.0) + r.seconds
+
+        return {
+            "wall_seconds": time.perf_counter() - self._start,
+            "stages": dict(sorted(stages.items(), key=lambda kv: -kv[1]["seconds"])),
+            "files": [
+                {"file": name, **entry}
+                for name, entry in sorted(files.items(), key=lambda kv: -kv[1]["seconds"])
+            ],
+            "records": [asdict(r) for r in self.records],
+        }
+
+    def write_report(self, path: Path) -> dict:
+        report = self.report()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=1) + "\n")
+        return report
+
+    def summary(self, top: int = 5) -> str:
+        report = self.report()
+        lines = [f"Wall time: {report['wall_seconds']:.3f}s", "", "Stages:"]
+        for name, stage in report["stages"].items():
+            lines.append(
+                f"  {name:<14} {stage['seconds']:>9.3f}s  {stage['count']:>6} calls"
+                f"  peak {stage['peak_bytes'] / 2**20:>8.2f} MB"
+            )
+        lines += ["", f"Slowest {min(top, len(report['files']))} files:"]
+        for entry in report["files"][:top]:
+            slowest_stage = max(entry["stages"], key=entry["stages"].get)
+            lines.append(
+                f"  {entry['seconds']:>8.3f}s  {entry['pixels'] / 1e6:>7.2f} MP"
+                f"  (mostly {slowest_stage})  {entry['file']}"
+            )
+        return "\n".join(lines)
+
+
+class _NullProfiler:
+    # Stands in when profiling is off; stage() hands out one shared no-op context.
+    _context = nullcontext(StageRecord(file="", stage="", seconds=0.0))
+
+    def stage(self, stage: str, file: str = "") -> AbstractContextManager[StageRecord]:
+        return self._context
+
+    def extend(self, records: Iterable[StageRecord]) -> None:
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
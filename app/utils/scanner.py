@@ -0,0 +1,103 @@
+# app/utils/scanner.py
+
+# One os.scandir pass per tree. Directory entries carry their type, so walking costs one
+# syscall per directory; files are only stat'ed when the caller asks for it, and only
+# those that pass the filters.
+
+import os
+from collections.abc import Collection, Iterable, Iterator
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class ScannedFile:
+    path: Path
+    key: str  # posix path relative to the scanned root
+    stat: os.stat_result | None
+
+
+def scan_files(
+    root: Path,
+    suffixes: Collection[str] | None = None,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    under: Path | None = None,
+    with_stat: bool = True,
+) -> Iterator[ScannedFile]:
+    # Yields files in the same order as sorted(root.rglob("*")), lazily, so work can start
+    # before the walk finishes. include/exclude are fnmatch patterns on the key, where "*"
+    # also matches "/"; an excluded directory is not descended into. under restricts the
+    # walk to one subdirectory, or to a single file, while keys stay relative to root.
+    include, exclude = tuple(include), tuple(exclude)
+    if under is None or under == root:
+        yield from _scan(root, "", suffixes, include, exclude, with_stat)
+        return
+
+    key = under.relative_to(root).as_posix()
+    parts = key.split("/")
+    if any(_matches("/".join(parts[:i]), exclude) for i in range(1, len(parts))):
+        return
+    if under.is_dir():
+        if not _matches(key, exclude):
+            yield from _scan(under, key + "/", suffixes, include, exclude, with_stat)
+    elif _accepts(key, suffixes, include, exclude):
+        try:
+            yield ScannedFile(under, key, under.stat() if with_stat else None)
+        except FileNotFoundError:
+            return
+
+
+def index_files(root: Path) -> set[Path]:
+    # Every file under root, without a single stat; for existence checks by set lookup.
+    return {scanned.path for scanned in scan_files(root, with_stat=False)}
+
+
+def _scan(
+    directory: Path,
+    prefix: str,
+    suffixes: Collection[str] | None,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    with_stat: bool,
+) -> Iterator[ScannedFile]:
+    try:
+        with os.scandir(directory) as it:
+            entries = [(entry.name, entry.is_dir(follow_symlinks=False), entry) for entry in it]
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    # Paths compare component by component, so sorting names per directory is enough.
+    entries.sort()
+
+    for name, is_dir, entry in entries:
+        key = prefix + name
+        if _matches(key, exclude):
+            continue
+        if is_dir:
+            yield from _scan(directory / name, key + "/", suffixes, include, exclude, with_stat)
+            continue
+        if not _accepts(key, suffixes, include, ()):
+            continue
+        try:
+            stat = entry.stat() if with_stat else None
+        except FileNotFoundError:
+            continue
+        yield ScannedFile(directory / name, key, stat)
+
+
+def _accepts(
+    key: str,
+    suffixes: Collection[str] | None,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+) -> bool:
+    if suffixes is not None and os.path.splitext(key)[1].lower() not in suffixes:
+        return False
+    if include and not _matches(key, include):
+        return False
+    return not _matches(key, exclude)
+
+
+def _matches(key: str, patterns: tuple[str, ...]) -> bool:
+    return any(fnmatchcase(key, pattern) for pattern in patterns)
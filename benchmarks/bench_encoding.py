@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Compare output size and encode time of every sketch encoding on a set of images."""
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from PIL import Image
+
+from app.cli.handlers import SUPPORTED_EXTENSIONS
+from app.domain.services.image_processing import to_transparent
+from app.domain.services.sketch_encoding import available_encodings, encode_sketch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images_dir", type=Path, nargs="?", default=Path("res/images"))
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--output", type=Path, default=None, help="Also write JSON here.")
+    args = parser.parse_args()
+
+    sketches = [
+        to_transparent(Image.open(path))
+        for path in sorted(args.images_dir.rglob("*"))
+        if path.suffix.lower() in SUPPORTED_EXTENSIONS
+    ]
+    if not sketches:
+        raise SystemExit(f"No images found in {args.images_dir}")
+
+    totals = defaultdict(lambda: {"bytes": 0, "seconds": 0.0})
+    for sketch in sketches:
+        for level in args.levels:
+            for encoding in available_encodings():
+                encoded = encode_sketch(sketch, encoding, level)
+                totals[(str(encoding), level)]["bytes"] += len(encoded.data)
+                totals[(str(encoding), level)]["seconds"] += encoded.seconds
+
+    baseline = totals[("rgba-png", 6)]["bytes"] if ("rgba-png", 6) in totals else None
+    print(f"{len(sketches)} images from {args.images_dir}\n")
+    print(f"{'encoding':<15} {'level':>5} {'size MB':>9} {'vs rgba-png/6':>14} {'encode s':>9}")
+    for (encoding, level), total in sorted(totals.items(), key=lambda kv: kv[1]["bytes"]):
+        ratio = f"{total['bytes'] / baseline:>13.1%}" if baseline else f"{'-':>13}"
+        print(
+            f"{encoding:<15} {level:>5} {total['bytes'] / 2**20:>9.2f} {ratio} "
+            f"{total['seconds']:>9.2f}"
+        )
+
+    if args.output:
+        rows = [{"encoding": e, "level": lvl, **total} for (e, lvl), total in totals.items()]
+        args.output.write_text(json.dumps(rows, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
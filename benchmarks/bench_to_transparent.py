@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Compare the LUT-based to_transparent against the previous float64 implementation."""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from app.domain.services.image_processing import to_transparent
+from benchmarks.synthetic import synthetic_sketch
+
+
+def to_transparent_float(
+    image: Image.Image, invert: bool = False, threshold: float = 0.10
+) -> Image.Image:
+    gray = image.convert("L")
+    if invert:
+        gray = ImageOps.invert(gray)
+
+    alpha = np.array(ImageOps.invert(gray), dtype=np.float64) / 255.0
+
+    mask = alpha >= threshold
+    alpha[~mask] = 0.0
+    if mask.any():
+        lo = alpha[mask].min()
+        hi = alpha[mask].max()
+        if hi > lo:
+            alpha[mask] = (alpha[mask] - lo) / (hi - lo)
+        else:
+            alpha[mask] = 1.0
+
+    alpha_img = Image.fromarray((alpha * 255).astype(np.uint8), mode="L")
+    rgba = Image.new("RGBA", gray.size, (0, 0, 0, 0))
+    rgba.putalpha(alpha_img)
+    return rgba
+
+
+IMPLEMENTATIONS = {"float": to_transparent_float, "lut": to_transparent}
+
+
+def measure(fn, image: Image.Image, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(image)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_rss(implementation: str, path: Path) -> int:
+    # Peak RSS of a fresh process that decodes the image and runs one implementation once.
+    # tracemalloc cannot see PIL's buffers, which is where the LUT version does its work.
+    command = [sys.executable, "-m", "benchmarks.bench_to_transparent", "--child", implementation]
+    result = subprocess.run([*command, str(path)], capture_output=True, text=True, check=True)
+    return int(result.stdout)
+
+
+def _child(implementation: str, path: Path) -> None:
+    # Decoding only allocates the image itself, so the setup does not set the high-water
+    # mark the way generating the synthetic sketch would.
+    with Image.open(path) as image:
+        image.load()
+    if implementation != "none":
+        IMPLEMENTATIONS[implementation](image)
+    print(_peak_rss_self())
+
+
+def _peak_rss_self() -> int:
+    # Linux carries ru_maxrss across exec, so a child would report the parent's peak;
+    # VmHWM belongs to this process's own address space.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 2048, 4096])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--child", nargs=2, metavar=("IMPLEMENTATION", "IMAGE"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child[0], Path(args.child[1]))
+        return
+
+    print(
+        f"{'size':>6} {'float ms':>10} {'lut ms':>10} {'speedup':>8} {'float MB':>9} {'lut MB':>8}"
+    )
+    for size in args.sizes:
+        image = synthetic_sketch(size)
+        if to_transparent(image).tobytes() != to_transparent_float(image).tobytes():
+            raise SystemExit(f"Output mismatch at {size}x{size}")
+
+        float_s = measure(to_transparent_float, image, args.repeats)
+        lut_s = measure(to_transparent, image, args.repeats)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sketch.png"
+            image.save(path)
+            baseline = peak_rss("none", path)
+            float_peak = peak_rss("float", path) - baseline
+            lut_peak = peak_rss("lut", path) - baseline
+        print(
+            f"{size:>6} {float_s * 1e3:>10.1f} {lut_s * 1e3:>10.1f} {float_s / lut_s:>7.1f}x"
+            f" {float_peak / 2**20:>9.1f} {lut_peak / 2**20:>8.1f}"
+        )
+    print(
+        "\nMB = peak RSS of a process running the conversion once, minus that of one that only"
+        " decodes the image."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Compare two benchmark result files and flag throughput regressions."""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: Path) -> dict[str, dict]:
+    report = json.loads(path.read_text())
+    return {result["name"]: result for result in report["results"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.10,
+        help="Fail when throughput drops by more than this fraction (default: 0.10).",
+    )
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    regressions = []
+    print(f"{'benchmark':<42} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for name in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[name]["throughput"], candidate[name]["throughput"]
+        change = after / before - 1
+        marker = ""
+        if change < -args.max_regression:
+            regressions.append(name)
+            marker = "  ❌"
+        print(f"{name:<42} {before:>12.1f} {after:>12.1f} {change:>+7.1%}{marker}")
+
+    for name in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{name:<42} only in {'baseline' if name in baseline else 'candidate'}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.max_regression:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
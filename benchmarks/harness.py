@@ -0,0 +1,156 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+
+# Set in the copy of the benchmark script that peak_rss_increase starts: that process only
+# runs this one benchmark, once, and prints how far it raised the peak RSS.
+PEAK_RSS_ENV = "BENCH_PEAK_RSS_OF"
+
+
+@dataclass
+class BenchResult:
+    name: str
+    unit: str
+    items_per_call: float
+    throughput: float
+    latency_s: dict[str, float]
+    peak_memory_bytes: int | None
+    calls: int
+    params: dict = field(default_factory=dict)
+
+
+def measure(
+    name: str,
+    fn: Callable[[], object],
+    items_per_call: float,
+    unit: str,
+    repeats: int = 5,
+    warmup: int = 1,
+    setup: Callable[[], object] | None = None,
+    params: dict | None = None,
+) -> BenchResult:
+    # Latencies are per call of fn; throughput is items per second over the median call.
+    # Peak memory is measured in a fresh process (see peak_rss_increase).
+    measuring = os.environ.get(PEAK_RSS_ENV)
+    if measuring is not None:
+        if measuring == name:
+            _report_peak_rss_increase(fn, setup)
+        return BenchResult(name, unit, items_per_call, 0.0, {}, None, 0, params or {})
+
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    latencies = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    peak = peak_rss_increase(name)
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return BenchResult(
+        name=name,
+        unit=unit,
+        items_per_call=items_per_call,
+        throughput=items_per_call / p50,
+        latency_s={
+            "min": min(latencies),
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "max": max(latencies),
+        },
+        peak_memory_bytes=peak,
+        calls=repeats,
+        params=params or {},
+    )
+
+
+def peak_rss_increase(name: str) -> int | None:
+    # Reruns the benchmark script in a child that runs only this benchmark, once, and
+    # returns how far that call raised the child's peak RSS. Unlike tracemalloc this sees
+    # PIL's image buffers; it does not see pool workers started by the benchmark, and
+    # memory freed while building the inputs is reused first, so small short-lived
+    # allocations can read as 0. None without Linux's /proc, which resets and reports it.
+    if not os.path.exists("/proc/self/clear_refs"):
+        return None
+    result = subprocess.run(
+        [sys.executable, *sys.orig_argv[1:]],
+        env={**os.environ, PEAK_RSS_ENV: name},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout.split()[-1])
+
+
+def _report_peak_rss_increase(fn: Callable[[], object], setup: Callable[[], object] | None):
+    if setup:
+        setup()
+    # Resets VmHWM to the current RSS, so the inputs built so far do not count.
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = _proc_status_bytes("VmRSS")
+    fn()
+    print(_proc_status_bytes("VmHWM") - before, flush=True)
+    os._exit(0)
+
+
+def _proc_status_bytes(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) * 1024
+    raise OSError(f"No {field} in /proc/self/status")
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def save_results(results: list[BenchResult], path: Path) -> None:
+    if PEAK_RSS_ENV in os.environ:
+        raise RuntimeError(f"Benchmark {os.environ[PEAK_RSS_ENV]!r} not found")
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": [asdict(result) for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def print_results(results: list[BenchResult]) -> None:
+    print(f"{'benchmark':<42} {'throughput':>18} {'p50 us':>11} {'p99 us':>11} {'peak MB':>9}")
+    for r in results:
+        print(
+            f"{r.name:<42} {r.throughput:>12.1f} {r.unit:<5} "
+            f"{r.latency_s['p50'] * 1e6:>11.1f} {r.latency_s['p99'] * 1e6:>11.1f} "
+            f"{_megabytes(r.peak_memory_bytes):>9}"
+        )
+
+
+def _megabytes(size: int | None) -> str:
+    return "-" if size is None else f"{size / 2**20:.2f}"
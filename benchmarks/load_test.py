@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Load-test the local service: requests/s and latency percentiles for each endpoint."""
+
+import argparse
+import http.client
+import io
+import itertools
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from app.cli.service import SketchService, make_server
+from benchmarks.harness import BenchResult, print_results, save_results
+from benchmarks.synthetic import random_monster_stats, synthetic_sketch
+
+ENDPOINTS = ("health", "scale", "sketch")
+
+
+def scale_bodies(n: int, seed: int = 0) -> list[bytes]:
+    columns = random_monster_stats(n, seed=2 * seed)
+    targets = random_monster_stats(n, seed=2 * seed + 1)["challenge_rating"]
+    return [
+        json.dumps(
+            {
+                "target_cr": float(targets[i]),
+                "monster": {name: values[i].item() for name, values in columns.items()},
+            }
+        ).encode()
+        for i in range(n)
+    ]
+
+
+def sketch_bodies(n: int, size: int, seed: int = 0) -> list[bytes]:
+    # Variants of one drawing with a single pixel changed, so they differ for the cache but
+    # cost the same to convert.
+    base = synthetic_sketch(size, seed=seed)
+    bodies = []
+    for i in range(n):
+        image = base.copy()
+        image.putpixel((i % size, i // size % size), (i % 251, 0, 0))
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        bodies.append(buffer.getvalue())
+    return bodies
+
+
+def run_load(
+    url: str,
+    endpoint: str,
+    bodies: list[bytes],
+    requests: int,
+    concurrency: int,
+) -> BenchResult:
+    parts = urlsplit(url)
+    method, path = ("GET", "/health") if endpoint == "health" else ("POST", f"/{endpoint}")
+    next_index = itertools.count().__next__
+    lock = threading.Lock()
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    def client() -> None:
+        # One keep-alive connection per client, as a VTT integration would hold.
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+        mine, codes = [], {}
+        while True:
+            with lock:
+                i = next_index()
+            if i >= requests:
+                break
+            body = bodies[i % len(bodies)] if bodies else None
+            start = time.perf_counter()
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            codes[response.status] = codes.get(response.status, 0) + 1
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            for status, count in codes.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return BenchResult(
+        name=f"{endpoint}[c={concurrency}, {len(bodies) or 1} distinct]",
+        unit="req/s",
+        items_per_call=1,
+        throughput=requests / elapsed,
+        latency_s={
+            "min": min(latencies),
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "max": max(latencies),
+        },
+        peak_memory_bytes=0,
+        calls=requests,
+        params={
+            "endpoint": endpoint,
+            "concurrency": concurrency,
+            "distinct": len(bodies),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        },
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--url", default=None, help="A running service; by default one is started in-process."
+    )
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=None,
+        help="Distinct request bodies, cycled (default: one per request, so no cache hits).",
+    )
+    parser.add_argument("--size", type=int, default=256, help="Sketch side length in pixels.")
+    parser.add_argument("--workers", type=int, default=None, help="In-process service workers.")
+    parser.add_argument("--output", type=Path, default=None, help="Also write JSON here.")
+    args = parser.parse_args()
+
+    service = server = None
+    url = args.url
+    if url is None:
+        service = SketchService(workers=args.workers)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://{}:{}".format(*server.server_address[:2])
+
+    distinct = args.distinct or args.requests
+    results = []
+    try:
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                # New bodies for every run, so no run is served from an earlier run's cache.
+                seed = len(results)
+                if endpoint == "scale":
+                    bodies = scale_bodies(distinct, seed)
+                elif endpoint == "sketch":
+                    bodies = sketch_bodies(distinct, args.size, seed)
+                else:
+                    bodies = []
+                results.append(run_load(url, endpoint, bodies, args.requests, concurrency))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+    print_results(results)
+    for result in results:
+        print(f"  {result.name}: statuses {result.params['statuses']}")
+    if args.output:
+        save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Run the image conversion and monster scaling benchmarks and save the results as JSON."""
+
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from app.cli.handlers import process_images
+from app.domain.models.monster import Monster, MonsterStats
+from app.domain.models.monster_table import STAT_COLUMNS, MonsterTable
+from app.domain.services.combat_simulation import Combatant, simulate_combat
+from app.domain.services.effective_cr import effective_crs
+from app.domain.services.image_processing import to_transparent
+from app.domain.services.scale_monster import (
+    scale_monster,
+    scale_monsters,
+    scale_monsters_fractional,
+    scale_monsters_to_xp,
+)
+from app.repositories.bestiary_repo import Bestiary
+from benchmarks.harness import BenchResult, measure, print_results, save_results
+from benchmarks.synthetic import make_image_tree, random_monster_stats, synthetic_sketch
+
+
+def bench_to_transparent(sizes: list[int], repeats: int) -> list[BenchResult]:
+    results = []
+    for size in sizes:
+        image = synthetic_sketch(size)
+        results.append(
+            measure(
+                f"to_transparent[{size}x{size}]",
+                lambda image=image: to_transparent(image),
+                items_per_call=size * size / 1e6,
+                unit="MP/s",
+                repeats=repeats,
+                params={"size": size},
+            )
+        )
+    return results
+
+
+def bench_process_images(n_files: int, workers: list[int], repeats: int) -> list[BenchResult]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        images_dir = make_image_tree(Path(tmp) / "images", n_files)
+        sketch_dir = Path(tmp) / "sketch"
+
+        def clean() -> None:
+            shutil.rmtree(sketch_dir, ignore_errors=True)
+
+        for count in workers:
+            results.append(
+                measure(
+                    f"process_images[{n_files} files, {count} workers]",
+                    lambda count=count: process_images(images_dir, sketch_dir, workers=count),
+                    items_per_call=n_files,
+                    unit="files/s",
+                    repeats=repeats,
+                    setup=clean,
+                    params={"files": n_files, "workers": count},
+                )
+            )
+        results.append(
+            measure(
+                f"process_images[{n_files} files, 1 worker, pipelined]",
+                lambda: process_images(images_dir, sketch_dir, workers=1, in_flight=4),
+                items_per_call=n_files,
+                unit="files/s",
+                repeats=repeats,
+                setup=clean,
+                params={"files": n_files, "workers": 1, "in_flight": 4},
+            )
+        )
+        results.append(
+            measure(
+                f"process_images[{n_files} files, up to date]",
+                lambda: process_images(images_dir, sketch_dir, workers=1),
+                items_per_call=n_files,
+                unit="files/s",
+                repeats=repeats,
+                params={"files": n_files, "workers": 1},
+            )
+        )
+    return results
+
+
+def bench_monsters(n_monsters: int, repeats: int) -> list[BenchResult]:
+    columns = random_monster_stats(n_monsters)
+    rows = [
+        MonsterStats(
+            challenge_rating=float(columns["challenge_rating"][i]),
+            **{name: int(columns[name][i]) for name in STAT_COLUMNS[1:]},
+        )
+        for i in range(n_monsters)
+    ]
+    targets = random_monster_stats(n_monsters, seed=1)["challenge_rating"]
+    pairs = [(Monster(stats), float(target)) for stats, target in zip(rows, targets, strict=True)]
+    params = {"monsters": n_monsters}
+    fractional_targets = targets * 0.99 + 0.01
+    # 25% tougher, capped at the CR 30 XP.
+    target_xp = np.minimum(scale_monsters(columns, targets)["xp"] * 1.25, 155_000)
+
+    # The per-monster APIs are timed one call at a time so percentiles are per monster.
+    next_stats = itertools.cycle(rows).__next__
+    next_pair = itertools.cycle(pairs).__next__
+    return [
+        measure(
+            "Monster()",
+            lambda: Monster(next_stats()),
+            items_per_call=1,
+            unit="mon/s",
+            repeats=n_monsters,
+            params=params,
+        ),
+        measure(
+            "scale_monster",
+            lambda: scale_monster(*next_pair()),
+            items_per_call=1,
+            unit="mon/s",
+            repeats=n_monsters,
+            params=params,
+        ),
+        measure(
+            f"scale_monsters[{n_monsters}]",
+            lambda: scale_monsters(columns, targets),
+            items_per_call=n_monsters,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+        measure(
+            f"scale_monsters_fractional[{n_monsters}]",
+            lambda: scale_monsters_fractional(columns, fractional_targets),
+            items_per_call=n_monsters,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+        measure(
+            f"scale_monsters_to_xp[{n_monsters}]",
+            lambda: scale_monsters_to_xp(columns, target_xp),
+            items_per_call=n_monsters,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+        measure(
+            f"effective_crs[{n_monsters}]",
+            lambda: effective_crs(columns),
+            items_per_call=n_monsters,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+    ]
+
+
+def bench_bestiary(n_monsters: int, repeats: int) -> list[BenchResult]:
+    columns = random_monster_stats(n_monsters)
+    table = MonsterTable(columns)
+    bestiary = Bestiary()
+    bestiary.add_table((f"monster {i}" for i in range(n_monsters)), table)
+    matches = bestiary.count(cr=(3, 6), ac=(15, None))
+    params = {"monsters": n_monsters, "matches": matches}
+    return [
+        measure(
+            f"Bestiary.add_table[{n_monsters}]",
+            lambda: Bestiary().add_table((f"m{i}" for i in range(n_monsters)), table),
+            items_per_call=n_monsters,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+        measure(
+            f"Bestiary.query[CR 3-6, AC>=15 of {n_monsters}]",
+            lambda: list(bestiary.query(cr=(3, 6), ac=(15, None))),
+            items_per_call=matches,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+        measure(
+            f"Bestiary.query_tables[CR 3-6, AC>=15 of {n_monsters}]",
+            lambda: list(bestiary.query_tables(cr=(3, 6), ac=(15, None))),
+            items_per_call=matches,
+            unit="mon/s",
+            repeats=repeats,
+            params=params,
+        ),
+    ]
+
+
+def bench_combat(encounters: int, repeats: int) -> list[BenchResult]:
+    fighter = Combatant(ac=16, hp=30, atk_bonus=5, damage=9)
+    ogre = Combatant(ac=11, hp=59, atk_bonus=6, damage=13)
+    # Throughput is in millions of encounter-rounds (Mrd), the unit of work of the simulator.
+    rounds = simulate_combat([fighter] * 4, [ogre] * 2, encounters=encounters, seed=0)
+    return [
+        measure(
+            f"simulate_combat[{encounters} encounters, 4v2]",
+            lambda: simulate_combat([fighter] * 4, [ogre] * 2, encounters=encounters, seed=0),
+            items_per_call=rounds.total_rounds / 1e6,
+            unit="Mrd/s",
+            repeats=repeats,
+            params={"encounters": encounters},
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 2048])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--monsters", type=int, default=10_000)
+    parser.add_argument("--encounters", type=int, default=100_000)
+    parser.add_argument("--quick", action="store_true", help="Small inputs for a smoke run.")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.repeats, args.sizes, args.files, args.monsters = 3, [256], 20, 1_000
+        args.encounters = 10_000
+    workers = sorted({1, os.cpu_count() or 1})
+
+    results = [
+        *bench_to_transparent(args.sizes, args.repeats),
+        *bench_process_images(args.files, workers, args.repeats),
+        *bench_monsters(args.monsters, args.repeats),
+        *bench_bestiary(args.monsters * 10, args.repeats),
+        *bench_combat(args.encounters, args.repeats),
+    ]
+    print_results(results)
+    save_results(results, args.output)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
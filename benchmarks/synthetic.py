@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from app.repositories.cr_repo import CR_TABLE, CRColumn
+
+
+def synthetic_sketch(width: int, height: int | None = None, seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    height = height or width
+    pixels = np.full((height, width), 255, dtype=np.uint8)
+    strokes = rng.random((height, width)) < 0.15
+    pixels[strokes] = rng.integers(0, 230, size=int(strokes.sum()), dtype=np.uint8)
+    return Image.fromarray(pixels, mode="L").convert("RGB")
+
+
+def make_image_tree(root: Path, n_files: int, size: int = 128, per_dir: int = 50) -> Path:
+    for i in range(n_files):
+        path = root / f"dir_{i // per_dir:03d}" / f"sketch_{i:05d}.png"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        synthetic_sketch(size, seed=i).save(path)
+    return root
+
+
+def random_monster_stats(n: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(CR_TABLE), n)
+
+    def around(low: CRColumn, high: CRColumn) -> np.ndarray:
+        lo, hi = CR_TABLE.column(low)[rows], CR_TABLE.column(high)[rows]
+        return np.maximum(1, rng.integers(lo, hi + 1))
+
+    return {
+        "challenge_rating": CR_TABLE.column(CRColumn.CR)[rows],
+        "armor_class": CR_TABLE.column(CRColumn.AC)[rows] + rng.integers(-2, 3, n),
+        "hit_points": around(CRColumn.HP_MIN, CRColumn.HP_MAX),
+        "attack_bonus": CR_TABLE.column(CRColumn.ATK)[rows] + rng.integers(0, 3, n),
+        "damage": around(CRColumn.DMG_MIN, CRColumn.DMG_MAX),
+        "save_dc": CR_TABLE.column(CRColumn.SAVE)[rows] + rng.integers(-1, 2, n),
+    }
@@ -1,67 +1,197 @@
 #!/usr/bin/env python3
 import argparse
 import subprocess
+from contextlib import nullcontext
 from pathlib import Path
 
-from PIL import Image
-
-from app.domain.services.image_processing import to_transparent
-
-SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
-
-
-def convert(inp: Path, out: Path, invert: bool = False) -> None:
-    image = Image.open(inp)
-    result = to_transparent(image, invert=invert)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    result.save(out, format="PNG")
-
-
-def needs_processing(img_path: Path, sketch_path: Path) -> bool:
-    if not sketch_path.exists():
-        return True
-    return img_path.stat().st_mtime > sketch_path.stat().st_mtime
-
-
-def git_commit_and_push(modified_files: list[Path]) -> None:
-    if not modified_files:
-        print("No new images processed. Nothing to commit.")
-        return
+from app.cli.handlers import process_images, process_maps, watch_images
+from app.domain.services.map_tiles import TileOptions
+from app.domain.services.sketch_encoding import EncodingPolicy, SketchEncoding
+from app.repositories.sketch_manifest import MANIFEST_FILENAME
+from app.utils.git_publish import publish
+from app.utils.profiling import PipelineProfiler
+
+
+def git_commit_and_push(
+    modified_files: list[Path],
+    commit: bool = True,
+    push: bool = True,
+    profiler: PipelineProfiler | None = None,
+) -> None:
+    # Also commits whatever earlier --stage-only runs left staged.
     try:
-        for file_path in modified_files:
-            subprocess.run(["git", "add", str(file_path)], check=True)
-        rel_paths = [str(path.relative_to(Path.cwd())) for path in modified_files]
-        commit_msg = "Processed and added sketches:\n" + "\n".join(rel_paths)
-        subprocess.run(["git", "commit", "-m", commit_msg], check=True)
-        subprocess.run(["git", "push"], check=True)
-        print("✅ Changes committed and pushed.")
+        result = publish(modified_files, commit=commit, push=push, profiler=profiler)
     except subprocess.CalledProcessError as e:
-        print(f"❌ Git command failed: {e}")
+        print(f"❌ Git command failed: {e}\n{e.stderr}")
+        return
+    if not modified_files and not result.commit and not result.pushed:
+        print("No new images processed. Nothing to commit.")
+        return
+    print(f"✅ Git: {result.summary()}.")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Convert white background to transparent alpha.")
     parser.add_argument("--invert", action="store_true")
     parser.add_argument("--force", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPU cores).",
+    )
+    parser.add_argument(
+        "--in-flight",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Run one worker that overlaps reading, converting and writing on threads, "
+        "holding at most N images in memory.",
+    )
+    parser.add_argument(
+        "--tile-rows",
+        type=int,
+        default=None,
+        help="Stream each image in strips of this many rows to bound memory on huge maps "
+        "(8-bit non-interlaced PNGs; other images are decoded whole first).",
+    )
+    parser.add_argument(
+        "--encoding",
+        choices=[*SketchEncoding, *EncodingPolicy],
+        default=SketchEncoding.RGBA_PNG,
+        help="Output encoding, or a policy that picks one per file (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(10),
+        default=6,
+        metavar="0-9",
+        help="0 encodes fastest, 9 gives the smallest files (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[],
+        metavar="PX",
+        help="Also write copies fitted to these longest-edge sizes to res/sketch_<PX>.",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Only process images whose path under res/images matches (repeatable).",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip images and directories whose path under res/images matches (repeatable).",
+    )
+    parser.add_argument(
+        "--maps",
+        action="store_true",
+        help="Instead of sketches, build Deep Zoom tile pyramids for grid maps "
+        "(names ending in _<columns>x<rows>) into res/sketch_tiles.",
+    )
+    parser.add_argument("--tile-size", type=int, default=256, help="Pyramid tile size in pixels.")
+    parser.add_argument(
+        "--cells", action="store_true", help="With --maps, also write every grid cell."
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and reprocess images as they change (nothing is committed).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=Path("profile.json"),
+        default=None,
+        help="Record per-file, per-stage timings and write a JSON report (default: %(const)s).",
+    )
+    parser.add_argument(
+        "--stage-only",
+        action="store_true",
+        help="Stage the outputs without committing; the next run commits them with its own.",
+    )
+    parser.add_argument("--no-push", action="store_true", help="Commit without pushing.")
     args = parser.parse_args()
+    if args.in_flight and args.workers is not None and args.workers > 1:
+        parser.error("--in-flight runs a single worker; it cannot be combined with --workers > 1")
 
     base_dir = Path(__file__).parent
     images_dir = base_dir / "res" / "images"
     sketch_dir = base_dir / "res" / "sketch"
 
-    processed = []
-    for img_path in images_dir.rglob("*"):
-        if img_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            continue
-        relative_path = img_path.relative_to(images_dir)
-        sketch_path = sketch_dir / relative_path.with_suffix(".png")
-        if not args.force and not needs_processing(img_path, sketch_path):
-            continue
-        print(f"Processing: {img_path} -> {sketch_path}")
-        convert(img_path, sketch_path, invert=args.invert)
-        processed.append(sketch_path)
+    publish_options = dict(commit=not args.stage_only, push=not args.no_push)
+    options = dict(
+        invert=args.invert,
+        threshold=args.threshold,
+        workers=args.workers,
+        in_flight=args.in_flight,
+        tile_rows=args.tile_rows,
+        encoding=args.encoding,
+        compress_level=args.compress_level,
+        sizes=tuple(args.sizes),
+        include=args.include,
+        exclude=args.exclude,
+    )
+    if args.maps:
+        if args.encoding not in SketchEncoding:
+            parser.error(f"--maps needs a fixed --encoding, not the {args.encoding} policy")
+        tiles_dir = sketch_dir.with_name(f"{sketch_dir.name}_tiles")
+        tile_options = TileOptions(
+            tile_size=args.tile_size,
+            cells=args.cells,
+            encoding=args.encoding,
+            compress_level=args.compress_level,
+        )
+        changed = process_maps(
+            images_dir,
+            tiles_dir,
+            force=args.force,
+            invert=args.invert,
+            threshold=args.threshold,
+            tile_options=tile_options,
+            workers=args.workers,
+            include=args.include,
+            exclude=args.exclude,
+        )
+        print(f"{len(changed)} tile files changed in {tiles_dir}")
+        if changed:
+            changed.append(tiles_dir / MANIFEST_FILENAME)
+        git_commit_and_push(changed, **publish_options)
+        return
+
+    if args.watch:
+        print(f"Watching {images_dir} (Ctrl+C to stop)...")
+        try:
+            watch_images(images_dir, sketch_dir, force=args.force, **options)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        return
 
-    git_commit_and_push(processed)
+    profiler = PipelineProfiler() if args.profile else None
+    with profiler or nullcontext():
+        processed = process_images(
+            images_dir, sketch_dir, force=args.force, profiler=profiler, **options
+        )
+    for path in processed:
+        print(f"Processed: {path}" if path.exists() else f"Removed:   {path}")
+
+    if processed:
+        processed.append(sketch_dir / MANIFEST_FILENAME)
+    # Published before the report is written, so the git stages are in it too.
+    git_commit_and_push(processed, profiler=profiler, **publish_options)
+    if profiler:
+        profiler.write_report(args.profile)
+        print(f"\n{profiler.summary()}\n\nProfile written to {args.profile}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import io
+import json
+from itertools import islice
+
+import pytest
+
+from app.cli.batch_scale import RowError, main, read_records, scale_records, write_records
+from app.domain.models.monster import Monster, MonsterStats
+from app.domain.services.scale_monster import scale_monster
+
+CSV = """\
+name,challenge_rating,armor_class,hit_points,attack_bonus,damage,save_dc,to_cr
+Goblin,1/4,15,7,4,5,11,
+Ogre,2,11,59,6,13,,5
+Broken,3,abc,10,4,5,,
+Weak,3,13,0,4,5,,
+Lost,3,13,10,4,5,12,0.3
+"""
+
+
+def scaled_stats(cr, ac, hp, atk, damage, save_dc, target):
+    monster = Monster(MonsterStats(cr, ac, hp, atk, damage, save_dc or 13))
+    scaled = scale_monster(monster, target)
+    return [scaled.cr, scaled.ac, scaled.hp, scaled.atk_bonus, scaled.damage]
+
+
+def test_rows_are_scaled_or_reported_in_order():
+    results = list(scale_records(read_records(io.StringIO(CSV), "csv"), 1, target_column="to_cr"))
+
+    goblin, ogre, broken, weak, lost = results
+    assert goblin["name"] == "Goblin"
+    assert [goblin[k] for k in ("challenge_rating", "armor_class", "hit_points")] == [1, 15, 39]
+    assert goblin["save_dc"] == 11
+    assert goblin["xp"] == 200
+    assert ogre["challenge_rating"] == 5
+    assert ogre["save_dc"] is None
+    stats = ["challenge_rating", "armor_class", "hit_points", "attack_bonus", "damage"]
+    assert [ogre[k] for k in stats] == scaled_stats(2, 11, 59, 6, 13, None, 5)
+
+    assert broken == RowError(4, "armor_class: not a number: 'abc'")
+    assert weak.line == 5 and "Hit points must be greater than 0" in weak.message
+    assert lost.line == 6 and "Invalid target challenge rating" in lost.message
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_chunking_does_not_change_results(chunk_size):
+    records = list(read_records(io.StringIO(CSV), "csv"))
+    expected = list(scale_records(records, 1, "to_cr"))
+    assert list(scale_records(records, 1, "to_cr", chunk_size=chunk_size)) == expected
+
+
+def test_results_stream_before_the_input_ends():
+    record = {
+        "challenge_rating": 1,
+        "armor_class": 13,
+        "hit_points": 75,
+        "attack_bonus": 4,
+        "damage": 10,
+    }
+
+    def endless():
+        line = 0
+        while True:
+            line += 1
+            yield line, record
+
+    first = list(islice(scale_records(endless(), target_cr=2, chunk_size=8), 20))
+    assert len(first) == 20
+    assert all(result["challenge_rating"] == 2 for result in first)
+
+
+def test_jsonl_reports_bad_lines():
+    text = '{"challenge_rating": 1, "armor_class": 13, "hit_points": 75, "attack_bonus": 4,'
+    text += ' "damage": 10, "save_dc": null}\n\nnot json\n[1, 2]\n'
+    results = list(scale_records(read_records(io.StringIO(text), "jsonl"), target_cr=3))
+
+    assert results[0]["challenge_rating"] == 3
+    assert results[0]["save_dc"] is None
+    assert results[1].line == 3 and results[1].message.startswith("Invalid JSON")
+    assert results[2] == RowError(4, "Expected a JSON object")
+
+
+def test_write_records_csv_and_errors():
+    out, errors = io.StringIO(), io.StringIO()
+    rows = [{"name": "a", "challenge_rating": 1}, RowError(3, "bad"), {"name": "b"}]
+    assert write_records(rows, out, "csv", errors) == (2, 1)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("name,challenge_rating,xp,")
+    assert lines[1:] == ["a,1,,,,,,,", "b,,,,,,,,"]
+    assert errors.getvalue() == "line 3: bad\n"
+
+
+def test_main_converts_csv_to_jsonl(tmp_path, capsys):
+    source = tmp_path / "bestiary.csv"
+    source.write_text(CSV)
+    output = tmp_path / "scaled.jsonl"
+
+    assert main([str(source), "-o", str(output), "--target-cr", "1/2"]) == 1
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["name"] for row in rows] == ["Goblin", "Ogre", "Lost"]
+    assert {row["challenge_rating"] for row in rows} == {0.5}
+    err = capsys.readouterr().err
+    assert "line 4: armor_class" in err
+    assert "3 monsters scaled, 2 rows skipped" in err
+
+
+def test_main_reads_stdin(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(CSV.replace("abc", "13").replace(",0,", ",9,")))
+    assert main(["-", "--format", "csv", "--target-column", "to_cr", "--target-cr", "1"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[0].split(",")[-2:] == ["xp", "proficiency_bonus"]
+    assert len(captured.out.splitlines()) == 5
+
+
+def test_main_needs_a_target_and_a_format(tmp_path):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "x.csv")])
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "x.txt"), "--target-cr", "1"])
@@ -1,4 +1,19 @@
-from app.cli.handlers import process_images
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from app.cli.handlers import (
+    handle_build_encounter,
+    handle_scale_ladder,
+    handle_simulate_combat,
+    process_images,
+    process_maps,
+    sync_images,
+)
+from app.repositories.sketch_manifest import sized_dir
+from app.utils.profiling import PipelineProfiler
 
 
 def test_process_images_skips_up_to_date(tmp_path):
@@ -35,3 +50,452 @@ def test_process_images_processes_new_file(tmp_path):
     results = process_images(images_dir, sketch_dir, force=False)
     assert len(results) == 1
     assert (sketch_dir / "test.png").exists()
+
+
+def test_process_images_reports_failures_and_continues(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    (images_dir / "broken.png").write_bytes(b"not an image")
+    Image.new("L", (10, 10), 255).save(images_dir / "good.png")
+
+    failures = []
+    results = process_images(
+        images_dir, sketch_dir, workers=1, on_error=lambda path, e: failures.append(path)
+    )
+    assert results == [sketch_dir / "good.png"]
+    assert failures == [images_dir / "broken.png"]
+
+
+def test_process_images_pool_keeps_deterministic_order(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    (images_dir / "sub").mkdir(parents=True)
+
+    from PIL import Image
+
+    names = ["b.png", "a.png", "sub/c.jpg", "d.bmp"]
+    for name in names:
+        Image.new("RGB", (10, 10), (255, 255, 255)).save(images_dir / name)
+
+    results = process_images(images_dir, sketch_dir, workers=2)
+    expected = sorted(sketch_dir / Path(name).with_suffix(".png") for name in names)
+    assert results == expected
+    assert all(path.exists() for path in results)
+
+
+def test_process_images_reprocesses_when_params_change(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    Image.new("L", (10, 10), 255).save(images_dir / "test.png")
+
+    assert len(process_images(images_dir, sketch_dir)) == 1
+    assert process_images(images_dir, sketch_dir) == []
+    assert len(process_images(images_dir, sketch_dir, invert=True)) == 1
+
+
+def test_process_images_rebuilds_legacy_sketches_under_new_settings(tmp_path):
+    from PIL import Image
+
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+    sketch_dir.mkdir()
+    Image.linear_gradient("L").resize((8, 8)).save(images_dir / "a.png")
+    # A sketch written by the pre-manifest script, newer than its source.
+    legacy = sketch_dir / "a.png"
+    Image.new("RGBA", (8, 8)).save(legacy)
+    st = legacy.stat()
+    os.utime(legacy, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert process_images(images_dir, sketch_dir, workers=1, invert=True) == [legacy]
+    assert process_images(images_dir, sketch_dir, workers=1, invert=True) == []
+
+
+def test_process_images_adopts_legacy_sketches_made_with_the_defaults(tmp_path):
+    from PIL import Image
+
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+    sketch_dir.mkdir()
+    Image.linear_gradient("L").resize((8, 8)).save(images_dir / "a.png")
+    legacy = sketch_dir / "a.png"
+    Image.new("RGBA", (8, 8)).save(legacy)
+    st = legacy.stat()
+    os.utime(legacy, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert process_images(images_dir, sketch_dir, workers=1) == []
+
+
+def test_process_images_tiled_mode_matches_in_memory(tmp_path):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    gradient = Image.linear_gradient("L").resize((40, 30))
+    gradient.save(images_dir / "map.png")
+
+    in_memory = process_images(images_dir, tmp_path / "a", workers=1, sizes=(20, 8))
+    tiled = process_images(images_dir, tmp_path / "b", workers=1, tile_rows=4, sizes=(20, 8))
+
+    with Image.open(in_memory[0]) as expected, Image.open(tiled[0]) as actual:
+        assert actual.tobytes() == expected.tobytes()
+    for size in (20, 8):
+        expected_path = sized_dir(tmp_path / "a", size) / "map.png"
+        actual_path = sized_dir(tmp_path / "b", size) / "map.png"
+        with Image.open(expected_path) as expected, Image.open(actual_path) as actual:
+            assert actual.size == expected.size
+            assert actual.tobytes() == expected.tobytes()
+
+
+def test_handle_scale_ladder_prints_every_cr(monkeypatch, capsys):
+    answers = iter(["1", "13", "75", "4", "10", "", ""])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    handle_scale_ladder()
+
+    lines = capsys.readouterr().out.splitlines()
+    header = next(i for i, line in enumerate(lines) if line.split()[:1] == ["CR"])
+    table = [line.split() for line in lines[header + 1 :] if line.strip()]
+    assert [row[0] for row in table][:5] == ["0", "1/8", "1/4", "1/2", "1"]
+    assert len(table) == 34
+    assert table[4] == ["1", "200", "13", "75", "+4", "10", "-"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_images_profiles_each_stage(tmp_path, workers):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    for name in ["a.png", "b.png"]:
+        Image.new("L", (12, 10), 255).save(images_dir / name)
+
+    profiler = PipelineProfiler(trace_memory=False)
+    process_images(images_dir, tmp_path / "sketch", workers=workers, profiler=profiler)
+
+    stages = {(r.file, r.stage) for r in profiler.records}
+    for name in ["a.png", "b.png"]:
+        for stage in ["decode", "convert", "encode"]:
+            assert (str(images_dir / name), stage) in stages
+    assert ("", "scan") in stages
+    assert all(r.pixels == 120 for r in profiler.records if r.file)
+
+
+def test_process_images_profiles_the_scan_and_manifest_checks(tmp_path, monkeypatch):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    from app.repositories.sketch_manifest import SketchManifest
+
+    for name in ["a.png", "b.png", "c.png"]:
+        Image.new("L", (12, 10), 255).save(images_dir / name)
+    process_images(images_dir, tmp_path / "sketch")
+    real_needs_processing = SketchManifest.needs_processing
+
+    def slow_needs_processing(*args, **kwargs):
+        time.sleep(0.01)
+        return real_needs_processing(*args, **kwargs)
+
+    monkeypatch.setattr(SketchManifest, "needs_processing", slow_needs_processing)
+    profiler = PipelineProfiler(trace_memory=False)
+
+    assert process_images(images_dir, tmp_path / "sketch", profiler=profiler) == []
+
+    stages = profiler.report()["stages"]
+    assert stages["manifest-check"]["count"] == 3
+    assert stages["manifest-check"]["seconds"] >= 0.03
+    # One more scan step finds that the tree is exhausted, plus the sweep over the outputs.
+    assert stages["scan"]["count"] == 5
+
+
+def test_process_images_writes_requested_encoding(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    Image.linear_gradient("L").resize((20, 20)).save(images_dir / "test.png")
+
+    [rgba] = process_images(images_dir, sketch_dir)
+    [la] = process_images(images_dir, sketch_dir, encoding="la-png")
+    assert la == rgba
+    with Image.open(la) as image:
+        assert image.mode == "LA"
+
+
+def test_process_images_replaces_output_when_suffix_changes(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image, features
+
+    if not features.check("webp"):
+        pytest.skip("Pillow built without WebP support")
+    Image.new("L", (10, 10), 0).save(images_dir / "test.png")
+
+    [png] = process_images(images_dir, sketch_dir)
+    removed, webp = process_images(images_dir, sketch_dir, encoding="webp-lossless")
+
+    assert removed == png
+    assert webp == sketch_dir / "test.webp"
+    assert webp.exists() and not png.exists()
+    assert process_images(images_dir, sketch_dir, encoding="webp-lossless") == []
+
+
+@pytest.mark.parametrize("tile_rows", [None, 8])
+def test_process_images_writes_every_size_from_one_pass(tmp_path, tile_rows):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    (images_dir / "maps").mkdir(parents=True)
+
+    from PIL import Image
+
+    Image.linear_gradient("L").resize((80, 40)).save(images_dir / "maps" / "cave.jpg")
+
+    results = process_images(images_dir, sketch_dir, tile_rows=tile_rows, sizes=(16, 64, 200))
+
+    assert results == [
+        sketch_dir / "maps" / "cave.png",
+        tmp_path / "sketch_200" / "maps" / "cave.png",
+        tmp_path / "sketch_64" / "maps" / "cave.png",
+        tmp_path / "sketch_16" / "maps" / "cave.png",
+    ]
+    sizes = [Image.open(path).size for path in results]
+    assert sizes == [(80, 40), (80, 40), (64, 32), (16, 8)]
+    assert process_images(images_dir, sketch_dir, sizes=(64, 16, 200)) == []
+
+
+def test_process_images_removes_sizes_no_longer_requested(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    Image.new("L", (40, 40), 0).save(images_dir / "test.png")
+
+    process_images(images_dir, sketch_dir, sizes=(32, 16))
+    results = process_images(images_dir, sketch_dir, sizes=(32,))
+
+    assert results == [
+        tmp_path / "sketch_16" / "test.png",
+        sketch_dir / "test.png",
+        tmp_path / "sketch_32" / "test.png",
+    ]
+    assert not (tmp_path / "sketch_16" / "test.png").exists()
+
+
+def test_sync_images_processes_changed_and_removes_deleted(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    (images_dir / "maps").mkdir(parents=True)
+
+    from PIL import Image
+
+    for name in ("a.png", "b.png", "maps/c.png"):
+        Image.new("L", (8, 8), 0).save(images_dir / name)
+    process_images(images_dir, sketch_dir, sizes=(4,))
+
+    Image.new("L", (8, 8), 255).save(images_dir / "a.png")
+    (images_dir / "maps" / "c.png").unlink()
+    (images_dir / "maps").rmdir()
+
+    written, deleted = sync_images(
+        images_dir, sketch_dir, [images_dir / "a.png", images_dir / "maps"], sizes=(4,)
+    )
+
+    assert written == [sketch_dir / "a.png", tmp_path / "sketch_4" / "a.png"]
+    assert deleted == [sketch_dir / "maps" / "c.png", tmp_path / "sketch_4" / "maps" / "c.png"]
+    assert (sketch_dir / "b.png").exists()
+    assert process_images(images_dir, sketch_dir, sizes=(4,)) == []
+
+
+def test_sync_images_reports_outputs_dropped_by_new_settings_as_deleted(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    Image.new("L", (8, 8), 0).save(images_dir / "a.png")
+    process_images(images_dir, sketch_dir, sizes=(4,))
+    Image.new("L", (8, 8), 255).save(images_dir / "a.png")
+
+    written, deleted = sync_images(images_dir, sketch_dir, [images_dir / "a.png"])
+
+    assert written == [sketch_dir / "a.png"]
+    assert deleted == [tmp_path / "sketch_4" / "a.png"]
+
+
+def test_sync_images_with_new_directory_processes_its_contents(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    (images_dir / "maps").mkdir(parents=True)
+
+    from PIL import Image
+
+    Image.new("L", (8, 8), 0).save(images_dir / "maps" / "cave.png")
+
+    written, deleted = sync_images(images_dir, sketch_dir, [images_dir / "maps"])
+
+    assert written == [sketch_dir / "maps" / "cave.png"]
+    assert deleted == []
+
+
+def test_process_images_applies_include_and_exclude(tmp_path):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    (images_dir / "drafts").mkdir(parents=True)
+
+    from PIL import Image
+
+    for name in ("a.png", "b.jpg", "drafts/c.png"):
+        Image.new("L", (8, 8), 0).save(images_dir / name)
+
+    results = process_images(images_dir, sketch_dir, include=["*.png"], exclude=["drafts"])
+
+    assert results == [sketch_dir / "a.png"]
+
+
+def test_process_images_starts_converting_before_the_scan_ends(tmp_path, monkeypatch):
+    images_dir = tmp_path / "images"
+    sketch_dir = tmp_path / "sketch"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    import app.cli.handlers as handlers
+    from app.domain.services import sketch_conversion
+
+    for name in ("a.png", "b.png", "c.png"):
+        Image.new("L", (8, 8), 0).save(images_dir / name)
+
+    events = []
+    scan_sources, convert_image = handlers._scan_sources, sketch_conversion.convert_image
+
+    def tracing_scan(*args):
+        for scanned in scan_sources(*args):
+            events.append(("scan", scanned.key))
+            yield scanned
+
+    def tracing_convert(img_path, *args):
+        events.append(("convert", img_path.name))
+        return convert_image(img_path, *args)
+
+    monkeypatch.setattr(handlers, "_scan_sources", tracing_scan)
+    monkeypatch.setattr(sketch_conversion, "convert_image", tracing_convert)
+
+    process_images(images_dir, sketch_dir, workers=1)
+
+    assert events.index(("convert", "a.png")) < events.index(("scan", "c.png"))
+
+
+def test_process_images_pipelined_matches_serial(tmp_path):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+
+    from PIL import Image
+
+    for i in range(5):
+        Image.linear_gradient("L").resize((20 + i, 10)).save(images_dir / f"{i}.png")
+
+    serial = process_images(images_dir, tmp_path / "serial", workers=1)
+    pipelined = process_images(images_dir, tmp_path / "pipelined", workers=1, in_flight=2)
+
+    assert [p.relative_to(tmp_path / "pipelined") for p in pipelined] == [
+        p.relative_to(tmp_path / "serial") for p in serial
+    ]
+    for a, b in zip(serial, pipelined, strict=True):
+        assert a.read_bytes() == b.read_bytes()
+
+
+def test_in_flight_runs_the_pipeline_without_workers(tmp_path, monkeypatch):
+    from PIL import Image
+
+    from app.domain.services import sketch_pipeline
+
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    for i in range(3):
+        Image.linear_gradient("L").save(images_dir / f"{i}.png")
+    calls = []
+    real_run_pipeline = sketch_pipeline.run_pipeline
+
+    def run_pipeline(jobs, options, max_in_flight, **kwargs):
+        calls.append(max_in_flight)
+        return real_run_pipeline(jobs, options, max_in_flight, **kwargs)
+
+    monkeypatch.setattr(sketch_pipeline, "run_pipeline", run_pipeline)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+
+    written = process_images(images_dir, tmp_path / "sketch", in_flight=2)
+
+    assert calls == [2]
+    assert len(written) == 3
+
+
+def test_in_flight_rejects_several_workers(tmp_path):
+    (tmp_path / "images").mkdir()
+
+    with pytest.raises(ValueError, match="single worker"):
+        process_images(tmp_path / "images", tmp_path / "sketch", workers=2, in_flight=2)
+
+
+def test_process_maps_tiles_grid_maps_once(tmp_path):
+    images_dir = tmp_path / "images"
+    tiles_dir = tmp_path / "sketch_tiles"
+    (images_dir / "maps").mkdir(parents=True)
+
+    from PIL import Image
+
+    from app.domain.services.map_tiles import TileOptions
+
+    Image.linear_gradient("L").resize((60, 30)).save(images_dir / "maps" / "cave_6x3.png")
+    Image.new("L", (8, 8), 0).save(images_dir / "bakery.png")
+    options = TileOptions(tile_size=32, cells=True)
+
+    written = process_maps(images_dir, tiles_dir, tile_options=options)
+
+    assert tiles_dir / "maps" / "cave_6x3.dzi" in written
+    assert tiles_dir / "maps" / "cave_6x3_cells" / "2_5.png" in written
+    assert not (tiles_dir / "bakery.dzi").exists()
+    assert process_maps(images_dir, tiles_dir, tile_options=options) == []
+
+
+def test_handle_simulate_combat_prints_win_rates(monkeypatch, capsys):
+    answers = iter(["2", "11", "59", "6", "13", "", "1", "4", "16", "30", "5", "9", "500", ""])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    handle_simulate_combat()
+
+    out = capsys.readouterr().out
+    assert "500 encounters:" in out
+    assert "Party wins:" in out
+
+
+def test_handle_build_encounter_prints_sampled_plans(monkeypatch, capsys):
+    answers = iter(["3 3 3 3", "Hard", "4", "5", ""])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    handle_build_encounter()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert any("hard encounters (900-1599 adjusted XP)" in line for line in lines)
+    plans = [line for line in lines if " x CR " in line]
+    assert len(plans) == 5
+    assert all(900 <= int(line.split()[0]) <= 1599 for line in plans)
@@ -0,0 +1,201 @@
+import http.client
+import io
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+from app.cli import service as service_module
+from app.cli.service import Response, ResponseCache, SketchService, make_server
+from app.domain.models.monster import Monster, MonsterStats
+from app.domain.services.scale_monster import scale_monster
+
+OGRE = {
+    "challenge_rating": 2,
+    "armor_class": 11,
+    "hit_points": 59,
+    "attack_bonus": 6,
+    "damage": 13,
+    "save_dc": 13,
+}
+
+
+@pytest.fixture(scope="module")
+def service():
+    with SketchService(workers=1, max_queue=2) as service:
+        yield service
+
+
+def png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def post_json(service, target, payload):
+    response = service.handle("POST", target, json.dumps(payload).encode())
+    return response.status, json.loads(response.body)
+
+
+def test_scale_matches_scale_monster(service):
+    status, body = post_json(service, "/scale", {"target_cr": 5, "monster": OGRE})
+    assert status == 200
+    expected = scale_monster(Monster(MonsterStats(**OGRE)), 5)
+    assert body["monster"]["challenge_rating"] == 5
+    assert body["monster"]["hit_points"] == expected.hp
+    assert body["monster"]["xp"] == expected.xp
+
+
+def test_scale_batch_with_per_row_targets(service):
+    monsters = [OGRE, {**OGRE, "save_dc": None}]
+    status, body = post_json(service, "/scale", {"target_cr": [1, 0.25], "monsters": monsters})
+    assert status == 200
+    assert [m["challenge_rating"] for m in body["monsters"]] == [1, 0.25]
+    assert body["monsters"][1]["save_dc"] is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"target_cr": 5, "monster": {**OGRE, "hit_points": 0}},
+        {"target_cr": 0.3, "monster": OGRE},
+        {"monster": OGRE},
+        [1, 2],
+    ],
+)
+def test_scale_rejects_bad_requests(service, payload):
+    status, body = post_json(service, "/scale", payload)
+    assert status == 400
+    assert body["error"]
+
+
+def test_unknown_route(service):
+    assert service.handle("GET", "/nope").status == 404
+    assert service.handle("GET", "/scale").status == 404
+
+
+def test_responses_are_cached_by_content(service):
+    payload = {"target_cr": 7, "monster": OGRE}
+    post_json(service, "/scale", payload)
+    hits = service.cache.stats()["hits"]
+    post_json(service, "/scale", payload)
+    assert service.cache.stats()["hits"] == hits + 1
+    post_json(service, "/scale", {**payload, "target_cr": 8})
+    assert service.cache.stats()["hits"] == hits + 1
+
+
+def test_sketch_converts_on_the_pool(service):
+    image = Image.new("L", (16, 8), 255)
+    image.putpixel((3, 3), 0)
+    response = service.handle("POST", "/sketch?encoding=la-png", png_bytes(image))
+
+    assert response.status == 200
+    assert response.content_type == "image/png"
+    assert dict(response.headers)["X-Sketch-Encoding"] == "la-png"
+    sketch = Image.open(io.BytesIO(response.body)).convert("RGBA")
+    assert sketch.size == (16, 8)
+    assert sketch.getpixel((3, 3))[3] == 255
+    assert sketch.getpixel((0, 0))[3] == 0
+
+
+def test_sketch_rejects_bad_input(service):
+    assert service.handle("POST", "/sketch", b"not an image").status == 400
+    assert service.handle("POST", "/sketch", b"").status == 400
+    image = png_bytes(Image.new("L", (4, 4), 255))
+    assert service.handle("POST", "/sketch?encoding=jpeg", image).status == 400
+    assert service.handle("POST", "/sketch?compress_level=12", image).status == 400
+
+
+def test_full_queue_answers_503():
+    with SketchService(workers=1, max_queue=0) as service:
+        response = service.handle("POST", "/sketch", png_bytes(Image.new("L", (4, 4))))
+    assert response.status == 503
+    assert ("Retry-After", "1") in response.headers
+
+
+def wait_for_empty_queue(service, timeout=1.0):
+    # Slots are released by a callback that can run just after the response is ready.
+    deadline = time.monotonic() + timeout
+    while json.loads(service.handle("GET", "/health").body)["queue"]["queued"]:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_timed_out_jobs_keep_their_slot_until_they_finish(monkeypatch):
+    release = threading.Event()
+    real_convert = service_module.convert_bytes
+
+    def slow_convert(data, options):
+        release.wait(10)
+        return real_convert(data, options)
+
+    with SketchService(workers=1, max_queue=1) as service:
+        service._pool.shutdown()
+        service._pool = ThreadPoolExecutor(2)
+        monkeypatch.setattr(service_module, "convert_bytes", slow_convert)
+        monkeypatch.setattr(service_module, "JOB_TIMEOUT", 0.05)
+        image = png_bytes(Image.new("L", (4, 4), 255))
+
+        assert service.handle("POST", "/sketch", image).status == 504
+        # The timed-out job is still running, so the queue is still full.
+        assert service.handle("POST", "/sketch?invert=1", image).status == 503
+
+        release.set()
+        monkeypatch.setattr(service_module, "JOB_TIMEOUT", 10)
+        wait_for_empty_queue(service)
+        assert service.handle("POST", "/sketch?invert=1", image).status == 200
+
+
+def test_replaces_the_pool_when_a_worker_dies():
+    with SketchService(workers=1, max_queue=2) as service:
+        image = png_bytes(Image.new("L", (4, 4), 255))
+        for pid in list(service._pool._processes):
+            os.kill(pid, signal.SIGTERM)
+
+        crashed = service.handle("POST", "/sketch", image)
+
+        assert crashed.status == 503
+        assert ("Retry-After", "1") in crashed.headers
+        assert service.handle("POST", "/sketch?invert=1", image).status == 200
+        assert wait_for_empty_queue(service)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(b"a", Response(200, "text/plain", b"aaaa"))
+    cache.put(b"b", Response(200, "text/plain", b"bbbb"))
+    assert cache.get(b"a") is not None
+    cache.put(b"c", Response(200, "text/plain", b"cccc"))
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+    assert cache.stats()["bytes"] == 8
+    cache.put(b"huge", Response(200, "text/plain", b"x" * 11))
+    assert cache.get(b"huge") is None
+
+
+def test_http_round_trip(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+        connection.request("GET", "/health")
+        health = json.loads(connection.getresponse().read())
+        assert health["status"] == "ok"
+        assert health["queue"]["max"] == 2
+
+        # Same keep-alive connection.
+        connection.request("POST", "/scale", json.dumps({"target_cr": 3, "monster": OGRE}))
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["monster"]["challenge_rating"] == 3
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
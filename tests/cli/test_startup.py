@@ -0,0 +1,64 @@
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = {"numpy", "pandas", "PIL"}
+
+# Raise these deliberately (and explain why in the commit) if the menu really needs more.
+MENU_MODULE_BUDGET = 40
+MENU_IMPORT_BUDGET_US = 100_000
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, check=True, capture_output=True, text=True
+    )
+
+
+def newly_imported(code: str) -> set[str]:
+    script = (
+        "import json, sys\n"
+        "before = set(sys.modules)\n"
+        f"{code}\n"
+        "print(json.dumps(sorted(set(sys.modules) - before)))\n"
+    )
+    return set(json.loads(run_python("-c", script).stdout.splitlines()[-1]))
+
+
+def top_level(modules: set[str]) -> set[str]:
+    return {name.split(".")[0] for name in modules}
+
+
+def test_menu_does_not_import_heavy_dependencies():
+    assert not top_level(newly_imported("import app.cli.menu")) & HEAVY_MODULES
+
+
+def test_menu_only_imports_stdlib_and_app():
+    third_party = top_level(newly_imported("import app.cli.menu")) - {"app"}
+    third_party -= set(sys.stdlib_module_names)
+    assert not {name for name in third_party if not name.startswith("_")}
+
+
+def test_menu_module_count_within_budget():
+    assert len(newly_imported("import app.cli.menu")) <= MENU_MODULE_BUDGET
+
+
+def test_menu_import_time_within_budget():
+    timings = []
+    for _ in range(3):
+        stderr = run_python("-X", "importtime", "-c", "import app.cli.menu").stderr
+        match = re.search(r"\|\s*(\d+)\s*\|\s*app\.cli\.menu\s*$", stderr, re.MULTILINE)
+        timings.append(int(match.group(1)))
+    assert min(timings) <= MENU_IMPORT_BUDGET_US
+
+
+def test_monster_scaling_does_not_import_pandas_or_pil():
+    code = (
+        "from app.domain.models.monster import Monster, MonsterStats\n"
+        "from app.domain.services.scale_monster import scale_monster\n"
+        "scale_monster(Monster(MonsterStats(1, 13, 75, 4, 10, 13)), 5)"
+    )
+    assert not top_level(newly_imported(code)) & {"pandas", "PIL"}
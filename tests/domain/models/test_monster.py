@@ -1,9 +1,11 @@
+from dataclasses import FrozenInstanceError
+
 import pytest
 
 from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
 
 
-def make_monster(**overrides) -> Monster:
+def make_stats(**overrides) -> MonsterStats:
     defaults = dict(
         challenge_rating=1,
         armor_class=13,
@@ -12,7 +14,11 @@ def make_monster(**overrides) -> Monster:
         damage=10,
         save_dc=13,
     )
-    return Monster(stats=MonsterStats(**(defaults | overrides)))
+    return MonsterStats(**(defaults | overrides))
+
+
+def make_monster(**overrides) -> Monster:
+    return Monster(stats=make_stats(**overrides))
 
 
 class TestMonsterCRLookup:
@@ -53,3 +59,23 @@ class TestMonsterValidation:
     def test_save_dc_none_is_valid(self):
         monster = make_monster(save_dc=None)
         assert monster.save_dc is None
+
+
+class TestMonsterValueType:
+    def test_is_frozen(self):
+        monster = make_monster()
+        with pytest.raises(FrozenInstanceError):
+            monster.hp = 1
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(make_monster(), "__dict__")
+        assert not hasattr(make_stats(), "__dict__")
+
+    def test_stats_are_frozen(self):
+        with pytest.raises(FrozenInstanceError):
+            make_stats().hit_points = 1
+
+    def test_equal_monsters_hash_equal(self):
+        assert make_monster() == make_monster()
+        assert hash(make_monster()) == hash(make_monster())
+        assert make_monster() != make_monster(hit_points=76)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.domain.models.monster_table import MonsterTable, check_stat_columns
+
+
+def make_columns(**overrides):
+    defaults = dict(
+        challenge_rating=[1, 5, 0.25],
+        armor_class=[13, 15, 12],
+        hit_points=[75, 140, 40],
+        attack_bonus=[4, 6, 3],
+        damage=[10, 35, 4],
+        save_dc=[13, np.nan, 11],
+    )
+    return defaults | overrides
+
+
+class TestMonsterTable:
+    def test_rows_act_like_monsters(self):
+        table = MonsterTable(make_columns())
+        row = table[1]
+        assert (row.cr, row.xp, row.proficiency_bonus) == (5, 1800, 3)
+        assert (row.ac, row.hp, row.atk_bonus, row.damage) == (15, 140, 6, 35)
+        assert row.save_dc is None
+        assert type(row.hp) is int
+
+    def test_row_converts_to_equal_monster(self):
+        table = MonsterTable(make_columns())
+        expected = Monster(MonsterStats(1, 13, 75, 4, 10, 13))
+        assert table[0].to_monster() == expected
+
+    def test_round_trip_from_monsters(self):
+        monsters = MonsterTable(make_columns()).to_monsters()
+        assert MonsterTable.from_monsters(monsters).to_monsters() == monsters
+
+    def test_negative_index_and_len(self):
+        table = MonsterTable(make_columns())
+        assert len(table) == 3
+        assert table[-1].cr == 0.25
+        with pytest.raises(IndexError):
+            table[3]
+
+    def test_columns_are_read_only(self):
+        table = MonsterTable(make_columns())
+        with pytest.raises(ValueError):
+            table.column("hit_points")[0] = 1
+
+    def test_row_views_share_table_memory(self):
+        table = MonsterTable(make_columns())
+        assert np.shares_memory(table.columns()["hit_points"], table.column("hit_points"))
+
+    def test_take(self):
+        table = MonsterTable(make_columns()).take([2, 0])
+        assert [row.cr for row in table] == [0.25, 1]
+
+
+class TestBatchValidation:
+    def test_invalid_rows_raise(self):
+        with pytest.raises(MonsterStatsValidationException, match="row 1"):
+            MonsterTable(make_columns(hit_points=[75, 0, 40]))
+
+    def test_errors_are_reported_per_row(self):
+        _, errors = check_stat_columns(
+            make_columns(
+                challenge_rating=[1, 999, 0.25],
+                damage=[10, 35, -4],
+                attack_bonus=[4.5, 6, 3],
+            )
+        )
+        assert sorted(errors) == [0, 1, 2]
+        assert "Attack bonus must be an integer" in errors[0]
+        assert "Invalid challenge rating" in errors[1]
+        assert "Damage must be greater than 0" in errors[2]
+
+    def test_none_save_dc_is_missing(self):
+        normalized, errors = check_stat_columns(make_columns(save_dc=[13, None, 11]))
+        assert not errors
+        assert np.isnan(normalized["save_dc"][1])
+
+    def test_none_in_required_column_is_invalid(self):
+        _, errors = check_stat_columns(make_columns(hit_points=[75, None, 40]))
+        assert list(errors) == [1]
+
+    def test_integral_floats_are_accepted(self):
+        normalized, errors = check_stat_columns(make_columns(hit_points=[75.0, 140.0, 40.0]))
+        assert not errors
+        assert normalized["hit_points"].dtype == np.int64
+
+    def test_stats_without_challenge_rating(self):
+        columns = make_columns()
+        del columns["challenge_rating"]
+        normalized, errors = check_stat_columns(columns)
+        assert not errors
+        assert "challenge_rating" not in normalized
+        assert "xp" not in normalized
+        assert normalized["armor_class"].tolist() == [13, 15, 12]
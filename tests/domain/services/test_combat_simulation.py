@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from app.domain.models.monster import Monster, MonsterStats
+from app.domain.services.combat_simulation import (
+    CHUNK_SIZE,
+    DRAW,
+    MONSTERS_WIN,
+    PARTY_WIN,
+    Combatant,
+    simulate_combat,
+)
+
+FIGHTER = Combatant(ac=16, hp=30, atk_bonus=5, damage=9)
+OGRE = Monster(MonsterStats(2, 11, 59, 6, 13, None))
+
+
+def test_same_seed_gives_same_result():
+    a = simulate_combat([FIGHTER] * 4, [OGRE], encounters=2_000, seed=7)
+    b = simulate_combat([FIGHTER] * 4, [OGRE], encounters=2_000, seed=7)
+    c = simulate_combat([FIGHTER] * 4, [OGRE], encounters=2_000, seed=8)
+
+    assert np.array_equal(a.winners, b.winners) and np.array_equal(a.rounds, b.rounds)
+    assert not np.array_equal(a.rounds, c.rounds)
+
+
+def test_result_does_not_depend_on_workers():
+    encounters = CHUNK_SIZE + 100
+    serial = simulate_combat([FIGHTER], [OGRE], encounters=encounters, seed=3, workers=1)
+    pooled = simulate_combat([FIGHTER], [OGRE], encounters=encounters, seed=3, workers=2)
+
+    assert serial.encounters == encounters
+    assert np.array_equal(serial.winners, pooled.winners)
+    assert np.array_equal(serial.rounds, pooled.rounds)
+
+
+def test_hit_chance_follows_d20_rules():
+    # Needs 11+ on the d20 to hit AC 15 with +4: 10 of 20 faces, and one hit kills.
+    attacker = Combatant(ac=10, hp=10, atk_bonus=4, damage=5)
+    target = Combatant(ac=15, hp=5, atk_bonus=0, damage=0)
+
+    result = simulate_combat([attacker], [target], encounters=100_000, seed=0)
+
+    assert np.mean(result.rounds == 1) == pytest.approx(0.5, abs=0.01)
+    assert result.party_win_rate == 1.0
+    assert result.rounds_to_kill() == pytest.approx(2.0, abs=0.05)
+    assert np.isnan(result.rounds_to_kill(MONSTERS_WIN))
+
+
+def test_natural_rolls_always_hit_or_miss():
+    hopeless = Combatant(ac=10, hp=1, atk_bonus=-100, damage=1)
+    untouchable = Combatant(ac=100, hp=2, atk_bonus=0, damage=0)
+
+    result = simulate_combat([hopeless], [untouchable], encounters=50_000, seed=0)
+
+    # Only a natural 20 hits, and its double damage drops the 2 HP target at once.
+    assert np.mean(result.rounds == 1) == pytest.approx(0.05, abs=0.005)
+
+
+def test_harmless_sides_draw_after_max_rounds():
+    pacifist = Combatant(ac=10, hp=10, atk_bonus=0, damage=0)
+
+    result = simulate_combat([pacifist], [pacifist], encounters=100, max_rounds=7, seed=0)
+
+    assert result.draw_rate == 1.0
+    assert set(result.rounds) == {7}
+
+
+def test_scaled_up_monster_beats_the_party_more_often():
+    from app.domain.services.scale_monster import scale_monster
+
+    ogre = Monster(MonsterStats(2, 11, 59, 6, 13, 13))
+    party = [FIGHTER] * 4
+    weak = simulate_combat(party, [scale_monster(ogre, 1)], encounters=5_000, seed=1)
+    strong = simulate_combat(party, [scale_monster(ogre, 8)], encounters=5_000, seed=1)
+
+    assert weak.monster_win_rate < strong.monster_win_rate
+    assert weak.winners.dtype == np.int8
+    assert set(np.unique(strong.winners)) <= {PARTY_WIN, DRAW, MONSTERS_WIN}
+
+
+@pytest.mark.parametrize("kwargs", [{"party": []}, {"encounters": 0}, {"max_rounds": 0}])
+def test_rejects_invalid_arguments(kwargs):
+    arguments = {"party": [FIGHTER], "monsters": [OGRE], **kwargs}
+    with pytest.raises(ValueError):
+        simulate_combat(**arguments)
+
+
+def test_combatant_validates_stats():
+    with pytest.raises(ValueError):
+        Combatant(ac=0, hp=10, atk_bonus=0, damage=1)
+    assert Combatant.from_monster(OGRE) == Combatant(11, 59, 6, 13)
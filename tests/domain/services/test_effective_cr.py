@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.domain.models.monster_table import MonsterTable
+from app.domain.services.effective_cr import EffectiveCR, effective_cr, effective_crs
+from app.repositories.cr_repo import CR_TABLE, CRColumn
+
+
+def make_monster(**overrides) -> Monster:
+    defaults = dict(
+        challenge_rating=1,
+        armor_class=13,
+        hit_points=75,
+        attack_bonus=3,
+        damage=10,
+        save_dc=13,
+    )
+    return Monster(stats=MonsterStats(**(defaults | overrides)))
+
+
+def table_rows(hp: CRColumn, damage: CRColumn) -> dict[str, np.ndarray]:
+    # Every CR row's own expected stats, skipping CR 0 whose minimum damage is 0.
+    return {
+        "armor_class": CR_TABLE.column(CRColumn.AC)[1:],
+        "hit_points": CR_TABLE.column(hp)[1:],
+        "attack_bonus": CR_TABLE.column(CRColumn.ATK)[1:],
+        "damage": CR_TABLE.column(damage)[1:],
+        "save_dc": CR_TABLE.column(CRColumn.SAVE)[1:],
+    }
+
+
+@pytest.mark.parametrize(
+    "hp, damage",
+    [(CRColumn.HP_MIN, CRColumn.DMG_MIN), (CRColumn.HP_MAX, CRColumn.DMG_MAX)],
+)
+def test_table_stats_rate_as_their_own_cr(hp, damage):
+    result = effective_crs(table_rows(hp, damage))
+    expected = CR_TABLE.column(CRColumn.CR)[1:]
+    for name in ("defensive_cr", "offensive_cr", "effective_cr"):
+        np.testing.assert_array_equal(result[name], expected)
+
+
+def test_armor_class_moves_defensive_cr_per_two_points():
+    assert effective_cr(make_monster(armor_class=14)).defensive == 1
+    assert effective_cr(make_monster(armor_class=15)).defensive == 2
+    assert effective_cr(make_monster(armor_class=17)).defensive == 3
+    assert effective_cr(make_monster(armor_class=10)).defensive == 0.5
+
+
+def test_offense_uses_the_better_of_attack_bonus_and_save_dc():
+    assert effective_cr(make_monster(attack_bonus=7, save_dc=13)).offensive == 3
+    assert effective_cr(make_monster(attack_bonus=3, save_dc=17)).offensive == 3
+    assert effective_cr(make_monster(attack_bonus=7, save_dc=None)).offensive == 3
+    assert effective_cr(make_monster(attack_bonus=1, save_dc=None)).offensive == 0.5
+
+
+def test_effective_cr_is_the_nearest_cr_to_the_average():
+    # Defensive CR 3, offensive CR 1.
+    assert effective_cr(make_monster(armor_class=17)) == EffectiveCR(3, 1, 2)
+    # Defensive CR 1/2, offensive CR 1/8: the average 0.3125 is nearest to 1/4.
+    assert effective_cr(make_monster(armor_class=10, damage=3)) == EffectiveCR(0.5, 0.125, 0.25)
+
+
+def test_out_of_range_stats_are_clamped_to_the_table():
+    result = effective_cr(
+        make_monster(armor_class=30, hit_points=5000, damage=1000, attack_bonus=20)
+    )
+    assert result == EffectiveCR(30, 30, 30)
+    assert effective_cr(make_monster(armor_class=1, hit_points=1, damage=1)).defensive == 0
+
+
+def test_stated_cr_is_ignored():
+    assert effective_cr(make_monster(challenge_rating=20)) == effective_cr(make_monster())
+
+
+def test_bulk_matches_scalar_for_every_input_kind():
+    monsters = [
+        make_monster(),
+        make_monster(armor_class=17, save_dc=None),
+        make_monster(hit_points=400, damage=120, attack_bonus=10, save_dc=19),
+    ]
+    expected = [effective_cr(monster) for monster in monsters]
+    table = MonsterTable.from_monsters(monsters)
+    frame = pd.DataFrame(table.columns(), index=[10, 20, 30])
+
+    for result in (effective_crs(table), effective_crs(dict(table.columns()))):
+        assert [EffectiveCR(*row) for row in zip(*result.values(), strict=True)] == expected
+
+    result = effective_crs(frame)
+    assert isinstance(result, pd.DataFrame)
+    assert result.index.tolist() == [10, 20, 30]
+    assert [EffectiveCR(*row) for row in result.itertuples(index=False)] == expected
+
+
+def test_invalid_stats_raise():
+    with pytest.raises(MonsterStatsValidationException, match="Hit points"):
+        effective_crs(
+            {
+                "armor_class": [13],
+                "hit_points": [0],
+                "attack_bonus": [3],
+                "damage": [10],
+                "save_dc": [13],
+            }
+        )
@@ -0,0 +1,132 @@
+import itertools
+from collections import OrderedDict
+
+import pytest
+
+from app.domain.models.monster import Monster, MonsterStats
+from app.domain.services import encounter_builder
+from app.domain.services.encounter_builder import EncounterBuilder, encounter_index
+from app.repositories.cr_repo import CR_TABLE, CRColumn
+from app.repositories.encounter_repo import Difficulty, encounter_budget, encounter_multiplier
+
+
+def make_monster(cr: float, hit_points: int = 20) -> Monster:
+    return Monster(
+        stats=MonsterStats(
+            challenge_rating=cr,
+            armor_class=13,
+            hit_points=hit_points,
+            attack_bonus=3,
+            damage=5,
+            save_dc=None,
+        )
+    )
+
+
+def brute_force(crs, levels, difficulty, max_monsters):
+    low, high = encounter_budget(levels, difficulty)
+    found = set()
+    for k in range(1, max_monsters + 1):
+        for combo in itertools.combinations_with_replacement(sorted(crs, reverse=True), k):
+            xp = sum(CR_TABLE.row(cr)[CRColumn.XP] for cr in combo)
+            if low <= xp * encounter_multiplier(k, len(levels)) <= high:
+                found.add(tuple((cr, combo.count(cr)) for cr in dict.fromkeys(combo)))
+    return found
+
+
+@pytest.mark.parametrize("difficulty", list(Difficulty))
+@pytest.mark.parametrize("levels", [[3, 3, 3, 3], [1, 2], [5] * 6])
+def test_plans_match_brute_force(levels, difficulty):
+    crs = CR_TABLE.crs[:12]
+    index = encounter_index(crs, levels, difficulty, max_monsters=5)
+    plans = list(index.plans())
+
+    assert {plan.counts for plan in plans} == brute_force(crs, levels, difficulty, 5)
+    assert len(plans) == index.count
+    low, high = encounter_budget(levels, difficulty)
+    for plan in plans:
+        assert low <= plan.adjusted_xp <= high
+        assert plan.xp == sum(CR_TABLE.row(cr)[CRColumn.XP] * n for cr, n in plan.counts)
+
+
+def test_plans_limit_and_order():
+    index = encounter_index(CR_TABLE.crs, [3, 3, 3, 3], Difficulty.MEDIUM)
+    plans = list(index.plans(limit=20))
+    assert len(plans) == 20
+    assert plans[0].monsters == 1
+    assert [plan.monsters for plan in plans] == sorted(plan.monsters for plan in plans)
+
+
+def test_index_is_cached():
+    first = encounter_index([1, 0.5, 2], [4, 4, 4], Difficulty.HARD)
+    assert encounter_index([2, 1, 0.5, 1], [4, 4, 4], "hard") is first
+
+
+def test_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(encounter_builder, "_cache", OrderedDict())
+    first = encounter_index([1, 2], [4, 4], Difficulty.EASY)
+    monkeypatch.setattr(encounter_builder, "INDEX_CACHE_BYTES", first.nbytes)
+
+    second = encounter_index([1, 2], [5, 5], Difficulty.EASY)
+
+    assert list(encounter_builder._cache.values()) == [second]
+    assert encounter_index([1, 2], [5, 5], Difficulty.EASY) is second
+    assert encounter_index([1, 2], [4, 4], Difficulty.EASY) is not first
+
+
+def test_largest_index_stays_small():
+    index = encounter_index(CR_TABLE.crs, [20] * 8, Difficulty.DEADLY, max_monsters=20)
+    assert index.nbytes < 16 * 2**20
+    plan = index.sample(1, seed=0)[0]
+    low, high = encounter_budget([20] * 8, Difficulty.DEADLY)
+    assert low <= plan.adjusted_xp <= high
+
+
+def test_samples_are_feasible_and_reproducible():
+    index = encounter_index(CR_TABLE.crs, [8, 8, 7, 7], Difficulty.DEADLY)
+    samples = index.sample(200, seed=3)
+    assert samples == index.sample(200, seed=3)
+    feasible = set(plan.counts for plan in index.plans())
+    assert {plan.counts for plan in samples} <= feasible
+    assert len({plan.counts for plan in samples}) > 50
+
+
+def test_samples_are_uniform_over_plans():
+    index = encounter_index(CR_TABLE.crs[:8], [2, 2], Difficulty.MEDIUM, max_monsters=4)
+    samples = index.sample(600 * index.count, seed=0)
+    frequencies = [
+        sum(s.counts == plan.counts for s in samples) / len(samples) for plan in index.plans()
+    ]
+    assert all(abs(f * index.count - 1) < 0.2 for f in frequencies)
+
+
+def test_unaffordable_pool_has_no_plans():
+    index = encounter_index([20, 30], [1, 1], Difficulty.DEADLY)
+    assert index.count == 0
+    assert list(index.plans()) == []
+    assert index.sample(3) == []
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        encounter_index([0.3], [1], Difficulty.EASY)
+    with pytest.raises(ValueError):
+        encounter_index([1], [1], Difficulty.EASY, max_monsters=0)
+    with pytest.raises(ValueError):
+        EncounterBuilder([])
+
+
+def test_builder_draws_monsters_from_the_pool():
+    pool = [make_monster(cr, hit_points) for cr in [0.25, 0.5, 1, 2] for hit_points in [10, 20]]
+    builder = EncounterBuilder(pool, max_monsters=6)
+    levels = [2, 2, 2, 2]
+    low, high = encounter_budget(levels, Difficulty.HARD)
+
+    encounters = builder.sample(levels, Difficulty.HARD, n=50, seed=1)
+    assert len(encounters) == 50
+    for monsters in encounters:
+        assert all(any(m is p for p in pool) for m in monsters)
+        xp = sum(m.xp for m in monsters) * encounter_multiplier(len(monsters), len(levels))
+        assert low <= xp <= high
+    assert builder.sample(levels, Difficulty.HARD, n=50, seed=1) == encounters
+    assert next(builder.plans(levels, Difficulty.HARD)).counts == ((1.0, 2),)
@@ -1,6 +1,8 @@
-from PIL import Image
+import numpy as np
+import pytest
+from PIL import Image, ImageOps
 
-from app.domain.services.image_processing import to_transparent
+from app.domain.services.image_processing import downscale_chain, to_transparent
 
 
 def test_white_background_becomes_transparent():
@@ -27,3 +29,56 @@ def test_below_threshold_becomes_fully_transparent():
     almost_white = Image.new("L", (10, 10), 250)
     result = to_transparent(almost_white)
     assert result.getpixel((5, 5))[3] == 0
+
+
+def reference_to_transparent(image, invert=False, threshold=0.10):
+    # The original float64 implementation, kept as an oracle for the LUT fast path.
+    gray = image.convert("L")
+    if invert:
+        gray = ImageOps.invert(gray)
+    alpha = np.array(ImageOps.invert(gray), dtype=np.float64) / 255.0
+    mask = alpha >= threshold
+    alpha[~mask] = 0.0
+    if mask.any():
+        lo = alpha[mask].min()
+        hi = alpha[mask].max()
+        if hi > lo:
+            alpha[mask] = (alpha[mask] - lo) / (hi - lo)
+        else:
+            alpha[mask] = 1.0
+    alpha_img = Image.fromarray((alpha * 255).astype(np.uint8), mode="L")
+    rgba = Image.new("RGBA", gray.size, (0, 0, 0, 0))
+    rgba.putalpha(alpha_img)
+    return rgba
+
+
+@pytest.mark.parametrize("invert", [False, True])
+@pytest.mark.parametrize("threshold", [0.0, 0.10, 0.37, 0.9, 1.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_reference_implementation(invert, threshold, seed):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(37, 53, 3), dtype=np.uint8)
+    pixels[rng.random((37, 53)) < 0.5] = 255
+    image = Image.fromarray(pixels, mode="RGB")
+
+    expected = reference_to_transparent(image, invert=invert, threshold=threshold)
+    actual = to_transparent(image, invert=invert, threshold=threshold)
+    assert actual.tobytes() == expected.tobytes()
+
+
+@pytest.mark.parametrize("value", [0, 128, 229, 255])
+def test_uniform_images_match_reference(value):
+    image = Image.new("L", (8, 8), value)
+    assert to_transparent(image).tobytes() == reference_to_transparent(image).tobytes()
+
+
+def test_downscale_chain_fits_longest_edge_without_upscaling():
+    image = Image.new("L", (400, 100), 128)
+
+    levels = downscale_chain(image, [50, 1000, 200])
+
+    assert list(levels) == [1000, 200, 50]
+    assert levels[1000].size == (400, 100)
+    assert levels[200].size == (200, 50)
+    assert levels[50].size == (50, 12)
+    assert levels[50].getextrema() == (128, 128)
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.domain.services.map_tiles import (
+    TileOptions,
+    build_map_tiles,
+    cell_boxes,
+    parse_grid,
+    pyramid_sizes,
+    tile_boxes,
+)
+
+
+@pytest.mark.parametrize(
+    ("name", "grid"),
+    [("map_24x44.png", (24, 44)), ("maps/cave_3x2.jpg", (3, 2)), ("bakery.png", None)],
+)
+def test_parse_grid(name, grid):
+    assert parse_grid(Path(name)) == grid
+
+
+def test_pyramid_sizes_halve_down_to_one_pixel():
+    assert pyramid_sizes(5, 3) == [(1, 1), (2, 1), (3, 2), (5, 3)]
+
+
+def test_tile_boxes_cover_level_with_overlap():
+    boxes = list(tile_boxes(5, 3, tile_size=2, overlap=1))
+
+    assert [(column, row) for column, row, _ in boxes] == [
+        (0, 0),
+        (1, 0),
+        (2, 0),
+        (0, 1),
+        (1, 1),
+        (2, 1),
+    ]
+    assert boxes[0][2] == (0, 0, 3, 3)
+    assert boxes[4][2] == (1, 1, 5, 3)
+
+
+def test_cell_boxes_tile_the_image_exactly():
+    boxes = [box for _, _, box in cell_boxes(10, 7, (3, 2))]
+
+    assert boxes[0] == (0, 0, 3, 4)
+    assert boxes[-1] == (7, 4, 10, 7)
+    assert sum((r - left) * (b - t) for left, t, r, b in boxes) == 70
+
+
+def make_alpha(width=40, height=20):
+    return Image.linear_gradient("L").resize((width, height))
+
+
+def test_build_map_tiles_writes_pyramid_and_cells(tmp_path):
+    dzi = tmp_path / "maps" / "cave_4x2.dzi"
+    options = TileOptions(tile_size=16, overlap=0, cells=True)
+
+    result = build_map_tiles(make_alpha(), dzi, (4, 2), options)
+
+    files = dzi.with_name("cave_4x2_files")
+    assert 'TileSize="16"' in dzi.read_text()
+    assert sorted(p.name for p in (files / "6").iterdir()) == [
+        "0_0.png",
+        "0_1.png",
+        "1_0.png",
+        "1_1.png",
+        "2_0.png",
+        "2_1.png",
+    ]
+    assert Image.open(files / "0" / "0_0.png").size == (1, 1)
+    cell = Image.open(dzi.with_name("cave_4x2_cells") / "1_3.png")
+    assert cell.size == (10, 10)
+    assert cell.getchannel("A").tobytes() == make_alpha().crop((30, 10, 40, 20)).tobytes()
+    assert result.skipped == 0
+
+
+def test_rebuild_only_rewrites_changed_tiles(tmp_path):
+    dzi = tmp_path / "cave.dzi"
+    options = TileOptions(tile_size=16, overlap=0)
+    build_map_tiles(make_alpha(), dzi, options=options)
+
+    alpha = make_alpha()
+    alpha.putpixel((39, 19), 0)
+    result = build_map_tiles(alpha, dzi, options=options)
+
+    tiles = [p.relative_to(tmp_path).as_posix() for p in result.written[2:]]
+    assert "cave_files/6/2_1.png" in tiles
+    assert "cave_files/6/0_0.png" not in tiles
+    assert result.skipped > 0
+
+
+def test_rebuild_removes_tiles_that_no_longer_exist(tmp_path):
+    dzi = tmp_path / "cave.dzi"
+    options = TileOptions(tile_size=16, overlap=0)
+    build_map_tiles(make_alpha(40, 20), dzi, options=options)
+
+    result = build_map_tiles(make_alpha(20, 10), dzi, options=options)
+
+    assert tmp_path / "cave_files" / "6" / "0_0.png" in result.removed
+    assert not any((tmp_path / "cave_files" / "6").iterdir())
@@ -1,5 +1,21 @@
-from app.domain.models.monster import Monster, MonsterStats
-from app.domain.services.scale_monster import scale_monster
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.domain.models.monster_table import MonsterTable
+from app.domain.services.scale_monster import (
+    LADDER_CACHE_SIZE,
+    _scale_ladder,
+    scale_ladder,
+    scale_monster,
+    scale_monster_fractional,
+    scale_monster_to_xp,
+    scale_monsters,
+    scale_monsters_fractional,
+    scale_monsters_to_xp,
+)
+from app.repositories.cr_repo import CR_TABLE, MONSTER_STATISTICS_BY_CHALLENGE_RATING, CRColumn
 
 
 def make_monster(**overrides) -> Monster:
@@ -127,3 +143,217 @@ def test_scaling_damage_floors_at_one():
     monster = make_monster(challenge_rating=5, damage=1)
     scaled = scale_monster(monster, target_cr=1)
     assert scaled.damage == 1
+
+
+def random_stats(n, seed=0):
+    rng = np.random.default_rng(seed)
+    crs = MONSTER_STATISTICS_BY_CHALLENGE_RATING[CRColumn.CR].to_numpy()
+    return {
+        "challenge_rating": rng.choice(crs, n),
+        "armor_class": rng.integers(1, 25, n),
+        "hit_points": rng.integers(1, 900, n),
+        "attack_bonus": rng.integers(1, 15, n),
+        "damage": rng.integers(1, 330, n),
+        "save_dc": rng.integers(1, 25, n),
+    }, rng.choice(crs, n)
+
+
+class TestScaleMonsters:
+    def test_matches_scale_monster(self):
+        stats, targets = random_stats(300)
+        result = scale_monsters(stats, targets)
+
+        for i in range(300):
+            monster = make_monster(
+                challenge_rating=float(stats["challenge_rating"][i]),
+                **{name: int(stats[name][i]) for name in list(stats)[1:]},
+            )
+            scaled = scale_monster(monster, float(targets[i]))
+            assert result["challenge_rating"][i] == scaled.cr
+            assert result["xp"][i] == scaled.xp
+            assert result["proficiency_bonus"][i] == scaled.proficiency_bonus
+            assert result["armor_class"][i] == scaled.ac
+            assert result["hit_points"][i] == scaled.hp
+            assert result["attack_bonus"][i] == scaled.atk_bonus
+            assert result["damage"][i] == scaled.damage
+            assert result["save_dc"][i] == scaled.save_dc
+
+    def test_scalar_target_broadcasts(self):
+        stats, _ = random_stats(5)
+        result = scale_monsters(stats, 5)
+        assert result["challenge_rating"].tolist() == [5.0] * 5
+        assert result["xp"].tolist() == [1800] * 5
+
+    def test_dataframe_in_dataframe_out(self):
+        stats, targets = random_stats(10)
+        frame = pd.DataFrame(stats, index=range(100, 110))
+        result = scale_monsters(frame, targets)
+        assert isinstance(result, pd.DataFrame)
+        assert result.index.tolist() == list(range(100, 110))
+        expected = scale_monsters(stats, targets)
+        assert result["hit_points"].tolist() == expected["hit_points"].tolist()
+
+    def test_missing_save_dc_stays_missing(self):
+        stats, targets = random_stats(3)
+        stats["save_dc"] = np.array([13.0, np.nan, 15.0])
+        result = scale_monsters(stats, targets)
+        assert np.isnan(result["save_dc"][1])
+        assert not np.isnan(result["save_dc"][[0, 2]]).any()
+
+    def test_invalid_source_cr_raises(self):
+        stats, targets = random_stats(3)
+        stats["challenge_rating"] = np.array([1, 999, 2])
+        with pytest.raises(MonsterStatsValidationException, match=r"\[1\]"):
+            scale_monsters(stats, targets)
+
+    def test_invalid_target_cr_raises(self):
+        stats, _ = random_stats(3)
+        with pytest.raises(MonsterStatsValidationException):
+            scale_monsters(stats, [1, 2, 0.3])
+
+    @pytest.mark.parametrize("field", ["armor_class", "hit_points", "attack_bonus", "damage"])
+    def test_non_positive_raises(self, field):
+        stats, targets = random_stats(3)
+        stats[field] = np.array([1, 0, 2])
+        with pytest.raises(MonsterStatsValidationException):
+            scale_monsters(stats, targets)
+
+    def test_non_int_raises(self):
+        stats, targets = random_stats(3)
+        stats["hit_points"] = np.array([1.5, 2.0, 3.0])
+        with pytest.raises(MonsterStatsValidationException):
+            scale_monsters(stats, targets)
+
+    def test_monster_table_in_monster_table_out(self):
+        stats, targets = random_stats(20)
+        table = MonsterTable(stats)
+        result = scale_monsters(table, targets)
+        assert isinstance(result, MonsterTable)
+        expected = scale_monsters(stats, targets)
+        assert result.column("hit_points").tolist() == expected["hit_points"].tolist()
+        assert result[0].to_monster() == scale_monster(table[0].to_monster(), float(targets[0]))
+
+
+class TestScaleLadder:
+    def test_covers_every_cr_and_matches_scale_monster(self):
+        monster = make_monster(save_dc=15)
+        ladder = scale_ladder(monster)
+        crs = CR_TABLE.column(CRColumn.CR).tolist()
+        assert [row.cr for row in ladder] == crs
+        for row, cr in zip(ladder, crs, strict=True):
+            assert row.to_monster() == scale_monster(monster, cr)
+
+    def test_missing_save_dc_stays_missing(self):
+        ladder = scale_ladder(make_monster(save_dc=None))
+        assert all(row.save_dc is None for row in ladder)
+
+    def test_repeated_queries_hit_the_cache(self):
+        monster = make_monster(hit_points=80, damage=12)
+        first = scale_ladder(monster)
+        hits = _scale_ladder.cache_info().hits
+        assert scale_ladder(make_monster(hit_points=80, damage=12)) is first
+        assert _scale_ladder.cache_info().hits == hits + 1
+
+    def test_cache_is_bounded(self):
+        assert _scale_ladder.cache_info().maxsize == LADDER_CACHE_SIZE
+
+
+class TestScaleMonstersFractional:
+    def test_matches_scale_monsters_at_table_crs(self):
+        stats, targets = random_stats(500)
+        expected = scale_monsters(stats, targets)
+        result = scale_monsters_fractional(stats, targets)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+    def test_between_rows_interpolates_the_expected_stats(self):
+        monster = make_monster(challenge_rating=4, armor_class=14, hit_points=123, save_dc=None)
+        row = scale_monster_fractional(monster, 4.5)
+        # Halfway between CR 4 and CR 5: AC 14.5, HP 123.5-137.5, XP 1450.
+        assert (row.cr, row.xp, row.ac, row.hp, row.save_dc) == (4.5, 1450, 15, 130, None)
+
+    def test_stats_grow_with_fractional_targets(self):
+        monster = make_monster(challenge_rating=5, hit_points=140, damage=35)
+        targets = np.linspace(5, 6, 9)
+        scaled = scale_monsters_fractional(
+            {name: [value] * len(targets) for name, value in _columns(monster).items()}, targets
+        )
+        assert np.all(np.diff(scaled["xp"]) > 0)
+        assert np.all(np.diff(scaled["hit_points"]) >= 0)
+        assert np.all(np.diff(scaled["damage"]) >= 0)
+
+    def test_fractional_source_crs(self):
+        row = scale_monster_fractional(make_monster(challenge_rating=4), 4.5)
+        back = scale_monster_fractional(row, 4)
+        monster = make_monster(challenge_rating=4)
+        assert back.to_monster().xp == monster.xp
+        # Only rounding is lost on the way there and back.
+        for name in ("ac", "hp", "atk_bonus", "damage", "save_dc"):
+            assert abs(getattr(back, name) - getattr(monster, name)) <= 1
+
+    def test_fractional_tables_are_rejected_by_scale_monsters(self):
+        table = MonsterTable.from_monsters([make_monster(challenge_rating=4)])
+        fractional = scale_monsters_fractional(table, 4.5)
+        with pytest.raises(MonsterStatsValidationException, match="rows \\[0\\]: \\[4.5\\]"):
+            scale_monsters(fractional, 5)
+        scaled = scale_monsters_fractional(fractional, 5)
+        assert scaled[0].to_monster().cr == 5
+
+    def test_fractional_tables_out_of_range_raise(self):
+        table = MonsterTable.from_monsters([make_monster()])
+        columns = table.columns() | {"challenge_rating": np.array([31.0])}
+        with pytest.raises(MonsterStatsValidationException, match="challenge rating"):
+            scale_monsters_fractional(MonsterTable.from_normalized(columns), 5)
+
+    @pytest.mark.parametrize("target", [-0.5, 30.5, np.nan])
+    def test_targets_outside_the_table_raise(self, target):
+        stats, targets = random_stats(3)
+        with pytest.raises(MonsterStatsValidationException, match="target challenge rating"):
+            scale_monsters_fractional(stats, [1, target, 2])
+
+    def test_source_crs_outside_the_table_raise(self):
+        stats, targets = random_stats(3)
+        stats["challenge_rating"] = np.array([1, 31, 2])
+        with pytest.raises(MonsterStatsValidationException, match="rows \\[1\\]"):
+            scale_monsters_fractional(stats, targets)
+
+    def test_container_types_round_trip(self):
+        stats, targets = random_stats(20)
+        targets = targets * 0.9 + 0.05
+        expected = scale_monsters_fractional(stats, targets)
+        table = scale_monsters_fractional(MonsterTable(stats), targets)
+        frame = scale_monsters_fractional(pd.DataFrame(stats), targets)
+        assert isinstance(table, MonsterTable)
+        assert table.column("hit_points").tolist() == expected["hit_points"].tolist()
+        assert frame["xp"].tolist() == expected["xp"].tolist()
+
+
+class TestScaleMonstersToXP:
+    def test_quarter_tougher(self):
+        stats, _ = random_stats(200)
+        xp = scale_monsters(stats, stats["challenge_rating"])["xp"]
+        targets = np.minimum(xp * 1.25, 155_000)
+        scaled = scale_monsters_to_xp(stats, targets)
+        np.testing.assert_array_equal(scaled["xp"], np.floor(targets + 0.5))
+        assert np.all(scaled["challenge_rating"] >= stats["challenge_rating"])
+
+    def test_table_xp_targets_land_on_table_crs(self):
+        monster = make_monster(challenge_rating=1)
+        row = scale_monster_to_xp(monster, 1800)
+        assert row.to_monster() == scale_monster(monster, 5)
+
+    def test_xp_outside_the_table_raises(self):
+        stats, _ = random_stats(2)
+        with pytest.raises(MonsterStatsValidationException, match="target XP"):
+            scale_monsters_to_xp(stats, [100, 200_000])
+
+
+def _columns(monster) -> dict:
+    return {
+        "challenge_rating": monster.cr,
+        "armor_class": monster.ac,
+        "hit_points": monster.hp,
+        "attack_bonus": monster.atk_bonus,
+        "damage": monster.damage,
+        "save_dc": monster.save_dc,
+    }
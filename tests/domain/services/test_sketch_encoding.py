@@ -0,0 +1,70 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.domain.services.image_processing import to_transparent
+from app.domain.services.sketch_encoding import (
+    EncodingPolicy,
+    SketchEncoding,
+    available_encodings,
+    choose_encoding,
+    encode_sketch,
+)
+
+
+def make_sketch():
+    image = Image.new("L", (512, 384), 255)
+    draw = ImageDraw.Draw(image)
+    for offset in range(0, 512, 16):
+        draw.line((offset, 0, 511 - offset, 383), fill=offset)
+    return to_transparent(image)
+
+
+def decode(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data)).convert("RGBA")
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_every_encoding_decodes_to_identical_pixels(encoding):
+    sketch = make_sketch()
+    encoded = encode_sketch(sketch, encoding)
+    assert encoded.encoding == encoding
+    assert decode(encoded.data).tobytes() == sketch.tobytes()
+
+
+def test_compact_pngs_are_smaller_than_rgba():
+    sketch = make_sketch()
+    rgba = len(encode_sketch(sketch, SketchEncoding.RGBA_PNG).data)
+    assert len(encode_sketch(sketch, SketchEncoding.LA_PNG).data) < rgba
+    assert len(encode_sketch(sketch, SketchEncoding.PALETTE_PNG).data) < rgba
+
+
+def test_suffix_follows_encoding():
+    sketch = make_sketch()
+    assert encode_sketch(sketch, "la-png").suffix == ".png"
+    if SketchEncoding.WEBP_LOSSLESS in available_encodings():
+        assert encode_sketch(sketch, "webp-lossless").suffix == ".webp"
+
+
+def test_fixed_encoding_is_used_as_is():
+    assert choose_encoding(make_sketch(), "palette-png").encoding == SketchEncoding.PALETTE_PNG
+
+
+def test_smallest_policy_picks_smallest_candidate():
+    sketch = make_sketch()
+    chosen = choose_encoding(sketch, EncodingPolicy.SMALLEST)
+    sizes = [len(encode_sketch(sketch, e).data) for e in available_encodings()]
+    assert len(chosen.data) == min(sizes)
+
+
+def test_fastest_policy_returns_a_candidate():
+    candidates = [SketchEncoding.LA_PNG, SketchEncoding.PALETTE_PNG]
+    chosen = choose_encoding(make_sketch(), "fastest", candidates=candidates)
+    assert chosen.encoding in candidates
+    assert decode(chosen.data).tobytes() == make_sketch().tobytes()
+
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError):
+        choose_encoding(make_sketch(), "jpeg")
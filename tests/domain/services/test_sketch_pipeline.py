@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from PIL import Image
+
+from app.domain.services import sketch_conversion
+from app.domain.services.sketch_conversion import ConversionJob, ConversionOptions, convert_image
+from app.domain.services.sketch_pipeline import run_pipeline
+
+OPTIONS = ConversionOptions(sizes=(4,))
+
+
+def make_jobs(tmp_path, count):
+    jobs = []
+    for i in range(count):
+        src = tmp_path / "images" / f"{i}.png"
+        src.parent.mkdir(exist_ok=True)
+        Image.linear_gradient("L").resize((16 + i, 12)).save(src)
+        jobs.append(
+            ConversionJob(
+                f"{i}.png", src, tmp_path / "sketch" / f"{i}.png", {4: tmp_path / "s4" / f"{i}.png"}
+            )
+        )
+    return jobs
+
+
+def test_outputs_match_serial_conversion_in_job_order(tmp_path):
+    jobs = make_jobs(tmp_path, 6)
+
+    results = list(run_pipeline(jobs, OPTIONS, max_in_flight=2))
+
+    assert [job for job, _ in results] == jobs
+    for job, output in results:
+        assert output == job.sketch_path
+        expected = convert_image(
+            job.img_path, tmp_path / "ref.png", OPTIONS, None, {4: tmp_path / "ref4.png"}
+        )
+        assert output.read_bytes() == expected.read_bytes()
+        assert job.sized_paths[4].read_bytes() == (tmp_path / "ref4.png").read_bytes()
+
+
+def test_errors_are_returned_per_job(tmp_path):
+    jobs = make_jobs(tmp_path, 3)
+    jobs[1].img_path.write_bytes(b"not an image")
+
+    results = list(run_pipeline(jobs, OPTIONS))
+
+    assert isinstance(results[1][1], Exception)
+    assert [output for _, output in results[::2]] == [jobs[0].sketch_path, jobs[2].sketch_path]
+
+
+def test_never_holds_more_than_max_in_flight_images(tmp_path, monkeypatch):
+    jobs = make_jobs(tmp_path, 8)
+    lock = threading.Lock()
+    held = peak = 0
+    decode, write = sketch_conversion.decode_image, sketch_conversion.write_sketch
+
+    def counting_decode(*args, **kwargs):
+        nonlocal held, peak
+        with lock:
+            held += 1
+            peak = max(peak, held)
+        return decode(*args, **kwargs)
+
+    def counting_write(*args, **kwargs):
+        nonlocal held
+        try:
+            return write(*args, **kwargs)
+        finally:
+            with lock:
+                held -= 1
+
+    monkeypatch.setattr("app.domain.services.sketch_pipeline.decode_image", counting_decode)
+    monkeypatch.setattr("app.domain.services.sketch_pipeline.write_sketch", counting_write)
+
+    assert len(list(run_pipeline(jobs, OPTIONS, max_in_flight=3))) == 8
+    assert 1 <= peak <= 3
+
+
+def test_rejects_non_positive_in_flight():
+    with pytest.raises(ValueError):
+        list(run_pipeline([], OPTIONS, max_in_flight=0))
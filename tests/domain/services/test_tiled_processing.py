@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.domain.services import tiled_processing
+from app.domain.services.image_processing import to_transparent
+from app.domain.services.tiled_processing import (
+    PNG_COLOR_TYPE_LA,
+    PngStripReader,
+    to_transparent_tiled,
+)
+
+
+def make_sketch(path, size=(41, 29), mode="RGB", seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(size[1], size[0], 3), dtype=np.uint8)
+    pixels[rng.random((size[1], size[0])) < 0.5] = 255
+    Image.fromarray(pixels, mode="RGB").convert(mode).save(path)
+    return path
+
+
+@pytest.mark.parametrize("tile_rows", [1, 7, 29, 1000])
+@pytest.mark.parametrize("invert", [False, True])
+def test_matches_in_memory_path(tmp_path, tile_rows, invert):
+    src = make_sketch(tmp_path / "src.png")
+    dst = tmp_path / "out" / "dst.png"
+
+    to_transparent_tiled(src, dst, invert=invert, tile_rows=tile_rows)
+
+    expected = to_transparent(Image.open(src), invert=invert)
+    with Image.open(dst) as result:
+        assert result.mode == "RGBA"
+        assert result.size == expected.size
+        assert result.tobytes() == expected.tobytes()
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "P", "LA", "RGBA"])
+def test_strip_reader_matches_a_full_decode(tmp_path, mode):
+    src = tmp_path / "src.png"
+    # optimize picks a filter per row, so every filter type shows up.
+    pixels = np.random.default_rng(1).integers(0, 256, size=(37, 23, 4), dtype=np.uint8)
+    image = Image.fromarray(pixels, mode="RGBA")
+    (image if "A" in mode else image.convert("RGB")).convert(mode).save(src, optimize=True)
+
+    reader = PngStripReader(src)
+    strips = list(reader.strips(5))
+
+    with Image.open(src) as image:
+        assert reader.mode == image.mode and reader.size == image.size
+        assert [strip.height for strip in strips] == [5] * 7 + [2]
+        rows = np.concatenate([np.asarray(strip.convert("L")) for strip in strips])
+        assert np.array_equal(rows, np.asarray(image.convert("L")))
+
+
+def test_streams_8_bit_pngs_without_decoding_them_whole(tmp_path, monkeypatch):
+    src = make_sketch(tmp_path / "src.png", mode="P")
+    expected = to_transparent(Image.open(src)).tobytes()
+
+    def no_full_decode(*args, **kwargs):
+        raise AssertionError("decoded the whole image")
+
+    monkeypatch.setattr(tiled_processing.Image, "open", no_full_decode)
+    to_transparent_tiled(src, tmp_path / "dst.png", tile_rows=4, sizes=[10])
+    monkeypatch.undo()
+
+    with Image.open(tmp_path / "dst.png") as result:
+        assert result.tobytes() == expected
+
+
+@pytest.mark.parametrize("offset, value", [(24, 16), (28, 1)])
+def test_strip_reader_rejects_16_bit_and_interlaced_pngs(tmp_path, offset, value):
+    src = make_sketch(tmp_path / "src.png")
+    header = bytearray(src.read_bytes())
+    header[offset] = value  # the IHDR bit depth or interlace method
+    src.write_bytes(bytes(header))
+
+    with pytest.raises(ValueError, match="8-bit non-interlaced"):
+        PngStripReader(src)
+
+
+def test_16_bit_pngs_are_decoded_whole(tmp_path):
+    src = tmp_path / "src.png"
+    gradient = np.linspace(0, 65535, 41 * 29).reshape(29, 41).astype(np.uint16)
+    Image.fromarray(gradient).save(src)
+
+    to_transparent_tiled(src, tmp_path / "dst.png", tile_rows=8)
+
+    with Image.open(tmp_path / "dst.png") as result:
+        assert result.tobytes() == to_transparent(Image.open(src)).tobytes()
+
+
+def test_matches_in_memory_path_for_jpeg(tmp_path):
+    src = make_sketch(tmp_path / "src.jpg")
+    dst = tmp_path / "dst.png"
+
+    to_transparent_tiled(src, dst, tile_rows=8)
+
+    with Image.open(dst) as result:
+        assert result.tobytes() == to_transparent(Image.open(src)).tobytes()
+
+
+def test_la_output_matches_in_memory_alpha(tmp_path):
+    src = make_sketch(tmp_path / "src.png")
+    dst = tmp_path / "dst.png"
+
+    to_transparent_tiled(src, dst, tile_rows=5, color_type=PNG_COLOR_TYPE_LA)
+
+    with Image.open(dst) as result:
+        assert result.mode == "LA"
+        assert result.convert("RGBA").tobytes() == to_transparent(Image.open(src)).tobytes()
+
+
+def test_returns_alpha_planes_for_requested_sizes(tmp_path):
+    src = make_sketch(tmp_path / "src.png")
+
+    levels = to_transparent_tiled(src, tmp_path / "dst.png", tile_rows=5, sizes=[10])
+
+    assert levels[10].mode == "L"
+    assert levels[10].size == (10, 7)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from app.domain.models.monster import Monster, MonsterStats, MonsterStatsValidationException
+from app.domain.models.monster_table import MonsterTable
+from app.domain.services.scale_monster import scale_monster, scale_monsters_fractional
+from app.repositories.bestiary_repo import Bestiary
+
+
+def make_monster(cr=1, ac=13, hp=75, save_dc=13) -> Monster:
+    return Monster(MonsterStats(cr, ac, hp, 4, 10, save_dc))
+
+
+ENTRIES = [
+    ("Goblin", make_monster(0.25, 15, 7, None)),
+    ("Ogre", make_monster(2, 11, 59)),
+    ("Owlbear", make_monster(3, 13, 59)),
+    ("Knight", make_monster(3, 18, 52, 15)),
+    ("Troll", make_monster(5, 15, 84)),
+    ("Giant", make_monster(7, 15, 138)),
+]
+
+
+@pytest.fixture
+def bestiary():
+    with Bestiary() as bestiary:
+        bestiary.add_many(ENTRIES)
+        yield bestiary
+
+
+def test_round_trip(bestiary):
+    assert len(bestiary) == len(ENTRIES)
+    entries = list(bestiary.query())
+    assert [(e.name, e.monster) for e in entries] == sorted(ENTRIES, key=lambda e: (e[1].cr, e[0]))
+    assert bestiary.get(entries[0].id) == entries[0]
+    assert entries[0].monster.save_dc is None
+
+
+def test_range_queries(bestiary):
+    names = [e.name for e in bestiary.query(cr=(3, 6), ac=(15, None))]
+    assert names == ["Knight", "Troll"]
+    assert [e.name for e in bestiary.query(xp=(None, 450))] == ["Goblin", "Ogre"]
+    assert [e.name for e in bestiary.query(hp=(59, 59), name="O%")] == ["Ogre", "Owlbear"]
+    assert bestiary.count(cr=(3, 6), ac=(15, None)) == 2
+    assert bestiary.count() == 6
+    assert len(list(bestiary.query(limit=2))) == 2
+
+
+def test_results_plug_into_scaling(bestiary):
+    knight = next(bestiary.monsters(name="Knight"))
+    assert scale_monster(knight, 5) == scale_monster(make_monster(3, 18, 52, 15), 5)
+
+
+def test_tables_match_entries(bestiary):
+    batches = list(bestiary.query_tables(batch_size=4, cr=(1, None)))
+    assert [len(batch.table) for batch in batches] == [4, 1]
+    assert [name for batch in batches for name in batch.names] == [
+        e.name for e in bestiary.query(cr=(1, None))
+    ]
+    monsters = [m for batch in batches for m in batch.table.to_monsters()]
+    assert monsters == list(bestiary.monsters(cr=(1, None)))
+    assert batches[0].ids.dtype == np.int64
+
+
+def test_add_table_and_remove():
+    table = MonsterTable.from_monsters([m for _, m in ENTRIES])
+    with Bestiary() as bestiary:
+        assert bestiary.add_table([n for n, _ in ENTRIES], table) == len(ENTRIES)
+        assert [e.name for e in bestiary.query()] == [
+            "Goblin",
+            "Ogre",
+            "Knight",
+            "Owlbear",
+            "Troll",
+            "Giant",
+        ]
+        knight = next(bestiary.query(name="Knight"))
+        assert bestiary.remove(knight.id)
+        assert not bestiary.remove(knight.id)
+        assert bestiary.get(knight.id) is None
+        with pytest.raises(ValueError):
+            bestiary.add_table(["one"], table)
+
+
+def test_persists_on_disk(tmp_path):
+    path = tmp_path / "bestiary.sqlite"
+    with Bestiary(path) as bestiary:
+        monster_id = bestiary.add("Ogre", make_monster(2, 11, 59))
+    with Bestiary(path) as bestiary:
+        assert bestiary.get(monster_id).name == "Ogre"
+
+
+def test_add_table_rejects_fractional_crs(bestiary):
+    table = MonsterTable.from_monsters([m for _, m in ENTRIES[:3]])
+    scaled = scale_monsters_fractional(table, [1, 4.5, 2])
+    with pytest.raises(MonsterStatsValidationException, match="rows \\[1\\]: \\[4.5\\]"):
+        bestiary.add_table(["a", "b", "c"], scaled)
+    assert len(bestiary) == len(ENTRIES)
+    # Rows at table CRs still round-trip.
+    scaled = scale_monsters_fractional(table, [1, 4, 2])
+    assert bestiary.add_table(["a", "b", "c"], scaled) == 3
+    assert [e.monster for e in bestiary.query(name="b")] == [scaled[1].to_monster()]
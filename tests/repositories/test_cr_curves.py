@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.repositories.cr_curves import CR_CURVES, CRCurves
+from app.repositories.cr_repo import CR_TABLE, CRColumn, CRTable
+
+TABLE_CRS = CR_TABLE.column(CRColumn.CR)
+VALUE_COLUMNS = [col for col in CR_TABLE.columns if col != CRColumn.CR]
+
+
+@pytest.mark.parametrize("col", VALUE_COLUMNS)
+def test_curves_pass_through_every_row(col):
+    assert np.array_equal(CR_CURVES.values(col, TABLE_CRS), CR_TABLE.column(col))
+    assert np.array_equal(
+        CR_CURVES.curve(col)[np.isin(CR_CURVES.grid, TABLE_CRS)], CR_TABLE.column(col)
+    )
+
+
+@pytest.mark.parametrize("col", VALUE_COLUMNS)
+def test_values_between_rows_match_linear_interpolation(col):
+    crs = np.random.default_rng(0).uniform(0, 30, 10_000)
+
+    expected = np.interp(crs, TABLE_CRS, CR_TABLE.column(col))
+
+    np.testing.assert_allclose(CR_CURVES.values(col, crs), expected, rtol=1e-12)
+
+
+def test_values_halfway_between_rows():
+    assert CR_CURVES.values(CRColumn.AC, 4.5) == 14.5
+    assert CR_CURVES.xp(0.375) == 75
+    assert CR_CURVES.values(CRColumn.HP_MAX, [19.5, 20.5]).tolist() == [377.5, 422.5]
+
+
+def test_values_outside_the_table_are_nan():
+    values = CR_CURVES.xp([-0.01, 30.01, np.nan, np.inf, 30])
+
+    assert np.isnan(values[:4]).all()
+    assert values[4] == 155_000
+
+
+def test_curves_are_read_only():
+    with pytest.raises(ValueError):
+        CR_CURVES.curve(CRColumn.XP)[0] = 0
+
+
+def test_crs_for_xp_inverts_xp():
+    xps = np.random.default_rng(1).uniform(10, 155_000, 10_000)
+    crs = np.random.default_rng(2).uniform(0, 30, 10_000)
+
+    assert np.array_equal(CR_CURVES.crs_for_xp(CR_TABLE.column(CRColumn.XP)), TABLE_CRS)
+    np.testing.assert_allclose(CR_CURVES.xp(CR_CURVES.crs_for_xp(xps)), xps, rtol=1e-12)
+    np.testing.assert_allclose(CR_CURVES.crs_for_xp(CR_CURVES.xp(crs)), crs, atol=1e-12)
+
+
+def test_crs_for_xp_next_to_row_boundaries():
+    xps = CR_TABLE.column(CRColumn.XP).astype(float)
+    nearby = np.concatenate([np.nextafter(xps[1:], 0), np.nextafter(xps[:-1], np.inf)])
+
+    crs = CR_CURVES.crs_for_xp(nearby)
+
+    np.testing.assert_allclose(crs, np.concatenate([TABLE_CRS[1:], TABLE_CRS[:-1]]), atol=1e-9)
+
+
+def test_crs_for_xp_outside_the_table_is_nan():
+    assert np.isnan(CR_CURVES.crs_for_xp([9, 155_001, np.nan])).all()
+    assert CR_CURVES.crs_for_xp(1450) == 4.5
+
+
+def test_rejects_crs_off_the_grid():
+    table = CRTable(["CR", "XP"], [[0, 10], [0.1, 20], [1, 200]])
+
+    with pytest.raises(ValueError, match="multiple of 1/64"):
+        CRCurves(table)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.repositories.cr_repo import (
+    CR_TABLE,
+    MONSTER_STATISTICS_BY_CHALLENGE_RATING,
+    CRColumn,
+)
+
+
+class TestCRTableLookup:
+    def test_row_by_cr(self):
+        row = CR_TABLE.row(5)
+        assert row[CRColumn.XP] == 1800
+        assert row[CRColumn.AC] == 15
+        assert type(row[CRColumn.HP_MIN]) is int
+
+    def test_fractional_cr_row(self):
+        assert CR_TABLE.row(0.125)[CRColumn.XP] == 25
+        assert CR_TABLE.row(0.125)[CRColumn.CR] == 0.125
+
+    def test_unknown_cr_raises(self):
+        with pytest.raises(KeyError):
+            CR_TABLE.row(0.3)
+
+    def test_index_of(self):
+        assert CR_TABLE.index_of(0) == 0
+        assert CR_TABLE.index_of(30) == len(CR_TABLE) - 1
+        assert CR_TABLE.index_of(0.3) is None
+
+    def test_rows_are_read_only(self):
+        with pytest.raises(TypeError):
+            CR_TABLE.row(1)[CRColumn.XP] = 0
+
+
+class TestCRTableRounding:
+    @pytest.mark.parametrize(
+        "cr, floor, ceil, nearest",
+        [
+            (0.3, 0.25, 0.5, 0.25),
+            (0.4, 0.25, 0.5, 0.5),
+            (1, 1, 1, 1),
+            (2.5, 2, 3, 2),
+            (-1, None, 0, 0),
+            (31, 30, None, 30),
+        ],
+    )
+    def test_floor_ceil_nearest(self, cr, floor, ceil, nearest):
+        assert CR_TABLE.floor(cr) == floor
+        assert CR_TABLE.ceil(cr) == ceil
+        assert CR_TABLE.nearest(cr) == nearest
+
+
+class TestCRTableBulk:
+    def test_indices(self):
+        assert CR_TABLE.indices([0, 0.5, 30, 0.3, 99]).tolist() == [0, 3, 33, -1, -1]
+
+    def test_floor_indices(self):
+        assert CR_TABLE.floor_indices([-1, 0, 0.3, 30, 99]).tolist() == [-1, 0, 2, 33, 33]
+
+    def test_nearest_indices_match_nearest(self):
+        crs = [-1, 0, 0.0625, 0.1, 0.3125, 0.75, 29.9, 99]
+        indices = CR_TABLE.nearest_indices(crs)
+        assert indices.tolist() == [0, 0, 0, 1, 2, 3, 33, 33]
+        assert [CR_TABLE.crs[i] for i in indices] == [CR_TABLE.nearest(cr) for cr in crs]
+
+    def test_columns_are_contiguous_and_read_only(self):
+        hp_min = CR_TABLE.column(CRColumn.HP_MIN)
+        assert hp_min.dtype == np.int64
+        assert hp_min.flags.c_contiguous
+        with pytest.raises(ValueError):
+            hp_min[0] = 0
+
+
+def test_dataframe_view_matches_table():
+    frame = MONSTER_STATISTICS_BY_CHALLENGE_RATING
+    assert list(frame.columns) == [col.value for col in CRColumn]
+    assert frame[CRColumn.CR].tolist() == list(CR_TABLE.crs)
+    assert frame[CRColumn.XP].tolist() == CR_TABLE.column(CRColumn.XP).tolist()
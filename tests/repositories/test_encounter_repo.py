@@ -0,0 +1,51 @@
+import pytest
+
+from app.repositories.encounter_repo import (
+    Difficulty,
+    encounter_budget,
+    encounter_multiplier,
+    xp_threshold,
+)
+
+
+def test_xp_threshold():
+    assert xp_threshold(1, Difficulty.EASY) == 25
+    assert xp_threshold(20, "deadly") == 12_700
+    with pytest.raises(ValueError):
+        xp_threshold(21, Difficulty.EASY)
+    with pytest.raises(ValueError):
+        xp_threshold(1, "trivial")
+
+
+def test_budget_runs_up_to_the_next_difficulty():
+    assert encounter_budget([3, 3, 3, 3], Difficulty.EASY) == (300, 599)
+    assert encounter_budget([3, 3, 3, 3], Difficulty.HARD) == (900, 1599)
+    assert encounter_budget([1, 2], Difficulty.MEDIUM) == (150, 224)
+    assert encounter_budget([3, 3, 3, 3], Difficulty.DEADLY) == (1600, 2400)
+    with pytest.raises(ValueError):
+        encounter_budget([], Difficulty.EASY)
+
+
+@pytest.mark.parametrize(
+    "monsters, party_size, multiplier",
+    [
+        (1, 4, 1.0),
+        (2, 4, 1.5),
+        (3, 4, 2.0),
+        (6, 4, 2.0),
+        (7, 4, 2.5),
+        (11, 4, 3.0),
+        (15, 4, 4.0),
+        (1, 2, 1.5),
+        (15, 2, 5.0),
+        (1, 6, 0.5),
+        (2, 6, 1.0),
+    ],
+)
+def test_encounter_multiplier(monsters, party_size, multiplier):
+    assert encounter_multiplier(monsters, party_size) == multiplier
+
+
+def test_encounter_needs_a_monster():
+    with pytest.raises(ValueError):
+        encounter_multiplier(0, 4)
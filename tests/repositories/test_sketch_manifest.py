@@ -0,0 +1,145 @@
+import json
+import os
+from dataclasses import asdict
+
+from app.repositories.sketch_manifest import (
+    MANIFEST_FILENAME,
+    STAT_CACHE_FILENAME,
+    SketchManifest,
+    sized_dir,
+)
+
+PARAMS = {"invert": False, "threshold": 0.1}
+
+
+def make_tree(tmp_path):
+    src = tmp_path / "images" / "a.png"
+    dst = tmp_path / "sketch" / "a.png"
+    src.parent.mkdir()
+    dst.parent.mkdir()
+    src.write_bytes(b"source")
+    dst.write_bytes(b"sketch")
+    manifest = SketchManifest(tmp_path / "sketch" / MANIFEST_FILENAME)
+    manifest.record("a.png", src, dst, PARAMS)
+    return manifest, src, dst
+
+
+def test_missing_output_needs_processing(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    dst.unlink()
+    assert manifest.needs_processing("a.png", src, dst, PARAMS)
+
+
+def test_recorded_source_is_up_to_date(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    assert not manifest.needs_processing("a.png", src, dst, PARAMS)
+
+
+def test_touched_source_with_same_content_is_up_to_date(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    st = src.stat()
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not manifest.needs_processing("a.png", src, dst, PARAMS)
+    assert manifest.stats["a.png"] == (st.st_size, st.st_mtime_ns + 10**9)
+
+
+def test_stat_refresh_leaves_the_committed_manifest_alone(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    manifest.save()
+    committed = manifest.path.read_bytes()
+    st = src.stat()
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    loaded = SketchManifest.load(manifest.path)
+    assert not loaded.needs_processing("a.png", src, dst, PARAMS)
+    loaded.save()
+
+    assert manifest.path.read_bytes() == committed
+    assert b"mtime" not in committed
+    reloaded = SketchManifest.load(manifest.path)
+    assert reloaded.stats["a.png"] == (st.st_size, st.st_mtime_ns + 10**9)
+    assert reloaded.stat_path.name == STAT_CACHE_FILENAME
+
+
+def test_fresh_clone_without_stat_cache_is_up_to_date(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    manifest.save()
+    manifest.stat_path.unlink()
+
+    loaded = SketchManifest.load(manifest.path)
+    assert not loaded.needs_processing("a.png", src, dst, PARAMS)
+    assert "a.png" in loaded.stats
+
+
+def test_version_1_manifests_are_migrated(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    entry = manifest.entries["a.png"]
+    manifest.path.write_text(
+        json.dumps({"version": 1, "entries": {"a.png": {**asdict(entry), "mtime_ns": 1}}})
+    )
+
+    loaded = SketchManifest.load(manifest.path)
+    assert loaded.entries == manifest.entries
+    assert not loaded.needs_processing("a.png", src, dst, PARAMS)
+    loaded.save()
+    assert json.loads(manifest.path.read_text())["version"] == 2
+    assert "mtime_ns" not in manifest.path.read_text()
+
+
+def test_changed_content_needs_processing(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    src.write_bytes(b"edited")
+    assert manifest.needs_processing("a.png", src, dst, PARAMS)
+
+
+def test_changed_params_need_processing(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    assert manifest.needs_processing("a.png", src, dst, PARAMS | {"invert": True})
+
+
+def test_legacy_output_newer_than_source_is_adopted(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    manifest.entries.clear()
+    st = src.stat()
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not manifest.needs_processing("a.png", src, dst, PARAMS, adopt_params=PARAMS)
+    assert "a.png" in manifest.entries
+
+
+def test_legacy_output_is_not_adopted_under_other_params(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    manifest.entries.clear()
+    st = src.stat()
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    inverted = PARAMS | {"invert": True}
+    assert manifest.needs_processing("a.png", src, dst, inverted, adopt_params=PARAMS)
+    assert manifest.needs_processing("a.png", src, dst, PARAMS)
+    assert manifest.entries == {}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    manifest.save()
+    loaded = SketchManifest.load(manifest.path)
+    assert loaded.entries == manifest.entries
+    assert loaded.entries["a.png"].output == "a.png"
+
+
+def test_load_ignores_corrupt_manifest(tmp_path):
+    path = tmp_path / MANIFEST_FILENAME
+    path.write_text("{not json")
+    assert SketchManifest.load(path).entries == {}
+
+
+def test_missing_sized_output_needs_processing(tmp_path):
+    manifest, src, dst = make_tree(tmp_path)
+    params = {**PARAMS, "sizes": [64]}
+    sized = sized_dir(dst.parent, 64) / "a.png"
+    sized.parent.mkdir()
+    sized.write_bytes(b"small")
+    manifest.record("a.png", src, dst, params)
+
+    assert manifest.output_paths(manifest.entries["a.png"]) == [dst, sized]
+    assert not manifest.needs_processing("a.png", src, dst, params)
+    sized.unlink()
+    assert manifest.needs_processing("a.png", src, dst, params)
@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from app.utils.fswatch import InotifyWatcher, PollingWatcher, Watcher, debounced
+
+
+def make_watcher(kind, root):
+    if kind == "inotify":
+        if not sys.platform.startswith("linux"):
+            pytest.skip("inotify is Linux-only")
+        return InotifyWatcher(root)
+    return PollingWatcher(root, interval=0.01)
+
+
+def read_until(watcher, expected, attempts=50):
+    seen = set()
+    for _ in range(attempts):
+        seen |= watcher.read(0.05)
+        if expected <= seen:
+            break
+    return seen
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+def test_reports_written_and_removed_files(tmp_path, kind):
+    existing = tmp_path / "old.png"
+    existing.write_bytes(b"old")
+    with make_watcher(kind, tmp_path) as watcher:
+        (tmp_path / "new.png").write_bytes(b"new")
+        existing.unlink()
+
+        changed = read_until(watcher, {tmp_path / "new.png", existing})
+
+    assert {tmp_path / "new.png", existing} <= changed
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+def test_reports_files_in_new_directories(tmp_path, kind):
+    with make_watcher(kind, tmp_path) as watcher:
+        (tmp_path / "maps").mkdir()
+        assert read_until(watcher, {tmp_path / "maps"}, attempts=5) <= {tmp_path / "maps"}
+        (tmp_path / "maps" / "cave.png").write_bytes(b"cave")
+
+        changed = read_until(watcher, {tmp_path / "maps" / "cave.png"})
+
+    assert tmp_path / "maps" / "cave.png" in changed
+
+
+def test_read_times_out_without_changes(tmp_path):
+    with PollingWatcher(tmp_path, interval=0.01) as watcher:
+        assert watcher.read(0.03) == set()
+
+
+class ScriptedWatcher(Watcher):
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    def read(self, timeout=None):
+        return self.reads.pop(0) if self.reads else set()
+
+
+def test_debounced_merges_bursts(tmp_path):
+    a, b, c = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+    watcher = ScriptedWatcher([{a}, {b}, set(), {c}])
+
+    batches = debounced(watcher, quiet=0.01)
+
+    assert next(batches) == {a, b}
+    assert next(batches) == {c}
+
+
+def test_debounced_flushes_after_max_delay(tmp_path):
+    class Busy(Watcher):
+        def read(self, timeout=None):
+            return {tmp_path / "busy"}
+
+    assert next(debounced(Busy(), quiet=0.01, max_delay=0.05)) == {tmp_path / "busy"}
+
+
+def test_watchers_must_implement_read():
+    class Incomplete(Watcher):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
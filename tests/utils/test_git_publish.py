@@ -0,0 +1,139 @@
+import shutil
+import subprocess
+
+import pytest
+
+from app.utils import git_publish
+from app.utils.git_publish import MESSAGE_HEADER, PENDING_FILENAME, publish
+from app.utils.profiling import PipelineProfiler
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", *args], cwd=repo, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def clone(tmp_path):
+    # A working clone whose origin is a local bare repository, with one pushed commit.
+    origin = tmp_path / "origin.git"
+    work = tmp_path / "work"
+    git(tmp_path, "init", "-q", "--bare", str(origin))
+    git(tmp_path, "init", "-q", str(work))
+    git(work, "config", "user.name", "Test")
+    git(work, "config", "user.email", "test@example.com")
+    git(work, "remote", "add", "origin", str(origin))
+    (work / "README").write_text("sketches\n")
+    git(work, "add", "README")
+    git(work, "commit", "-q", "-m", "Initial")
+    git(work, "push", "-q", "-u", "origin", "HEAD")
+    return work
+
+
+def remote_head(work):
+    return git(work, "ls-remote", "origin", "HEAD").split()[0]
+
+
+def test_commits_and_pushes_new_and_deleted_files_with_one_staging_call(clone, monkeypatch):
+    (clone / "sketch").mkdir()
+    outputs = [clone / "sketch" / f"{i}.png" for i in range(50)]
+    for path in outputs:
+        path.write_bytes(b"png")
+    (clone / "README").unlink()
+    calls = []
+    real_git = git_publish._git
+    monkeypatch.setattr(
+        git_publish, "_git", lambda *a, **k: calls.append(a[1]) or real_git(*a, **k)
+    )
+
+    result = publish([*outputs, clone / "README"], repo=clone)
+
+    assert calls.count("update-index") == 1
+    assert "add" not in calls
+    assert result.commit == git(clone, "rev-parse", "HEAD") == remote_head(clone)
+    assert result.pushed
+    assert git(clone, "status", "--porcelain") == ""
+    assert git(clone, "ls-files") == "\n".join(sorted(f"sketch/{i}.png" for i in range(50)))
+    message = git(clone, "log", "-1", "--format=%B").splitlines()
+    assert message[0] == MESSAGE_HEADER
+    assert "README" in message and "sketch/0.png" in message
+
+
+def test_stage_only_runs_are_coalesced_into_the_next_commit(clone):
+    first, second = clone / "a.png", clone / "b.png"
+    first.write_bytes(b"a")
+    staged = publish([first], repo=clone, commit=False)
+    second.write_bytes(b"b")
+    before = git(clone, "rev-parse", "HEAD")
+
+    assert staged.staged == ["a.png"] and staged.commit is None and not staged.pushed
+    assert git(clone, "rev-parse", "HEAD") == before
+
+    result = publish([second], repo=clone)
+
+    assert git(clone, "rev-list", "--count", f"{before}..HEAD") == "1"
+    assert git(clone, "log", "-1", "--format=%B").splitlines() == [
+        MESSAGE_HEADER,
+        "a.png",
+        "b.png",
+    ]
+    assert result.pushed
+    assert not (clone / ".git" / PENDING_FILENAME).exists()
+
+
+def test_does_not_commit_or_push_when_nothing_changed(clone, monkeypatch):
+    (clone / "same.png").write_bytes(b"x")
+    publish([clone / "same.png"], repo=clone)
+    head = git(clone, "rev-parse", "HEAD")
+    calls = []
+    real_git = git_publish._git
+    monkeypatch.setattr(
+        git_publish, "_git", lambda *a, **k: calls.append(a[1]) or real_git(*a, **k)
+    )
+
+    result = publish([clone / "same.png"], repo=clone)
+
+    assert result.commit is None and not result.pushed
+    assert git(clone, "rev-parse", "HEAD") == head
+    assert "push" not in calls
+    assert "nothing to commit" in result.summary()
+
+
+def test_pushes_commits_left_by_an_earlier_failed_push(clone):
+    (clone / "c.png").write_bytes(b"c")
+    publish([clone / "c.png"], repo=clone, push=False)
+    assert remote_head(clone) != git(clone, "rev-parse", "HEAD")
+
+    result = publish([], repo=clone)
+
+    assert result.commit is None and result.pushed
+    assert remote_head(clone) == git(clone, "rev-parse", "HEAD")
+
+
+def test_reports_timings_to_the_result_and_profiler(clone):
+    (clone / "d.png").write_bytes(b"d")
+    profiler = PipelineProfiler(trace_memory=False)
+
+    result = publish([clone / "d.png"], repo=clone, profiler=profiler)
+
+    assert set(result.timings) == {"stage", "commit", "push"}
+    assert all(seconds >= 0 for seconds in result.timings.values())
+    assert [record.stage for record in profiler.records] == ["git-stage", "git-commit", "git-push"]
+    assert "staged 1 files" in result.summary() and "pushed" in result.summary()
+
+
+def test_rejects_paths_outside_the_repository(clone, tmp_path):
+    with pytest.raises(ValueError, match="outside the repository"):
+        publish([tmp_path / "elsewhere.png"], repo=clone)
+
+
+def test_push_failures_raise_after_committing(clone):
+    (clone / "e.png").write_bytes(b"e")
+    git(clone, "remote", "set-url", "origin", str(clone.parent / "missing.git"))
+
+    with pytest.raises(subprocess.CalledProcessError):
+        publish([clone / "e.png"], repo=clone)
+    assert git(clone, "status", "--porcelain") == ""
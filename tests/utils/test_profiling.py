@@ -0,0 +1,56 @@
+import json
+import tracemalloc
+
+from app.utils.profiling import NULL_PROFILER, PipelineProfiler, StageRecord
+
+
+def test_stage_records_time_pixels_and_memory():
+    with PipelineProfiler() as profiler:
+        with profiler.stage("convert", "a.png") as record:
+            record.pixels = 100
+            buffer = bytearray(1 << 20)
+        del buffer
+
+    [record] = profiler.records
+    assert (record.file, record.stage, record.pixels) == ("a.png", "convert", 100)
+    assert record.seconds > 0
+    assert record.peak_bytes >= 1 << 20
+
+
+def test_profiler_stops_tracing_it_started():
+    assert not tracemalloc.is_tracing()
+    with PipelineProfiler():
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_report_aggregates_by_stage_and_file(tmp_path):
+    profiler = PipelineProfiler(trace_memory=False)
+    profiler.extend(
+        [
+            StageRecord("a.png", "decode", 0.5, pixels=10),
+            StageRecord("a.png", "encode", 1.5, pixels=10),
+            StageRecord("b.png", "decode", 0.25, pixels=20),
+            StageRecord("", "scan", 0.1),
+        ]
+    )
+
+    report = profiler.write_report(tmp_path / "profile.json")
+
+    assert json.loads((tmp_path / "profile.json").read_text())["stages"] == report["stages"]
+    assert list(report["stages"]) == ["encode", "decode", "scan"]
+    assert report["stages"]["decode"] == {
+        "seconds": 0.75,
+        "count": 2,
+        "pixels": 30,
+        "peak_bytes": 0,
+    }
+    assert [f["file"] for f in report["files"]] == ["a.png", "b.png"]
+    assert report["files"][0]["stages"] == {"decode": 0.5, "encode": 1.5}
+    assert "(mostly encode)  a.png" in profiler.summary()
+
+
+def test_null_profiler_records_nothing():
+    with NULL_PROFILER.stage("convert", "a.png") as record:
+        record.pixels = 5
+    NULL_PROFILER.extend([StageRecord("a.png", "x", 1.0)])
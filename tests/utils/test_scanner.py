@@ -0,0 +1,52 @@
+from app.utils.scanner import index_files, scan_files
+
+
+def make_tree(root):
+    for name in ("a.png", "a/b.png", "a/c.txt", "a.b/d.PNG", "drafts/e.png", "z.jpg"):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(name.encode())
+
+
+def test_yields_files_in_sorted_rglob_order(tmp_path):
+    make_tree(tmp_path)
+
+    scanned = list(scan_files(tmp_path))
+
+    expected = sorted(path for path in tmp_path.rglob("*") if path.is_file())
+    assert [s.path for s in scanned] == expected
+    assert [s.key for s in scanned] == [p.relative_to(tmp_path).as_posix() for p in expected]
+    assert scanned[0].stat.st_size == len(b"a/b.png")
+
+
+def test_filters_by_suffix_and_globs(tmp_path):
+    make_tree(tmp_path)
+
+    scanned = scan_files(tmp_path, {".png"}, include=["a*"], exclude=["drafts"])
+
+    assert [s.key for s in scanned] == ["a/b.png", "a.b/d.PNG", "a.png"]
+
+
+def test_excluded_directories_are_not_entered(tmp_path):
+    make_tree(tmp_path)
+
+    keys = [s.key for s in scan_files(tmp_path, exclude=["a", "*.jpg"])]
+
+    assert keys == ["a.b/d.PNG", "a.png", "drafts/e.png"]
+
+
+def test_under_limits_the_walk_but_keeps_keys_relative_to_root(tmp_path):
+    make_tree(tmp_path)
+
+    assert [s.key for s in scan_files(tmp_path, under=tmp_path / "a")] == ["a/b.png", "a/c.txt"]
+    assert [s.key for s in scan_files(tmp_path, under=tmp_path / "z.jpg")] == ["z.jpg"]
+    assert list(scan_files(tmp_path, under=tmp_path / "drafts/e.png", exclude=["drafts"])) == []
+    assert list(scan_files(tmp_path, under=tmp_path / "gone.png")) == []
+
+
+def test_index_files_skips_stat(tmp_path):
+    make_tree(tmp_path)
+
+    assert index_files(tmp_path) == {p for p in tmp_path.rglob("*") if p.is_file()}
+    assert all(s.stat is None for s in scan_files(tmp_path, with_stat=False))
+    assert index_files(tmp_path / "missing") == set()